@@ -5,14 +5,18 @@ Subtle, naturally-scaled, not cartoonish.
 
 Uses: imagen-4.0-ultra-generate-001 (highest quality)
 """
+import asyncio
 import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from google import genai
-from google.genai import types
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from gencore import (  # noqa: E402
+    GenerationEngine, aclose_client, cache_from_argv, candidates_from_argv, concurrency_from_argv, dedupe_from_argv, estimate,
+    export_from_argv, format_duplicates, format_plan, format_scores, matte_from_argv, plan_from_argv, plan_job,
+    registry_from_argv, run_export, run_matte, save_candidates, stream, trace, trace_from_argv,
+)
 
 IMAGEN_MODEL = "imagen-4.0-ultra-generate-001"
 
@@ -145,14 +149,34 @@ WILDLIFE = {
 }
 
 
-def generate_wildlife(zone: str, creature: dict, output_dir: Path) -> dict:
+def wildlife_job(zone: str, creature: dict, candidates: int = 1) -> dict:
+    """Describe the generation request for one wildlife sprite."""
+    from google.genai import types
+
+    return {
+        "id": f"{zone}/{creature['id']}",
+        "kind": "images",
+        "model": IMAGEN_MODEL,
+        "prompt": creature["prompt"].strip(),
+        "config": types.GenerateImagesConfig(
+            number_of_images=candidates,
+            aspect_ratio="1:1",  # Square for sprites
+            safety_filter_level="block_low_and_above",
+            person_generation="dont_allow",
+        ),
+    }
+
+
+async def generate_wildlife(zone: str, creature: dict, output_dir: Path, engine: GenerationEngine,
+                            candidates: int = 1, index=None, registry=None) -> dict:
     """Generate a single wildlife sprite."""
     result = {
         "zone": zone,
         "creature": creature["name"],
         "success": False,
         "path": None,
-        "error": None
+        "error": None,
+        "attempts": []
     }
 
     api_key = os.environ.get('GOOGLE_API_KEY')
@@ -160,50 +184,59 @@ def generate_wildlife(zone: str, creature: dict, output_dir: Path) -> dict:
         result["error"] = "GOOGLE_API_KEY not found"
         return result
 
-    prompt = creature["prompt"].strip()
     print(f"\n[{zone}/{creature['id']}] Generating with {IMAGEN_MODEL}...")
 
-    try:
-        client = genai.Client(api_key=api_key)
-
-        response = client.models.generate_images(
-            model=IMAGEN_MODEL,
-            prompt=prompt,
-            config=types.GenerateImagesConfig(
-                number_of_images=1,
-                aspect_ratio="1:1",  # Square for sprites
-                safety_filter_level="block_low_and_above",
-                person_generation="dont_allow",
-            )
-        )
-
-        if response.generated_images:
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            output_filename = f"{creature['id']}-{timestamp}.png"
-            output_path = output_dir / output_filename
-
-            image_data = response.generated_images[0].image.image_bytes
-            with open(output_path, "wb") as f:
-                f.write(image_data)
-
-            print(f"[{zone}/{creature['id']}] ✓ SUCCESS: {output_path}")
-            result["success"] = True
-            result["path"] = str(output_path)
-        else:
-            result["error"] = "No image generated"
-            print(f"[{zone}/{creature['id']}] ✗ No image generated")
-
-    except Exception as e:
-        result["error"] = str(e)
-        print(f"[{zone}/{creature['id']}] ✗ ERROR: {e}")
+    job = wildlife_job(zone, creature, candidates)
+    with trace.job(f"{zone}/{creature['id']}", IMAGEN_MODEL):
+        try:
+            images, cached = await engine.generate(job, result["attempts"])
+
+            if images:
+                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                output_filename = f"{creature['id']}-{timestamp}.png"
+                output_path = output_dir / output_filename
+
+                saved = save_candidates(images, output_path, index=index)
+
+                print(f"[{zone}/{creature['id']}] ✓ SUCCESS{' (cached)' if cached else ''}: {output_path}")
+                if saved["candidates"]:
+                    print(f"[{zone}/{creature['id']}] {len(images)} candidates, promoted c{saved['best']}:")
+                    print(format_scores(saved))
+                if saved["duplicates"]:
+                    print(f"[{zone}/{creature['id']}] near-duplicates of existing assets:")
+                    print(format_duplicates(saved))
+                if registry:
+                    registry.record(output_path, job, "character", zone=zone, subject=creature["id"],
+                                    attempts=result["attempts"], cached=cached)
+                result["success"] = True
+                result["path"] = str(output_path)
+                trace.mark("written")
+            else:
+                result["error"] = "No image generated"
+                trace.fail(result["error"])
+                print(f"[{zone}/{creature['id']}] ✗ No image generated")
+
+        except Exception as e:
+            result["error"] = str(e)
+            trace.fail(e)
+            print(f"[{zone}/{creature['id']}] ✗ ERROR: {e}")
 
     return result
 
 
 def main():
-    zones_to_generate = sys.argv[1:] if len(sys.argv) > 1 else list(WILDLIFE.keys())
-
-    project_root = Path(__file__).parent.parent
+    cache, args = cache_from_argv(sys.argv[1:])
+    concurrency, args = concurrency_from_argv(args)
+    candidates, args = candidates_from_argv(args)
+    index, args = dedupe_from_argv(args)
+    export, args = export_from_argv(args)
+    matte, args = matte_from_argv(args)
+    registry, args = registry_from_argv(args)
+    trace_path, args = trace_from_argv(args)
+    dry_run, args = plan_from_argv(args)
+    zones_to_generate = args if args else list(WILDLIFE.keys())
+
+    project_root = Path(__file__).resolve().parent.parent.parent  # scripts/archive/ -> repo root
     assets_dir = project_root / "public" / "assets"
 
     print("=" * 70)
@@ -223,28 +256,30 @@ def main():
             all_tasks.append((zone, creature, output_dir))
 
     print(f"Total sprites to generate: {len(all_tasks)}")
-
-    results = []
-
-    # Generate in parallel
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {
-            executor.submit(generate_wildlife, zone, creature, output_dir): (zone, creature["name"])
+    print(f"Concurrency: {concurrency}")
+
+    if dry_run:
+        jobs = [
+            plan_job(f"{zone}/{creature['id']}", [IMAGEN_MODEL], candidates, cached=bool(cache) and cache.contains(
+                GenerationEngine.cache_key(wildlife_job(zone, creature, candidates))))
+            for zone, creature, _ in all_tasks
+        ]
+        print(format_plan(estimate(jobs, concurrency)))
+        return
+
+    engine = GenerationEngine(concurrency=concurrency, cache=cache)
+
+    async def generate_all():
+        tasks = [
+            generate_wildlife(zone, creature, output_dir, engine, candidates, index, registry)
             for zone, creature, output_dir in all_tasks
-        }
+        ]
+        try:
+            return [result async for result in stream(tasks)]
+        finally:
+            await aclose_client()  # release pooled sockets while their event loop is still running
 
-        for future in as_completed(futures):
-            zone, name = futures[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "zone": zone,
-                    "creature": name,
-                    "success": False,
-                    "error": str(e)
-                })
+    results = asyncio.run(generate_all())
 
     # Summary
     print("\n" + "=" * 70)
@@ -263,6 +298,22 @@ def main():
         for r in failed:
             print(f"  ✗ {r['zone']}/{r['creature']}: {r['error']}")
 
+    paths = [r["path"] for r in successful]
+    sprites = run_matte(paths) if matte else paths  # with --matte, only sprites that have a cutout
+    if export:
+        run_export(sprites, "character")
+
+    if cache:
+        print(f"\n{cache.summary()}")
+    if index:
+        index.save()
+        print(index.summary())
+    if registry:
+        registry.refresh_variants(paths)
+        print(registry.summary())
+    if trace_path:
+        print(f"Trace: {trace_path}")
+
 
 if __name__ == "__main__":
     main()
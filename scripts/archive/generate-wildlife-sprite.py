@@ -5,13 +5,19 @@ Creates transparent-background assets to overlay on realistic backgrounds.
 
 ALWAYS uses the LATEST/HIGHEST quality model available.
 """
+import asyncio
 import os
 import sys
 from pathlib import Path
 from datetime import datetime
 
-from google import genai
-from google.genai import types
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from gencore import (  # noqa: E402
+    GenerationEngine, aclose_client, cache_from_argv, candidates_from_argv, concurrency_from_argv, dedupe_from_argv, estimate,
+    export_from_argv, format_duplicates, format_plan, format_scores, journal_from_argv, matte_from_argv,
+    plan_from_argv, plan_job, registry_from_argv, run_export, run_matte, save_candidates, stream, trace,
+    trace_from_argv,
+)
 
 # ============================================================================
 # MODEL CONFIGURATION - ALWAYS USE LATEST/BEST
@@ -195,7 +201,26 @@ WILDLIFE = {
     ]
 }
 
-def generate_wildlife_sprite(zone: str, creature: dict, output_dir: Path):
+def sprite_job(zone: str, creature: dict, candidates: int = 1) -> dict:
+    """Describe the generation request for one wildlife sprite."""
+    from google.genai import types
+
+    return {
+        "id": f"{zone}/{creature['id']}",
+        "kind": "images",
+        "model": IMAGEN_MODEL,
+        "prompt": creature["prompt"].strip(),
+        "config": types.GenerateImagesConfig(
+            number_of_images=candidates,
+            aspect_ratio="1:1",  # Square for sprites
+            safety_filter_level="block_low_and_above",
+            person_generation="dont_allow",
+        ),
+    }
+
+
+async def generate_wildlife_sprite(zone: str, creature: dict, output_dir: Path, engine: GenerationEngine,
+                                   candidates: int = 1, index=None, registry=None, journal=None):
     """Generate a single wildlife sprite."""
 
     api_key = os.environ.get('GOOGLE_API_KEY')
@@ -203,8 +228,6 @@ def generate_wildlife_sprite(zone: str, creature: dict, output_dir: Path):
         print("ERROR: GOOGLE_API_KEY not found in environment")
         return None
 
-    client = genai.Client(api_key=api_key)
-
     creature_id = creature["id"]
     creature_name = creature["name"]
     prompt = creature["prompt"].strip()
@@ -213,41 +236,65 @@ def generate_wildlife_sprite(zone: str, creature: dict, output_dir: Path):
     print(f"Model: {IMAGEN_MODEL} (highest quality)")
     print(f"Prompt preview: {prompt[:200]}...")
 
-    try:
-        response = client.models.generate_images(
-            model=IMAGEN_MODEL,
-            prompt=prompt,
-            config=types.GenerateImagesConfig(
-                number_of_images=1,
-                aspect_ratio="1:1",  # Square for sprites
-                safety_filter_level="block_low_and_above",
-                person_generation="dont_allow",
-            )
-        )
-
-        if response.generated_images:
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            output_filename = f"{creature_id}-{timestamp}.png"
-            output_path = output_dir / output_filename
-
-            image_data = response.generated_images[0].image.image_bytes
-            with open(output_path, "wb") as f:
-                f.write(image_data)
-
-            print(f"✓ SUCCESS: {output_path}")
-            return str(output_path)
-        else:
-            print(f"✗ WARNING: No image generated for {creature_name}")
+    job = sprite_job(zone, creature, candidates)
+    with trace.job(f"{zone}/{creature_id}", IMAGEN_MODEL):
+        try:
+            attempts = []
+            images, cached = await engine.generate(job, attempts)
+
+            if images:
+                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                output_filename = f"{creature_id}-{timestamp}.png"
+                output_path = output_dir / output_filename
+
+                saved = save_candidates(images, output_path, index=index)
+
+                print(f"✓ SUCCESS{' (cached)' if cached else ''}: {output_path}")
+                if saved["candidates"]:
+                    print(f"{len(images)} candidates for {creature_name}, promoted c{saved['best']}:")
+                    print(format_scores(saved))
+                if saved["duplicates"]:
+                    print(f"Near-duplicates of existing assets for {creature_name}:")
+                    print(format_duplicates(saved))
+                if registry:
+                    registry.record(output_path, job, "character", zone=zone, subject=creature["id"],
+                                    attempts=attempts, cached=cached)
+                trace.mark("written")
+                if journal:
+                    journal.succeeded(f"{zone}/{creature_id}", output_path)
+                return str(output_path)
+            else:
+                print(f"✗ WARNING: No image generated for {creature_name}")
+                trace.fail("No image generated")
+                if journal:
+                    journal.failed(f"{zone}/{creature_id}", "No image generated")
+                return None
+
+        except Exception as e:
+            print(f"✗ ERROR generating {creature_name}: {e}")
+            trace.fail(e)
+            if journal:
+                journal.failed(f"{zone}/{creature_id}", e)
             return None
 
-    except Exception as e:
-        print(f"✗ ERROR generating {creature_name}: {e}")
-        return None
-
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python generate-wildlife-sprite.py <zone|all> [creature_id]")
+    journal, args = journal_from_argv(sys.argv[1:])
+    cache, args = cache_from_argv(args)
+    concurrency, args = concurrency_from_argv(args)
+    candidates, args = candidates_from_argv(args)
+    index, args = dedupe_from_argv(args)
+    export, args = export_from_argv(args)
+    matte, args = matte_from_argv(args)
+    registry, args = registry_from_argv(args)
+    trace_path, args = trace_from_argv(args)
+    dry_run, args = plan_from_argv(args)
+
+    if len(args) < 1:
+        print("Usage: python generate-wildlife-sprite.py <zone|all> [creature_id] [--no-cache | --refresh] [--concurrency N]")
+        print("                                          [--candidates N] [--dedupe] [--export] [--matte]")
+        print("                                          [--no-registry] [--trace] [--dry-run]")
+        print("       python generate-wildlife-sprite.py --resume <run-id>")
         print("\nZones: sky, forest, rocky, coastal")
         print("Use 'all' to generate all zones")
         print(f"\nUsing model: {IMAGEN_MODEL}")
@@ -256,10 +303,10 @@ def main():
             print(f"  {zone}: {', '.join(c['id'] for c in creatures)}")
         sys.exit(1)
 
-    zone = sys.argv[1].lower()
-    specific_creature = sys.argv[2] if len(sys.argv) > 2 else None
+    zone = args[0].lower()
+    specific_creature = args[1] if len(args) > 1 else None
 
-    project_root = Path(__file__).parent.parent
+    project_root = Path(__file__).resolve().parent.parent.parent  # scripts/archive/ -> repo root
     assets_dir = project_root / "public" / "assets"
 
     # Handle 'all' zones
@@ -272,6 +319,7 @@ def main():
         sys.exit(1)
 
     results = {"success": [], "failed": []}
+    all_tasks = []
 
     for current_zone in zones_to_process:
         output_dir = assets_dir / current_zone
@@ -288,15 +336,53 @@ def main():
 
         print(f"\n{'='*60}")
         print(f"ZONE: {current_zone.upper()}")
-        print(f"Generating {len(creatures)} wildlife sprites...")
+        print(f"Queueing {len(creatures)} wildlife sprites...")
         print(f"{'='*60}")
 
         for creature in creatures:
-            result = generate_wildlife_sprite(current_zone, creature, output_dir)
-            if result:
-                results["success"].append(result)
-            else:
-                results["failed"].append(creature["name"])
+            all_tasks.append((current_zone, creature, output_dir))
+
+    if dry_run:
+        jobs = [
+            plan_job(f"{current_zone}/{creature['id']}", [IMAGEN_MODEL], candidates,
+                     cached=bool(cache) and cache.contains(
+                         GenerationEngine.cache_key(sprite_job(current_zone, creature, candidates))))
+            for current_zone, creature, _ in all_tasks
+        ]
+        print(format_plan(estimate(jobs, concurrency)))
+        return
+
+    # Sprites an earlier session of this run (--resume) already wrote are not reissued
+    resumed = [journal.done(f"{current_zone}/{creature['id']}") for current_zone, creature, _ in all_tasks]
+    results["success"].extend(path for path in resumed if path)
+    all_tasks = [task for task, path in zip(all_tasks, resumed) if not path]
+    if results["success"]:
+        print(f"\nResuming run {journal.run_id}: {len(results['success'])} sprite(s) already done")
+    journal.queued([f"{current_zone}/{creature['id']}" for current_zone, creature, _ in all_tasks])
+
+    # All zones run together; the engine caps in-flight requests at `concurrency`
+    engine = GenerationEngine(concurrency=concurrency, cache=cache, journal=journal)
+
+    async def generate_one(current_zone, creature, output_dir):
+        return creature, await generate_wildlife_sprite(current_zone, creature, output_dir, engine, candidates,
+                                                        index, registry, journal)
+
+    async def generate_all():
+        tasks = [generate_one(*task) for task in all_tasks]
+        try:
+            async for creature, result in stream(tasks):
+                if result:
+                    results["success"].append(result)
+                else:
+                    results["failed"].append(creature["name"])
+        finally:
+            await aclose_client()  # release pooled sockets while their event loop is still running
+
+    try:
+        asyncio.run(generate_all())
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. {journal.resume_hint()}")
+        sys.exit(130)
 
     # Summary
     print(f"\n{'='*60}")
@@ -309,6 +395,20 @@ def main():
         print(f"Failed: {len(results['failed'])}")
         for name in results['failed']:
             print(f"  ✗ {name}")
+        print(journal.resume_hint())
+    if cache:
+        print(cache.summary())
+    if index:
+        index.save()
+        print(index.summary())
+    sprites = run_matte(results["success"]) if matte else results["success"]  # with --matte, only sprites that have a cutout
+    if export:
+        run_export(sprites, "character")
+    if registry:
+        registry.refresh_variants(results["success"])
+        print(registry.summary())
+    if trace_path:
+        print(f"Trace: {trace_path}")
 
 
 if __name__ == "__main__":
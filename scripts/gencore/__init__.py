@@ -0,0 +1,45 @@
+"""
+Shared generation core for the asset scripts in scripts/.
+
+Every generator imports its Google AI client from here instead of building
+its own, so a batch run reuses one connection pool across all requests.
+
+Names are resolved on first access (PEP 562), so `from gencore import x`
+loads only the module that defines x; the SDK is imported when a client is
+actually built (gencore/client.py).
+"""
+import importlib
+
+_EXPORTS = {
+    "client": ("get_client", "close_client", "aclose_client"),
+    "cache": ("ImageCache", "cache_from_argv", "fetch_images", "lookup_images", "store_images"),
+    "dag": ("critical_path", "format_timeline", "run_graph"),
+    "fsutil": ("atomic_write",),
+    "journal": ("Journal", "journal_from_argv"),
+    "export": ("export_from_argv", "run_export"),
+    "crop": ("portrait_from_argv", "run_portrait"),
+    "matte": ("matte_from_argv", "run_matte"),
+    "engine": ("GenerationEngine", "concurrency_from_argv", "stream"),
+    "candidates": ("candidates_from_argv", "format_duplicates", "format_scores", "save_candidates"),
+    "phash": ("DuplicateIndex", "dedupe_from_argv"),
+    "quota": ("count_images",),
+    "plan": ("estimate", "format_plan", "plan_from_argv", "plan_job"),
+    "registry": ("Registry", "registry_from_argv"),
+    "resilience": ("CircuitOpenError", "RetryPolicy", "call_with_fallback", "call_with_retry"),
+    "trace": ("trace_from_argv",),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module 'gencore' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f".{_MODULES[name]}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
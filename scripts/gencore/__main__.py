@@ -0,0 +1,5 @@
+"""python -m gencore <command>: see gencore/cli.py."""
+from .cli import main
+
+if __name__ == "__main__":
+    main()
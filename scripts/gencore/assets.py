@@ -0,0 +1,31 @@
+"""
+Locating the site's generated assets under public/assets/<zone>/.
+
+Shared by the post-steps that work on "the current background of each
+zone" (crop, srcset, compose, seams, decodebench). Pillow is imported only
+to check orientation.
+"""
+import re
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent.parent / "public" / "assets"
+
+CANDIDATE_STEM = re.compile(r"-c\d+$")  # gencore/candidates.py outputs
+
+
+def latest_backgrounds(assets_dir: Path = ASSETS_DIR) -> list:
+    """Newest landscape PNG in each zone directory."""
+    latest = []
+    for zone_dir in sorted(p for p in assets_dir.iterdir() if p.is_dir()):
+        pngs = [p for p in zone_dir.glob("*.png")
+                if "portrait" not in p.stem and not CANDIDATE_STEM.search(p.stem) and _is_landscape(p)]
+        if pngs:
+            latest.append(max(pngs, key=lambda p: p.stat().st_mtime))
+    return latest
+
+
+def _is_landscape(path: Path) -> bool:
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return img.width > img.height
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Sprite atlas packer for critter overlays.
+
+Collects the transparent cutouts gencore/matte.py writes for each zone
+(`<id>-<timestamp>-cutout.png`, newest per id), scales them to at most
+SPRITE_LONG_EDGE, shelf-packs them into one sheet and encodes it within the
+character budget in every export format. A JSON map of frame rects goes
+next to it, so a zone costs one image request instead of one per critter:
+
+    public/assets/atlas/<zone>.avif / .webp / .json    (or site.* with --site)
+
+    {"width", "height", "images": {"image/avif": url, ...},
+     "frames": {"sea-otter": {"x", "y", "w", "h"}, ...}}
+
+Frames are named by sprite id; in the --site atlas they are "<zone>/<id>"
+(e.g. "coastal/sea-otter"), so same-named sprites of different zones don't
+overwrite each other.
+
+Each zone is packed and encoded in its own process.
+
+Requires Pillow.
+
+Usage (from scripts/):
+    python -m gencore.atlas [zone ...] [--site] [--max-edge 512] [--formats avif,webp]
+"""
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .export import BUDGETS, FORMATS, KB, fit_to_budget
+from .fsutil import atomic_write
+from .options import fail, option_from_argv, str_list
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent.parent / "public" / "assets"
+ATLAS_DIR = ASSETS_DIR / "atlas"
+SPRITE_LONG_EDGE = 512  # 2x the largest on-screen critter
+PADDING = 2
+FRAME_NAME = re.compile(r"(-\d{8}-\d{6})?-cutout$")
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+
+def find_sprites(zone_dir: Path) -> dict:
+    """Newest cutout per sprite id under `zone_dir`, as {name: path}."""
+    sprites = {}
+    for path in sorted(zone_dir.rglob("*-cutout.png"), key=lambda p: p.stat().st_mtime):
+        sprites[FRAME_NAME.sub("", path.stem)] = path
+    return dict(sorted(sprites.items()))
+
+
+def shelf_pack(sizes: dict, width: int, padding: int = PADDING) -> tuple:
+    """Place {name: (w, h)} on shelves of `width`, tallest first; returns ({name: (x, y)}, height)."""
+    positions, x, y, shelf = {}, 0, 0, 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0])):
+        if x and x + w > width:
+            x, y, shelf = 0, y + shelf + padding, 0
+        positions[name] = (x, y)
+        x += w + padding
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def pack(sizes: dict, padding: int = PADDING) -> tuple:
+    """Try a range of sheet widths and keep the smallest, squarest result; returns (positions, w, h)."""
+    widest = max(w for w, _ in sizes.values())
+    total = sum((w + padding) * (h + padding) for w, h in sizes.values())
+    best = None
+    for width in range(widest, max(widest, int(total ** 0.5 * 2)) + 1, 16):
+        positions, height = shelf_pack(sizes, width, padding)
+        used = max(x + sizes[n][0] for n, (x, _) in positions.items())
+        key = (used * height, abs(used - height))
+        if best is None or key < best[0]:
+            best = (key, positions, used, height)
+    return best[1], best[2], best[3]
+
+
+def build_atlas(name: str, sprites: dict, output_dir: str, formats: tuple = FORMATS,
+                long_edge: int = SPRITE_LONG_EDGE) -> dict:
+    """Pack `sprites` ({frame: path}) into `<output_dir>/<name>.*`; runs in a worker process."""
+    from PIL import Image
+
+    output_dir = Path(output_dir)
+    frames = {}
+    for frame, path in sprites.items():
+        with Image.open(path) as img:
+            img = img.convert("RGBA")
+            img.thumbnail((long_edge, long_edge), Image.LANCZOS)
+            frames[frame] = img
+
+    positions, width, height = pack({f: img.size for f, img in frames.items()})
+    sheet = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for frame, (x, y) in positions.items():
+        sheet.paste(frames[frame], (x, y))
+
+    budget = BUDGETS["character"]["desktop"]
+    images, sizes = {}, {}
+    for fmt in formats:
+        quality, data, fits = fit_to_budget(sheet, fmt, budget)
+        path = output_dir / f"{name}.{fmt}"
+        atomic_write(path, data)
+        images[MIME_TYPES[fmt]] = "/" + path.relative_to(ASSETS_DIR.parent).as_posix()
+        sizes[fmt] = {"bytes": len(data), "quality": quality, "fits": fits}
+
+    manifest = {
+        "width": width,
+        "height": height,
+        "images": images,
+        "frames": {f: {"x": x, "y": y, "w": frames[f].width, "h": frames[f].height}
+                   for f, (x, y) in sorted(positions.items())},
+    }
+    atomic_write(output_dir / f"{name}.json", (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    fill = sum(img.width * img.height for img in frames.values()) / (width * height)
+    return {"name": name, "width": width, "height": height, "frames": len(frames), "fill": fill, "sizes": sizes}
+
+
+def build_atlases(groups: dict, formats: tuple = FORMATS, long_edge: int = SPRITE_LONG_EDGE,
+                  max_workers: int = None) -> list:
+    """Build one atlas per {name: {frame: path}} group across a process pool."""
+    ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {pool.submit(build_atlas, name, sprites, str(ATLAS_DIR), formats, long_edge): name
+                   for name, sprites in groups.items()}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"name": futures[future], "error": str(e)})
+    return sorted(results, key=lambda r: r["name"])
+
+
+def format_report(results: list) -> str:
+    lines = []
+    for r in results:
+        if "error" in r:
+            lines.append(f"  ✗ {r['name']}: {r['error']}")
+            continue
+        sizes = ", ".join(f"{fmt} {s['bytes'] / KB:.0f} KB q{s['quality']}{'' if s['fits'] else ' OVER BUDGET'}"
+                          for fmt, s in r["sizes"].items())
+        lines.append(f"  ✓ {r['name']}: {r['frames']} frames in {r['width']}x{r['height']} "
+                     f"({r['fill']:.0%} filled) — {sizes}")
+    return "\n".join(lines)
+
+
+def site_frames(groups: dict) -> dict:
+    """Merge per-zone {frame: path} groups into one, naming frames "<zone>/<frame>"."""
+    return {f"{zone}/{name}": path for zone, sprites in groups.items() for name, path in sprites.items()}
+
+
+def main():
+    args = sys.argv[1:]
+    if "--help" in args or "-h" in args:
+        print(__doc__.strip())
+        return
+    site, formats, long_edge = "--site" in args, FORMATS, SPRITE_LONG_EDGE
+    args = [a for a in args if a != "--site"]
+    formats = option_from_argv(args, "--formats", formats, str_list, __doc__)
+    long_edge = option_from_argv(args, "--max-edge", long_edge, int, __doc__)
+    unknown = [a for a in args if a.startswith("-")] or [a for a in args if not (ASSETS_DIR / a).is_dir()]
+    if unknown:
+        fail(f"unknown option or zone: {', '.join(unknown)}", __doc__)
+
+    zones = args or sorted(p.name for p in ASSETS_DIR.iterdir() if p.is_dir() and p != ATLAS_DIR)
+    groups = {zone: find_sprites(ASSETS_DIR / zone) for zone in zones}
+    groups = {zone: sprites for zone, sprites in groups.items() if sprites}
+    if site and groups:
+        groups = {"site": site_frames(groups)}
+    if not groups:
+        print("No *-cutout.png sprites found; run the sprite generators with --matte first")
+        sys.exit(1)
+
+    results = build_atlases(groups, formats, long_edge)
+    print(format_report(results))
+    if any("error" in r or not all(s["fits"] for s in r["sizes"].values()) for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Page-weight budget check for public/assets against specs/PERFORMANCE_BUDGET.md.
+
+Works out which files each zone loads at each breakpoint, then sums their
+bytes against the spec's limits:
+
+    per file      background 300/150 KB, character 200/100 KB (desktop/mobile)
+    all images    3 MB desktop, 1.5 MB mobile
+    total page    5 MB (images plus the built JS bundle, if .next/ exists)
+
+What gets loaded comes from two places:
+
+    src/          every '/assets/...' reference in .ts/.tsx/.css files; a
+                  `-portrait` file is the mobile art for its landscape
+                  sibling, everything else loads at both breakpoints, and
+                  `${...}` template parts are globbed on disk
+    manifest      public/assets/manifest.json (gencore/srcset.py), when
+                  present, stands in for each zone's background (and its
+                  `-portrait` sibling) with the srcset rung the browser would
+                  pick: the first format in FORMAT_PREFERENCE, smallest width
+                  covering VIEWPORTS[breakpoint]
+
+References to files that don't exist are listed but not counted. Exits 1
+with a per-zone breakdown when any budget is blown, so it can gate asset
+promotion.
+
+Usage (from scripts/):
+    python -m gencore.budget [--no-manifest] [--verbose]
+"""
+import json
+import re
+import sys
+from pathlib import Path
+
+from .export import BUDGETS, KB
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PUBLIC_DIR = PROJECT_ROOT / "public"
+SRC_DIR = PROJECT_ROOT / "src"
+MANIFEST_PATH = PUBLIC_DIR / "assets" / "manifest.json"
+BUNDLE_DIR = PROJECT_ROOT / ".next" / "static" / "chunks"
+
+MB = 1024 * KB
+BREAKPOINTS = ("desktop", "mobile")
+TOTAL_IMAGES = {"desktop": 3 * MB, "mobile": int(1.5 * MB)}
+PAGE_WEIGHT = 5 * MB
+VIEWPORTS = {"desktop": 1920, "mobile": 1080}  # device px: 1080p desktop, ~412 css px at DPR 2.6
+FORMAT_PREFERENCE = ("image/avif", "image/webp")
+
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx", ".css")
+REFERENCE = re.compile(r"""['"`(](/assets/[^'"`)\s]+\.(?:png|jpe?g|webp|avif|gif|svg))""")
+CHARACTER_DIRS = {"characters", "critters", "wildlife", "atlas"}
+
+
+def kind_for(url: str) -> str:
+    return "character" if CHARACTER_DIRS & set(url.split("/")) else "background"
+
+
+def zone_for(url: str) -> str:
+    parts = url.strip("/").split("/")
+    return parts[1] if len(parts) > 2 else "-"
+
+
+def _expand(url: str) -> list:
+    """Template-literal references become a glob over public/."""
+    if "${" not in url:
+        return [url]
+    pattern = re.sub(r"\$\{[^}]*\}", "*", url).lstrip("/")
+    return sorted("/" + p.relative_to(PUBLIC_DIR).as_posix() for p in PUBLIC_DIR.glob(pattern))
+
+
+def scan_sources(src_dir: Path = SRC_DIR) -> dict:
+    """{url: [source files referencing it]} for every asset reference under `src_dir`."""
+    references = {}
+    for path in sorted(src_dir.rglob("*")):
+        if path.suffix not in SOURCE_SUFFIXES:
+            continue
+        for match in REFERENCE.finditer(path.read_text(errors="ignore")):
+            for url in _expand(match.group(1)):
+                references.setdefault(url, []).append(str(path.relative_to(PROJECT_ROOT)))
+    return references
+
+
+def _breakpoints(url: str, urls: set) -> tuple:
+    stem, dot, ext = url.rpartition(".")
+    if stem.endswith("-portrait"):
+        return ("mobile",)
+    if f"{stem}-portrait.{ext}" in urls:
+        return ("desktop",)
+    return BREAKPOINTS
+
+
+def pick_variant(entry: dict, breakpoint: str) -> dict:
+    """The srcset rung a browser picks for `entry` at `breakpoint` (None if it has no variants)."""
+    for mime in FORMAT_PREFERENCE:
+        rungs = sorted((v for v in entry.get("variants", []) if v["type"] == mime), key=lambda v: v["width"])
+        if rungs:
+            return next((v for v in rungs if v["width"] >= VIEWPORTS[breakpoint]), rungs[-1])
+    return None
+
+
+def resolve(references: dict, manifest: dict = None) -> list:
+    """
+    Files loaded per (zone, breakpoint) as [{"zone", "breakpoint", "url", "kind",
+    "bytes", "refs"}]; bytes is None for a reference that doesn't exist.
+    """
+    urls = set(references)
+    manifest_zones = (manifest or {}).get("zones", {})
+    replaced = set()  # sources (and hand-made -portrait siblings) the manifest's srcset stands in for
+    for orientations in manifest_zones.values():
+        for entry in orientations.values():
+            stem, _, ext = entry["src"].rpartition(".")
+            replaced.update((entry["src"], f"{stem}-portrait.{ext}"))
+
+    loads = []
+    for url, refs in sorted(references.items()):
+        if url in replaced:
+            continue
+        zone, kind = zone_for(url), kind_for(url)
+        for breakpoint in _breakpoints(url, urls):
+            path = PUBLIC_DIR / url.lstrip("/")
+            loads.append({"zone": zone, "breakpoint": breakpoint, "url": url, "kind": kind,
+                          "bytes": path.stat().st_size if path.exists() else None, "refs": refs})
+
+    for zone, orientations in sorted(manifest_zones.items()):
+        for breakpoint in BREAKPOINTS:
+            entry = orientations.get("portrait" if breakpoint == "mobile" else "landscape") or orientations.get(
+                "landscape")
+            variant = entry and pick_variant(entry, breakpoint)
+            if variant:
+                loads.append({"zone": zone, "breakpoint": breakpoint, "url": variant["src"], "kind": "background",
+                              "bytes": variant["bytes"], "refs": [str(MANIFEST_PATH.relative_to(PROJECT_ROOT))]})
+    return loads
+
+
+def bundle_bytes(bundle_dir: Path = BUNDLE_DIR) -> int:
+    """Bytes of built JS chunks, or 0 when there is no build."""
+    return sum(p.stat().st_size for p in bundle_dir.rglob("*.js")) if bundle_dir.exists() else 0
+
+
+def check(loads: list, js_bytes: int = 0) -> dict:
+    """Sum `loads` against the budgets; returns totals per zone/breakpoint and every violation."""
+    violations, zones, totals = [], {}, dict.fromkeys(BREAKPOINTS, 0)
+    for load in loads:
+        if load["bytes"] is None:
+            continue
+        cap = BUDGETS[load["kind"]][load["breakpoint"]]
+        load["over"] = load["bytes"] > cap
+        if load["over"]:
+            violations.append(f"{load['url']} ({load['breakpoint']}): {load['bytes'] / KB:.0f} KB "
+                              f"> {cap / KB:.0f} KB {load['kind']} cap")
+        zones.setdefault(load["zone"], dict.fromkeys(BREAKPOINTS, 0))[load["breakpoint"]] += load["bytes"]
+        totals[load["breakpoint"]] += load["bytes"]
+
+    for breakpoint in BREAKPOINTS:
+        if totals[breakpoint] > TOTAL_IMAGES[breakpoint]:
+            violations.append(f"total images ({breakpoint}): {totals[breakpoint] / MB:.2f} MB "
+                              f"> {TOTAL_IMAGES[breakpoint] / MB:g} MB")
+    page = max(totals.values()) + js_bytes
+    if page > PAGE_WEIGHT:
+        violations.append(f"total page weight: {page / MB:.2f} MB > {PAGE_WEIGHT / MB:g} MB")
+    return {"zones": dict(sorted(zones.items())), "totals": totals, "js": js_bytes, "page": page,
+            "missing": sorted({l["url"] for l in loads if l["bytes"] is None}), "violations": violations}
+
+
+def format_report(loads: list, report: dict, verbose: bool = False) -> str:
+    lines = [f"  {'zone':<11} {'desktop':>10} {'mobile':>10}"]
+    for zone, sizes in report["zones"].items():
+        files = [l for l in loads if l["zone"] == zone and l["bytes"] is not None]
+        mark = "✗" if any(l["over"] for l in files) else "✓"
+        lines.append(f"{mark} {zone:<11} {sizes['desktop'] / KB:>7.0f} KB {sizes['mobile'] / KB:>7.0f} KB")
+        for l in files:
+            if verbose or l["over"]:
+                flag = "  OVER" if l["over"] else ""
+                lines.append(f"      {l['breakpoint']:<8} {l['bytes'] / KB:6.0f} KB  {l['url']}{flag}")
+    totals = report["totals"]
+    lines.append(f"  {'images':<11} {totals['desktop'] / KB:>7.0f} KB {totals['mobile'] / KB:>7.0f} KB"
+                 f"   (max {TOTAL_IMAGES['desktop'] / MB:g} MB / {TOTAL_IMAGES['mobile'] / MB:g} MB)")
+    js = f"{report['js'] / KB:.0f} KB JS" if report["js"] else "no .next build, JS not counted"
+    lines.append(f"  page weight {report['page'] / MB:.2f} MB ({js}; max {PAGE_WEIGHT / MB:g} MB)")
+    if report["missing"]:
+        lines.append(f"\n  {len(report['missing'])} referenced file(s) not found (not counted):")
+        lines.extend(f"    {url}" for url in report["missing"])
+    if report["violations"]:
+        lines.append(f"\n{len(report['violations'])} budget violation(s):")
+        lines.extend(f"  ✗ {v}" for v in report["violations"])
+    else:
+        lines.append("\nAll budgets met")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    verbose = "--verbose" in args
+    manifest = None
+    if "--no-manifest" not in args and MANIFEST_PATH.exists():
+        manifest = json.loads(MANIFEST_PATH.read_text())
+
+    loads = resolve(scan_sources(SRC_DIR), manifest)
+    report = check(loads, bundle_bytes(BUNDLE_DIR))
+    print(format_report(loads, report, verbose))
+    if report["violations"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
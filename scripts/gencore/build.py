@@ -0,0 +1,487 @@
+"""
+Incremental asset build: regenerate only what a prompt or recipe change made stale.
+
+The graph runs from source prompts to raw images to derived files:
+
+    scenes/<zone>                   ZONE_SCENES        generate-zone-scenes.py
+    panels/<panel>                  PANEL_PROMPTS      generate-v3-background.py (after its reference panel)
+    sprites/<zone>/<creature>       WILDLIFE           archive/generate-wildlife-sprite.py
+    backgrounds/<zone>              zone_prompts       generate-zone-background.py
+    backgrounds-imagen4/<zone>      zone_prompts       generate-with-imagen4.py
+      <node>:portrait               portrait crop (gencore/crop.py), backgrounds
+      <node>:matte                  transparent cutout (gencore/matte.py), sprites
+      <node>:export                 AVIF/WebP variants (gencore/export.py)
+
+assets.lock.json (or GENCORE_LOCK) records, per node, a hash of its inputs
+and the files it produced. A generate node's inputs are its prompt entry,
+whitespace-normalized as in the image cache, the script's string constants
+(model names, shared prompt suffixes) and any reference image it reads. A
+derived node's are its module's constants and its sources' output hashes.
+Other code (request configs, encoder logic) isn't hashed: --force rebuilds
+regardless. A node is rebuilt when its inputs changed, an output is missing
+or was edited, or a node it depends on was rebuilt. If a rebuilt dependency
+produced the same bytes, its dependents are skipped after all.
+
+Prompts are read from the scripts' source (as `python -m gencore --list`
+does), generate nodes run the generator in a subprocess, and independent
+nodes run in parallel (gencore/dag.py). `lock` adopts files already on disk
+as up to date without generating anything.
+
+Usage (from scripts/):
+    python -m gencore.build [target ...] [--jobs 4] [--force] [--dry-run]
+    python -m gencore.build lock [target ...]
+
+A target is a node id or a prefix of one (`scenes`, `sprites/forest`,
+`sprites/forest/banana-slug:export`); dependencies of a target are included.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from . import cli
+from .cache import normalize_prompt
+from .dag import run_graph, topological_order
+from .options import option_from_argv
+from .registry import DERIVED
+
+PROJECT_ROOT = cli.SCRIPTS_DIR.parent
+DEFAULT_LOCK = Path(os.environ.get("GENCORE_LOCK", PROJECT_ROOT / "assets.lock.json"))
+DEFAULT_JOBS = 4
+LOCK_VERSION = 1
+
+RECIPES = {"portrait": "gencore/crop.py", "matte": "gencore/matte.py", "export": "gencore/export.py"}
+
+_print_lock = threading.Lock()
+
+
+def _say(line: str):
+    with _print_lock:  # nodes finish on worker threads
+        print(line, flush=True)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_json(value) -> str:
+    return _sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+
+
+def _normalized(value):
+    """`value` with every string whitespace-normalized, so re-wrapping a prompt doesn't rebuild it."""
+    if isinstance(value, str):
+        return normalize_prompt(value)
+    if isinstance(value, dict):
+        return {k: _normalized(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalized(v) for v in value]
+    return value
+
+
+def _relative(path) -> str:
+    path = Path(path).resolve()
+    return str(path.relative_to(PROJECT_ROOT)) if PROJECT_ROOT in path.parents else str(path)
+
+
+def _function_value(script: str, name: str):
+    """AST of the first `name = ...` anywhere in `script` (tables local to a function)."""
+    import ast
+
+    for node in ast.walk(ast.parse((cli.SCRIPTS_DIR / script).read_text())):
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == name for t in node.targets):
+            return node.value
+    return None
+
+
+def _path_table(node) -> dict:
+    """{key: "a/b/c.png"} from a dict of `assets_dir / "a" / "b" / "c.png"` expressions."""
+    import ast
+
+    table = {}
+    for key, value in zip(node.keys, node.values):
+        parts = []
+        while isinstance(value, ast.BinOp) and isinstance(value.op, ast.Div):
+            if isinstance(value.right, ast.Constant):
+                parts.insert(0, value.right.value)
+            value = value.left
+        table[cli.literal(key)] = "/".join(parts)
+    return table
+
+
+def _constants(script: str) -> dict:
+    return {k: v for k, v in cli.script_source(script)["tables"].items() if isinstance(v, str)}
+
+
+def _generate_node(node_id: str, command: list, script: str, entry, outputs: str, files: list = (),
+                   deps: list = (), extra: list = ()) -> dict:
+    """
+    A raw image produced by `python -m gencore <command>`. `outputs` is the
+    glob (relative to the script's project root) its timestamped file lands
+    under; `extra` fixed files the generator also writes (previews).
+    """
+    root = (cli.SCRIPTS_DIR / script).parent.parent  # archive scripts write under scripts/
+    return {"id": node_id, "action": "generate", "command": command, "deps": list(deps),
+            "recipe": {"entry": _normalized(entry), "constants": _normalized(_constants(script))},
+            "files": [f for f in files if f], "glob": str(root / outputs), "extra": [str(root / e) for e in extra]}
+
+
+def _derived_node(source: dict, action: str, deps: list, kind: str = None) -> dict:
+    recipe = {k: v for k, v in cli.script_source(RECIPES[action])["tables"].items() if v is not None}
+    return {"id": f"{source['id']}:{action}", "action": action, "deps": deps, "kind": kind, "recipe": recipe,
+            "files": []}
+
+
+def _with_derived(node: dict, kind: str) -> list:
+    """`node` plus its portrait/matte and export nodes."""
+    if kind == "background":
+        portrait = _derived_node(node, "portrait", [node["id"]])
+        return [node, portrait, _derived_node(node, "export", [node["id"], portrait["id"]], kind)]
+    matte = _derived_node(node, "matte", [node["id"]])
+    return [node, matte, _derived_node(node, "export", [matte["id"]], kind)]
+
+
+def graph_nodes() -> dict:
+    """{node id: node} for every prompt in the generators, in dependency order."""
+    nodes = []
+
+    scenes = cli.script_source("generate-zone-scenes.py")["tables"]["ZONE_SCENES"]
+    for zone, scene in scenes.items():
+        nodes += _with_derived(_generate_node(f"scenes/{zone}", ["scenes", zone], "generate-zone-scenes.py", scene,
+                                              f"public/assets/{zone}/{scene['output_name']}-[0-9]*.png"),
+                               "background")
+
+    tables = cli.script_source("generate-v3-background.py")["tables"]
+    for panel, prompt in tables["PANEL_PROMPTS"].items():
+        reference = tables["PANEL_REFERENCES"].get(panel)
+        nodes.append(_generate_node(f"panels/{panel}", ["panels", panel], "generate-v3-background.py", prompt,
+                                    f"assets/raw/{panel}-v1-[0-9]*.png", deps=[f"panels/{reference}"] if reference
+                                    else [], extra=[f"assets/preview/{panel}-v1-preview.png"]))
+
+    wildlife = cli.script_source("archive/generate-wildlife-sprite.py")["tables"]["WILDLIFE"]
+    for zone, creatures in wildlife.items():
+        for creature in creatures:
+            node = _generate_node(f"sprites/{zone}/{creature['id']}", ["sprites", zone, creature["id"]],
+                                  "archive/generate-wildlife-sprite.py", creature,
+                                  f"public/assets/{zone}/{creature['id']}-[0-9]*.png")
+            nodes += _with_derived(node, "character")
+
+    references = _path_table(_function_value("generate-zone-background.py", "reference_images"))
+    for prefix, script, command, suffix in (
+            ("backgrounds", "generate-zone-background.py", ["backgrounds"], "pixar"),
+            ("backgrounds-imagen4", "generate-with-imagen4.py", ["backgrounds", "--imagen4"], "pixar-v3")):
+        prompts = cli.literal(_function_value(script, "zone_prompts"))
+        for zone, prompt in prompts.items():
+            reference = f"public/assets/{references[zone]}" if prefix == "backgrounds" else None
+            node = _generate_node(f"{prefix}/{zone}", [*command, zone], script, prompt,
+                                  f"public/assets/{zone}/{zone}-background-{suffix}-[0-9]*.png", files=[reference])
+            nodes += _with_derived(node, "background")
+
+    graph = {n["id"]: n for n in nodes}
+    return {node_id: graph[node_id] for node_id in topological_order({i: n["deps"] for i, n in graph.items()})}
+
+
+def select(nodes: dict, targets: list) -> dict:
+    """Nodes whose id starts with one of `targets`, plus everything they depend on."""
+    if not targets:
+        return dict(nodes)
+    wanted = set()
+    for target in targets:
+        matched = [i for i in nodes if i == target or i.startswith(target.rstrip("/") + "/")
+                   or i.startswith(target + ":")]
+        if not matched:
+            groups = sorted({i.split("/")[0] for i in nodes})
+            raise ValueError(f"no node matches '{target}' (targets start with one of {', '.join(groups)})")
+        stack = matched
+        while stack:
+            node_id = stack.pop()
+            if node_id not in wanted:
+                wanted.add(node_id)
+                stack.extend(nodes[node_id]["deps"])
+    return {i: n for i, n in nodes.items() if i in wanted}
+
+
+class Lockfile:
+    """assets.lock.json: {node id: {"recipe", "inputs", "outputs", "built_at"}}; saved after every node."""
+
+    def __init__(self, path: Path = DEFAULT_LOCK):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        data = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.nodes = data.get("nodes", {}) if data.get("version") == LOCK_VERSION else {}
+
+    def file_hash(self, path) -> str:
+        """SHA-256 of `path`; reuses the locked hash while size and mtime are unchanged."""
+        path = Path(path)
+        stat = path.stat()
+        rel = _relative(path)
+        with self._lock:  # record() adds entries from worker threads
+            entries = list(self.nodes.values())
+        for entry in entries:
+            known = entry["outputs"].get(rel)
+            if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                return known["sha256"]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def outputs(self, paths: list) -> dict:
+        states = {}
+        for path in paths:
+            stat = Path(path).stat()
+            states[_relative(path)] = {"sha256": self.file_hash(path), "size": stat.st_size,
+                                       "mtime_ns": stat.st_mtime_ns}
+        return states
+
+    def valid_outputs(self, node_id: str):
+        """Locked output paths of `node_id` if every one is still on disk unmodified, else (None, reason)."""
+        entry = self.nodes.get(node_id)
+        if entry is None:
+            return None, "new"
+        for rel, state in entry["outputs"].items():
+            path = PROJECT_ROOT / rel
+            if not path.exists():
+                return None, f"output missing: {rel}"
+            if self.file_hash(path) != state["sha256"]:
+                return None, f"output modified: {rel}"
+        return [str(PROJECT_ROOT / rel) for rel in entry["outputs"]], None
+
+    def record(self, node_id: str, recipe: str, inputs: str, paths: list):
+        outputs = self.outputs(paths)  # hashed before taking the lock; file_hash takes it too
+        with self._lock:
+            self.nodes[node_id] = {"recipe": recipe, "inputs": inputs, "outputs": outputs,
+                                   "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps({"version": LOCK_VERSION, "nodes": self.nodes}, indent=2, sort_keys=True)
+                           + "\n")
+            os.replace(tmp, self.path)
+
+
+def input_hash(node: dict, lock: Lockfile, sources: dict) -> str:
+    """
+    Hash of everything `node` is built from; `sources` maps each dependency to
+    its output paths. Dependencies count by content only: generated files are
+    timestamped, so a regenerated source with the same bytes has a new path.
+    """
+    files = {_relative(f): lock.file_hash(PROJECT_ROOT / f) if (PROJECT_ROOT / f).exists() else None
+             for f in node["files"]}
+    deps = {dep: [lock.file_hash(p) for p in sources[dep]] for dep in node["deps"]}
+    return _hash_json({"recipe": _hash_json(node["recipe"]), "files": files, "deps": deps})
+
+
+def plan(nodes: dict, lock: Lockfile, force: bool = False) -> dict:
+    """{node id: reason it must be rebuilt, or None if it's up to date}, in dependency order."""
+    stale, outputs = {}, {}
+    for node_id, node in nodes.items():
+        paths, reason = lock.valid_outputs(node_id)
+        rebuilt = [d for d in node["deps"] if stale.get(d)]
+        if force:
+            reason = "forced"
+        elif reason is None and rebuilt:
+            reason = f"after {rebuilt[0]}"
+        elif reason is None and lock.nodes[node_id]["recipe"] != _hash_json(node["recipe"]):
+            reason = "prompt changed" if node["action"] == "generate" else "recipe changed"
+        elif reason is None and lock.nodes[node_id]["inputs"] != input_hash(node, lock, outputs):
+            reason = "inputs changed"
+        stale[node_id] = reason
+        outputs[node_id] = paths
+    return stale
+
+
+def _newest_output(pattern: str, since: float) -> str:
+    pattern = Path(pattern)
+    found = [p for p in pattern.parent.glob(pattern.name)
+             if not DERIVED.search(p.stem) and p.stat().st_mtime >= since - 1]
+    return str(max(found, key=lambda p: p.stat().st_mtime)) if found else None
+
+
+def _run_generate(node: dict, sources: dict) -> list:
+    command = list(node["command"])
+    for dep in node["deps"]:  # panels: the reference panel's raw image
+        command.append(sources[dep][0])
+    start = time.time()
+    proc = subprocess.run([sys.executable, "-m", "gencore", *command], cwd=cli.SCRIPTS_DIR,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = [line for line in (proc.stdout + proc.stderr).splitlines() if line.strip()]
+        raise RuntimeError(lines[-1].strip() if lines else f"exit {proc.returncode}")
+    output = _newest_output(node["glob"], start)
+    if output is None:
+        raise RuntimeError(f"no output matching {_relative(node['glob'])}")
+    return [output] + [e for e in node["extra"] if Path(e).exists()]
+
+
+def _run_derived(node: dict, sources: dict) -> list:
+    source = sources[node["deps"][0]][0]
+    if node["action"] == "portrait":
+        from .crop import crop_portrait
+
+        return [crop_portrait(source)["path"]]
+    if node["action"] == "matte":
+        from .matte import cutout_sprite
+
+        result = cutout_sprite(source)
+        return [result["path"], result["webp"]]
+
+    from .export import BUDGETS, FORMATS, export_variant
+
+    mobile = sources[node["deps"][1]][0] if len(node["deps"]) > 1 else source  # portrait crop, if any
+    results = [export_variant(mobile if variant == "mobile" else source, node["kind"], variant, fmt)
+               for variant in BUDGETS[node["kind"]] for fmt in FORMATS]
+    node["note"] = ", ".join(f"{Path(r['path']).name} over budget" for r in results if not r["fits"])
+    return [r["path"] for r in results]
+
+
+def expected_outputs(node: dict, sources: dict) -> list:
+    """Files `node` would write from `sources`, without building it (for `lock`)."""
+    if node["action"] == "generate":
+        newest = _newest_output(node["glob"], 0)
+        return [newest] + node["extra"] if newest else []
+    source = Path(sources[node["deps"][0]][0])
+    if node["action"] == "portrait":
+        return [str(source.with_name(f"{source.stem}-portrait-crop.png"))]
+    if node["action"] == "matte":
+        return [str(source.with_name(f"{source.stem}-cutout.{ext}")) for ext in ("png", "webp")]
+    from .export import BUDGETS, FORMATS
+
+    mobile = Path(sources[node["deps"][1]][0]) if len(node["deps"]) > 1 else source
+    paths = []
+    for variant in BUDGETS[node["kind"]]:
+        base = mobile if variant == "mobile" else source
+        paths.extend(str(base.with_name(f"{base.stem}-{variant}.{fmt}")) for fmt in FORMATS)
+    return paths
+
+
+def build(nodes: dict, lock: Lockfile, force: bool = False, jobs: int = DEFAULT_JOBS) -> dict:
+    """Rebuild the stale nodes in `nodes`, independent ones in parallel. Returns {node id: status dict}."""
+    stale = plan(nodes, lock, force)
+    report = {}
+
+    def run(node_id, finished):
+        node = nodes[node_id]
+        sources = {dep: finished[dep]["outputs"] for dep in node["deps"]}
+        reason = stale[node_id]
+        paths, _ = lock.valid_outputs(node_id)
+        if reason and reason.startswith("after ") and paths:
+            if lock.nodes[node_id]["inputs"] == input_hash(node, lock, sources):
+                reason = None  # the dependency was rebuilt but came out identical
+        if reason is None:
+            report[node_id] = {"status": "skipped"}
+            return {"success": True, "outputs": paths}
+
+        start = time.perf_counter()
+        try:
+            paths = _run_generate(node, sources) if node["action"] == "generate" else _run_derived(node, sources)
+        except Exception as e:
+            report[node_id] = {"status": "failed", "reason": reason, "error": str(e)}
+            _say(f"  ✗ {node_id} ({reason}): {e}")
+            return {"success": False, "error": str(e)}
+        lock.record(node_id, _hash_json(node["recipe"]), input_hash(node, lock, sources), paths)
+        seconds = time.perf_counter() - start
+        report[node_id] = {"status": "built", "reason": reason, "seconds": seconds, "note": node.get("note")}
+        _say(f"  ✓ {node_id} ({reason}) {seconds:.1f}s  {_relative(paths[0])}")
+        return {"success": True, "outputs": paths}
+
+    timings = run_graph({i: n["deps"] for i, n in nodes.items()}, run, max_workers=jobs)
+    for node_id, t in timings.items():
+        if node_id not in report:  # run_graph skipped it: a dependency failed
+            report[node_id] = {"status": "blocked", "reason": stale[node_id], "error": t["error"]}
+    return report
+
+
+def adopt(nodes: dict, lock: Lockfile) -> dict:
+    """Record the files already on disk as each node's current outputs. Returns {node id: paths or None}."""
+    adopted = {}
+    for node_id, node in nodes.items():
+        if any(not adopted.get(dep) for dep in node["deps"]):
+            adopted[node_id] = None
+            continue
+        sources = {dep: adopted[dep] for dep in node["deps"]}
+        paths = expected_outputs(node, sources)
+        if not paths or not all(Path(p).exists() for p in paths):
+            adopted[node_id] = None
+            continue
+        lock.record(node_id, _hash_json(node["recipe"]), input_hash(node, lock, sources), paths)
+        adopted[node_id] = paths
+    return adopted
+
+
+def _wrapped(label: str, ids: list, width: int = 100) -> list:
+    lines, line = [], f"{label} ({len(ids)}):"
+    for node_id in ids:
+        if len(line) + len(node_id) + 2 > width:
+            lines.append(line)
+            line = "   "
+        line += f" {node_id},"
+    lines.append(line.rstrip(","))
+    return lines
+
+
+def format_plan(stale: dict) -> str:
+    lines = [f"  {node_id:<44} {reason}" for node_id, reason in stale.items() if reason]
+    fresh = [node_id for node_id, reason in stale.items() if not reason]
+    lines.append(f"\n{len(lines)} to build, {len(fresh)} up to date")
+    if fresh:
+        lines.extend(_wrapped("Up to date", fresh))
+    return "\n".join(lines)
+
+
+def format_report(report: dict) -> str:
+    by_status = {s: [i for i, r in report.items() if r["status"] == s]
+                 for s in ("built", "skipped", "failed", "blocked")}
+    lines = [f"\nBuilt {len(by_status['built'])}, skipped {len(by_status['skipped'])} (up to date), "
+             f"failed {len(by_status['failed'])}, not run {len(by_status['blocked'])} (dependency failed)"]
+    if by_status["skipped"]:
+        lines.extend(_wrapped("Skipped", by_status["skipped"]))
+    for node_id in by_status["built"]:
+        if report[node_id].get("note"):
+            lines.append(f"  ⚠ {node_id}: {report[node_id]['note']}")
+    for node_id in by_status["failed"] + by_status["blocked"]:
+        lines.append(f"  ✗ {node_id}: {report[node_id]['error']}")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    jobs = option_from_argv(args, "--jobs", DEFAULT_JOBS, int, __doc__)
+    force = "--force" in args
+    dry_run = "--dry-run" in args
+    args = [a for a in args if a not in ("--force", "--dry-run")]
+    command = args.pop(0) if args and args[0] == "lock" else "build"
+    if any(a.startswith("-") for a in args):
+        print(__doc__.split("Usage (from scripts/):")[1].rstrip())
+        sys.exit(1)
+
+    try:
+        nodes = select(graph_nodes(), args)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    lock = Lockfile()
+
+    if command == "lock":
+        adopted = adopt(nodes, lock)
+        for node_id, paths in adopted.items():
+            print(f"  {'✓' if paths else '-'} {node_id:<44} {_relative(paths[0]) if paths else 'no output on disk'}")
+        print(f"\nLocked {sum(1 for p in adopted.values() if p)}/{len(adopted)} node(s) in {_relative(lock.path)}")
+        return
+
+    if dry_run:
+        print(format_plan(plan(nodes, lock, force)))
+        return
+
+    print(f"Building {len(nodes)} node(s), {jobs} at a time ({_relative(lock.path)})")
+    report = build(nodes, lock, force, jobs)
+    print(format_report(report))
+    if any(r["status"] in ("failed", "blocked") for r in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
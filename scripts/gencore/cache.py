@@ -0,0 +1,194 @@
+"""
+Content-addressed on-disk cache for image generation responses.
+
+Entries are keyed by a SHA-256 over the model name, the whitespace-normalized
+prompt, the request config fields and any reference image bytes, so re-running
+a script with unchanged ZONE_SCENES / PANEL_PROMPTS / WILDLIFE entries returns
+the stored images without a network call. Requests sent to another endpoint
+(GENCORE_BASE_URL, e.g. the local stand-in server) get keys of their own, so
+placeholder images never come back from a live run. The cache keeps a
+running total of its size and, once that passes the limit, evicts
+least-recently-used entries.
+
+Scripts opt in through `cache_from_argv`, which understands:
+    --no-cache   bypass the cache entirely
+    --refresh    ignore stored entries but store the new results
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from . import trace
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "imagegen"
+DEFAULT_MAX_BYTES = int(os.environ.get("GENCORE_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse indentation and line wrapping so cosmetic edits keep the same key."""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def config_fields(config) -> dict:
+    """A generation config (SDK object or plain dict) as a JSON-ready dict of the fields that are set."""
+    if config is None:
+        return {}
+    if hasattr(config, "model_dump"):
+        return config.model_dump(mode="json", exclude_none=True)
+    return dict(config)
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(p.stat().st_size for p in entry.iterdir())
+
+
+class ImageCache:
+    """Size-bounded LRU store of generated image bytes."""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES, refresh: bool = False):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None  # bytes stored under root, counted on the first put
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, prompt: str, config=None, reference: bytes = None) -> str:
+        h = hashlib.sha256()
+        base_url = os.environ.get("GENCORE_BASE_URL")
+        if base_url:  # live-API keys stay as they were
+            h.update(f"endpoint={base_url.rstrip('/')}".encode("utf-8"))
+            h.update(b"\0")
+        h.update(model.encode("utf-8"))
+        h.update(b"\0")
+        h.update(normalize_prompt(prompt).encode("utf-8"))
+        h.update(b"\0")
+        h.update(json.dumps(config_fields(config), sort_keys=True).encode("utf-8"))
+        h.update(b"\0")
+        if reference:
+            h.update(hashlib.sha256(reference).digest())
+        return h.hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def contains(self, key: str) -> bool:
+        """Whether get(key) would hit, without counting or touching the entry."""
+        entry = self._entry_dir(key)
+        return not self.refresh and entry.is_dir() and any(entry.glob("*.img"))
+
+    def get(self, key: str):
+        """Return the cached list of image bytes, or None on a miss."""
+        entry = self._entry_dir(key)
+        images = None
+        if not self.refresh and entry.is_dir():
+            try:
+                images = [p.read_bytes() for p in sorted(entry.glob("*.img"), key=lambda p: int(p.stem))]
+                now = time.time()
+                os.utime(entry, (now, now))  # mark as most recently used
+            except OSError:  # evicted (by this or another process) while being read
+                images = None
+        if not images:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return images
+
+    def put(self, key: str, images: list):
+        entry = self._entry_dir(key)
+        tmp = entry.with_name(f"{key}.tmp-{os.getpid()}-{threading.get_ident()}")
+        tmp.mkdir(parents=True, exist_ok=True)
+        for i, data in enumerate(images):
+            (tmp / f"{i}.img").write_bytes(data)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            if entry.exists():
+                self._size -= _entry_size(entry)
+                shutil.rmtree(entry)
+            tmp.rename(entry)
+            self._size += sum(len(data) for data in images)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list:
+        """(mtime, size, path) of every stored entry."""
+        return [(entry.stat().st_mtime, _entry_size(entry), entry) for entry in self.root.glob("*/*")
+                if entry.is_dir() and ".tmp-" not in entry.name]
+
+    def _evict(self):
+        # Rescan rather than trust the running total: other processes may share the cache
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def summary(self) -> str:
+        return f"Cache: {self.hits} hits, {self.misses} misses, {self.evictions} evicted"
+
+
+def lookup_images(cache, keys: list):
+    """Return (model, images) for the first stored key in `keys`, a list of (model, key), else None.
+
+    Each key is read once, so callers can keep the lookup out of their retry
+    loop. Only the first key counts as a miss: the others are fallbacks that
+    are usually absent.
+    """
+    if cache is None:
+        return None
+    for i, (model, key) in enumerate(keys):
+        if i == 0 or cache.contains(key):
+            images = cache.get(key)
+            if images is not None:
+                trace.mark("cache", hit=True)
+                return model, images
+    trace.mark("cache", hit=False)
+    return None
+
+
+def store_images(cache, key: str, images: list, model: str = None) -> list:
+    """Count freshly produced `images` against `model`'s quota and store them; returns them."""
+    if model:
+        from .quota import count_images  # sqlite3 only when a request was actually made
+
+        count_images(model, len(images or []))
+    if images and cache is not None:
+        cache.put(key, images)
+    return images
+
+
+def fetch_images(cache, key: str, produce, model: str = None):
+    """Return (images, cached): stored images on a hit, else produce() and store.
+
+    `cache` may be None (--no-cache), in which case produce() is always called.
+    Images produced by a request to `model` are added to its quota counters.
+    """
+    stored = lookup_images(cache, [(model, key)])
+    if stored is not None:
+        return stored[1], True
+    return store_images(cache, key, produce(), model), False
+
+
+def cache_from_argv(argv: list):
+    """Split cache flags out of argv; returns (cache or None, remaining args)."""
+    args = [a for a in argv if a not in ("--no-cache", "--refresh")]
+    if "--no-cache" in argv:
+        return None, args
+    return ImageCache(refresh="--refresh" in argv), args
@@ -0,0 +1,94 @@
+"""
+Multi-candidate mode: ask for N images in one request, keep them all, and
+promote the best-scoring one to the canonical output path.
+
+Candidates are written next to the canonical file as `<stem>-c<i>.png`;
+scoring (gencore/scoring.py, needs numpy + Pillow) is only imported when a
+request actually returned more than one image.
+
+With a DuplicateIndex (gencore/phash.py), candidates that are near-duplicates
+of an existing asset are dropped as long as at least one new-looking
+candidate remains; otherwise they are kept and flagged.
+"""
+from pathlib import Path
+
+from .fsutil import atomic_write
+from .options import fail, option_from_argv
+
+MAX_CANDIDATES = 4  # Imagen's per-request limit for number_of_images
+
+
+def candidates_from_argv(argv: list, default: int = 1):
+    """Split `--candidates N` out of argv; returns (count, remaining args)."""
+    args = list(argv)
+    count = option_from_argv(args, "--candidates", default, int)
+    if not 1 <= count <= MAX_CANDIDATES:
+        fail(f"--candidates must be between 1 and {MAX_CANDIDATES}")
+    return count, args
+
+
+def candidate_path(output_path: Path, index: int) -> Path:
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}-c{index}{output_path.suffix}")
+
+
+def save_candidates(images: list, output_path, overlay_regions: list = None, above=None, below=None,
+                    index=None) -> dict:
+    """
+    Write every candidate, score them, and copy the winner to `output_path`.
+    Files are written atomically, so an interrupted run never leaves a
+    truncated image behind.
+
+    Returns {"path", "best", "candidates": [{"path", "score", ...metrics}],
+    "duplicates": [{"candidate", "match", "distance", "dropped"}]}.
+    With a single image it is simply written to `output_path`.
+    """
+    output_path = Path(output_path)
+    duplicates = []
+    if index is not None:
+        matches = index.check(images)
+        fresh = [i for i, m in enumerate(matches) if not m]
+        duplicates = [{"candidate": i, "match": m[0][1], "distance": m[0][0], "dropped": bool(fresh)}
+                      for i, m in enumerate(matches) if m]
+        if fresh:
+            images = [images[i] for i in fresh]
+
+    if len(images) == 1:
+        atomic_write(output_path, images[0])
+        if index is not None:
+            index.add(output_path, images[0])
+        return {"path": str(output_path), "best": 0, "candidates": [], "duplicates": duplicates}
+
+    from .scoring import score_candidates
+
+    scores = score_candidates(images, overlay_regions, above=above, below=below)
+    candidates = []
+    for i, (data, score) in enumerate(zip(images, scores)):
+        path = candidate_path(output_path, i)
+        atomic_write(path, data)
+        candidates.append({"path": str(path), **score})
+
+    best = max(range(len(candidates)), key=lambda i: candidates[i]["score"])
+    atomic_write(output_path, images[best])
+    if index is not None:
+        index.add(output_path, images[best])
+    return {"path": str(output_path), "best": best, "candidates": candidates, "duplicates": duplicates}
+
+
+def format_scores(saved: dict) -> str:
+    """One line per candidate, marking the promoted one."""
+    lines = []
+    for i, c in enumerate(saved["candidates"]):
+        metrics = ", ".join(f"{k}={v}" for k, v in c.items() if k not in ("path", "score"))
+        marker = "*" if i == saved["best"] else " "
+        lines.append(f"    {marker} c{i} score={c['score']:+.3f} ({metrics})")
+    return "\n".join(lines)
+
+
+def format_duplicates(saved: dict) -> str:
+    """One line per candidate that looked like an existing asset."""
+    return "\n".join(
+        f"    ⚠ candidate {d['candidate']} ~ {Path(d['match']).name} (distance {d['distance']})"
+        f"{', dropped' if d['dropped'] else ''}"
+        for d in saved.get("duplicates", [])
+    )
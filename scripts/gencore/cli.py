@@ -0,0 +1,253 @@
+"""
+One entry point for the generators: `python -m gencore <command>`.
+
+    scenes       generate-zone-scenes.py              zone scenes with wildlife
+    panels       generate-v3-background.py            photoreal panels, reference chaining
+    sprites      archive/generate-wildlife-sprite.py  Pixar-style wildlife sprites
+                 (--realistic: archive/generate-realistic-wildlife.py)
+    backgrounds  generate-zone-background.py          Pixar-style zone background
+                 (--imagen4: generate-with-imagen4.py)
+    models       the model(s) each command calls, with per-minute limits
+    export       gencore/export.py                    desktop/mobile exports of existing files
+    build        gencore/build.py                     regenerate only stale assets (assets.lock.json)
+    jobs         gencore/jobs.py                      a JSONL job file, online or as batch jobs
+
+Each command runs the script's own main() with the remaining arguments, so
+flags and output are the script's. `<command> --list`, `<command> --help`
+and zone/panel/creature validation read the script's tables from its source
+(ast) instead of importing it: they answer without loading the SDK,
+asyncio, numpy or the script's dependencies. The SDK itself is imported only
+when a client is built (gencore/client.py). python -m gencore.startup
+measures the difference.
+
+Usage (from scripts/):
+    python -m gencore <command> [args ...]
+    python -m gencore <command> --list | --help
+"""
+import ast
+import importlib
+import importlib.util
+import re
+import sys
+from pathlib import Path
+
+from .options import VALUE_FLAGS
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    "scenes": ("generate-zone-scenes.py", "zone scenes with wildlife"),
+    "panels": ("generate-v3-background.py", "photoreal panels, reference chaining"),
+    "sprites": ("archive/generate-wildlife-sprite.py", "Pixar-style wildlife sprites"),
+    "backgrounds": ("generate-zone-background.py", "Pixar-style zone background"),
+    "models": (None, "models each command calls, with per-minute limits"),
+    "export": (None, "desktop/mobile exports of existing files (gencore/export.py)"),
+    "build": (None, "regenerate only what changed since assets.lock.json (gencore/build.py)"),
+    "jobs": (None, "run a JSONL job file, online or as batch jobs (gencore/jobs.py)"),
+}
+MODULES = ("export", "build", "jobs")  # commands that are a gencore module's own main()
+VARIANTS = {  # alternate script behind a flag
+    ("sprites", "--realistic"): "archive/generate-realistic-wildlife.py",
+    ("backgrounds", "--imagen4"): "generate-with-imagen4.py",
+}
+# How each script reads its positional arguments, and the table that lists the valid ones
+ARGUMENTS = {
+    "generate-zone-scenes.py": ("zones", "ZONE_SCENES"),
+    "generate-v3-background.py": ("panels", "PANEL_PROMPTS"),
+    "archive/generate-wildlife-sprite.py": ("zone-creature", "WILDLIFE"),
+    "archive/generate-realistic-wildlife.py": ("zones", "WILDLIFE"),
+    "generate-zone-background.py": ("zone", "ZONES"),
+    "generate-with-imagen4.py": ("zone", "ZONES"),
+}
+MODEL_CONSTANTS = ("MODEL", "IMAGEN_MODEL", "GEMINI_MODEL", "IMAGEN_FALLBACK_MODEL")
+MODEL_LINE = re.compile(rf"^({'|'.join(MODEL_CONSTANTS)}) = (\"[^\"]*\")", re.MULTILINE)
+
+_modules = {}
+_sources = {}
+
+
+def load_script(path: Path):
+    """Import a generator script (hyphenated file name) as a module, once."""
+    path = Path(path)
+    if path not in _modules:
+        spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return _modules[path]
+
+
+def literal(node, names: dict = None):
+    """
+    Value of a literal node. f-strings are filled in from `names` (constants
+    assigned earlier in the file); other parts that aren't literals become None.
+    """
+    names = names or {}
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        if isinstance(node, ast.Dict):
+            return {literal(k, names): literal(v, names) for k, v in zip(node.keys, node.values)}
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [literal(e, names) for e in node.elts]
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for part in node.values:
+                if isinstance(part, ast.Constant):
+                    parts.append(part.value)
+                elif (isinstance(part.value, ast.Name) and isinstance(names.get(part.value.id), str)
+                      and part.conversion == -1 and part.format_spec is None):
+                    parts.append(names[part.value.id])
+                else:
+                    return None
+            return "".join(parts)
+        return None
+
+
+def script_source(script: str) -> dict:
+    """{"doc", "tables"} of a script: its docstring and top-level constants, read without running it."""
+    if script not in _sources:
+        tree = ast.parse((SCRIPTS_DIR / script).read_text())
+        doc, tables = "", {}
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                tables[node.targets[0].id] = literal(node.value, tables)
+            elif node is tree.body[0] and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+                doc = str(node.value.value).strip()  # not ast.get_docstring: it imports inspect
+        _sources[script] = {"doc": doc, "tables": tables}
+    return _sources[script]
+
+
+def choices(script: str) -> dict:
+    """{valid first positional: [valid second positionals]} for a generator script."""
+    table = script_source(script)["tables"][ARGUMENTS[script][1]]
+    if isinstance(table, dict) and all(isinstance(v, list) for v in table.values()):
+        return {zone: [c["id"] for c in creatures] for zone, creatures in table.items()}  # WILDLIFE
+    return {name: [] for name in table}
+
+
+def positionals(args: list) -> list:
+    out, skip = [], False
+    for arg in args:
+        if skip:
+            skip = False
+        elif arg in VALUE_FLAGS:
+            skip = True
+        elif not arg.startswith("--"):
+            out.append(arg)
+    return out
+
+
+def validate(script: str, args: list) -> str:
+    """Error message for zone/panel/creature arguments the script would reject, else None."""
+    shape = ARGUMENTS[script][0]
+    valid = choices(script)
+    names = positionals(args)
+    if shape == "zones":
+        unknown = [n for n in names if n not in valid]
+    elif shape == "panels":
+        if names == ["all"]:
+            return None
+        if len(names) == 2 and names[1] not in valid:  # <panel> <reference-image>
+            if not Path(names[1]).exists():
+                return f"reference image not found: {names[1]}"
+            names = names[:1]
+        unknown = [n for n in names if n not in valid]
+    elif shape == "zone-creature":
+        if not names:
+            return "a zone (or 'all') is required"
+        zone = names[0].lower()
+        zones = list(valid) if zone == "all" else [zone]
+        unknown = [names[0]] if zone != "all" and zone not in valid else []
+        if not unknown and len(names) > 1 and not any(names[1] in valid[z] for z in zones):
+            return f"unknown creature '{names[1]}' in {', '.join(zones)}"
+    else:
+        if not names:
+            return "a zone is required"
+        unknown = [n for n in names[:1] if n.lower() not in valid]
+    if unknown:
+        kind = "panel" if shape == "panels" else "zone"
+        return f"unknown {kind}(s) {', '.join(unknown)} (one of {', '.join(valid)})"
+    return None
+
+
+def format_choices(script: str) -> str:
+    tables = script_source(script)["tables"]
+    lines = []
+    for name, creatures in choices(script).items():
+        if creatures:
+            lines.append(f"  {name:<10} {', '.join(creatures)}")
+        elif "PANEL_REFERENCES" in tables and tables["PANEL_REFERENCES"].get(name):
+            lines.append(f"  {name:<18} style reference: {tables['PANEL_REFERENCES'][name]}")
+        else:
+            lines.append(f"  {name}")
+    return "\n".join(lines)
+
+
+def script_models(script: str) -> list:
+    """Model constants of a script, in MODEL_CONSTANTS order (a line scan; parsing every script costs ~25 ms)."""
+    found = dict(MODEL_LINE.findall((SCRIPTS_DIR / script).read_text()))
+    return list(dict.fromkeys(ast.literal_eval(found[name]) for name in MODEL_CONSTANTS if name in found))
+
+
+def format_models() -> str:
+    quotas = script_source("gencore/quota.py")["tables"]["QUOTAS"]  # importing quota would pull in sqlite3
+    scripts = [(c, s) for c, (s, _) in COMMANDS.items() if s] + [(f"{c} {f}", s) for (c, f), s in VARIANTS.items()]
+    lines = [f"  {'command':<22} {'model':<40} {'rpm':>4} {'ipm':>4}"]
+    for command, script in scripts:
+        for i, model in enumerate(script_models(script)):
+            limits = quotas.get(model, {})
+            lines.append(f"  {command if i == 0 else '':<22} {model:<40} {limits.get('rpm') or '-':>4} "
+                         f"{limits.get('ipm') or '-':>4}")
+    return "\n".join(lines)
+
+
+def usage() -> str:
+    lines = ["Usage: python -m gencore <command> [args ...]   (<command> --list | --help)", ""]
+    lines.extend(f"  {command:<12} {about}" for command, (_, about) in COMMANDS.items())
+    return "\n".join(lines)
+
+
+def run_script(script: str, args: list):
+    """Run `script`'s main() as if it had been invoked with `args`."""
+    path = SCRIPTS_DIR / script
+    sys.argv = [str(path), *args]
+    load_script(path).main()
+
+
+def main(argv: list = None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help") or argv[0] not in COMMANDS:
+        print(usage())
+        sys.exit(0 if argv and argv[0] in ("-h", "--help") else 1)
+    command, args = argv[0], argv[1:]
+
+    if command == "models":
+        print(format_models())
+        return
+    if command in MODULES:
+        if "--help" in args or "-h" in args:
+            print(script_source(f"gencore/{command}.py")["doc"])
+            return
+        module = importlib.import_module(f".{command}", __package__)
+        sys.argv = [f"gencore.{command}", *args]
+        module.main()
+        return
+
+    script = COMMANDS[command][0]
+    for (variant_command, flag), variant_script in VARIANTS.items():
+        if command == variant_command and flag in args:
+            script = variant_script
+            args = [a for a in args if a != flag]
+
+    if "--help" in args or "-h" in args:
+        print(script_source(script)["doc"])
+        return
+    if "--list" in args:
+        print(format_choices(script))
+        return
+    error = None if "--resume" in args else validate(script, args)  # resumed runs reuse their arguments
+    if error:
+        print(f"ERROR: {error}")
+        sys.exit(1)
+    run_script(script, args)
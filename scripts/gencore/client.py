@@ -0,0 +1,108 @@
+"""
+Long-lived, thread-safe google.genai client with a pooled HTTP transport.
+
+genai.Client is safe to share across threads (it wraps one httpx.Client), so
+the scripts keep a single instance for the whole process instead of paying
+client setup and a fresh TLS handshake per image.
+
+Set GENCORE_BASE_URL to point every script at a local stand-in endpoint
+(see gencore/fake_server.py) instead of the live API.
+
+Scripts that drive the async transport (gencore/engine.py) close the
+client with `aclose_client` at the end of their `asyncio.run` coroutine, so
+pooled sockets are released while their event loop is still running; the
+atexit hook closes whatever is left.
+
+The SDK and httpx are imported on first use, so scripts that only list or
+validate their arguments start without them.
+
+Both transports carry gencore/trace.py's request hooks, which report
+connect/upload/first-byte times for the traced job (no-ops otherwise), and
+gencore/quota.py's hooks, which count every generation request per model.
+"""
+import atexit
+import os
+import threading
+
+from . import quota, trace
+
+# Enough keep-alive sockets for the widest fan-out any script uses.
+POOL_MAX_CONNECTIONS = 16
+POOL_MAX_KEEPALIVE = 16
+POOL_KEEPALIVE_EXPIRY = 60.0  # seconds an idle socket stays in the pool
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _http_options():
+    import httpx
+    from google.genai import types
+
+    limits = httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    )
+    trace_hook, async_trace_hook = trace.http_hooks()
+    sent_hook, counted_hook, async_sent_hook, async_counted_hook = quota.http_hooks()
+    options = {
+        "client_args": {"limits": limits, "event_hooks": {
+            "request": [trace_hook, sent_hook], "response": [counted_hook]}},
+        "async_client_args": {"limits": limits, "event_hooks": {
+            "request": [async_trace_hook, async_sent_hook], "response": [async_counted_hook]}},
+    }
+    base_url = os.environ.get("GENCORE_BASE_URL")
+    if base_url:
+        options["base_url"] = base_url
+    return types.HttpOptions(**options)
+
+
+def get_client(api_key: str = None) -> "genai.Client":
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+            if not api_key:
+                raise RuntimeError("GOOGLE_API_KEY not found")
+            from google import genai
+
+            _client = genai.Client(api_key=api_key, http_options=_http_options())
+    return _client
+
+
+def close_client():
+    """Close the shared client and release its pooled connections.
+
+    Call it outside any event loop. Code that sent requests through the async
+    transport closes the client with `aclose_client` before its loop ends,
+    since those sockets belong to that loop.
+    """
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        import asyncio
+
+        client.close()
+        try:
+            asyncio.run(client.aio.aclose())  # nothing pooled there, but the transport is open
+        except RuntimeError:  # its sockets belong to a loop that has already closed
+            pass
+
+
+async def aclose_client():
+    """Close the shared client from inside the event loop that used its async transport."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        await client.aio.aclose()
+        client.close()
+
+
+atexit.register(close_client)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Streaming compositor for crossfade and full-journey previews.
+
+Stacks zone panels vertically; where two panels meet, the bottom `band` of
+one and the top `band` of the next are blended with a smoothstep ramp in
+linear light (the same overlap the scroll transitions use). Output is
+produced in row strips of STRIP_ROWS:
+
+    - each strip is a handful of vectorized NumPy operations
+    - at most two panels (the current one and the next) are decoded at a time
+    - PNG output is streamed: strips are filtered and fed to a zlib
+      compressor as they are produced, so the full composite never exists
+      in memory. WebP has no row-streaming encoder, so for .webp the uint8
+      rows are gathered into one preallocated buffer and encoded once.
+
+Pairwise crossfades (crossfade-<a>-<b>.png) are written in parallel, one
+process per pair, followed by full-journey-preview.png.
+
+Requires numpy and Pillow.
+
+Usage (from scripts/):
+    python -m gencore.compose [zone ...] [--band 0.25] [--width N] [--format png|webp]
+
+Zones default to the journey order; each uses its newest landscape PNG in
+public/assets/<zone>/. Output goes to assets/preview/.
+"""
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .assets import ASSETS_DIR, latest_backgrounds
+from .fsutil import save_image, temp_path
+from .options import option_from_argv
+
+PREVIEW_DIR = ASSETS_DIR.parent.parent / "assets" / "preview"
+JOURNEY = ("sky", "forest", "coastal", "cave", "datacenter")
+
+STRIP_ROWS = 64
+DEFAULT_BAND = 0.25  # fraction of the shorter neighbouring panel
+
+
+class PngStreamWriter:
+    """Write an 8-bit RGB PNG one row strip at a time."""
+
+    def __init__(self, path, width: int, height: int, level: int = 6):
+        self.width, self.height = width, height
+        self.rows_written = 0
+        self.path, self._tmp = path, temp_path(path)  # renamed into place once complete
+        self._file = open(self._tmp, "wb")
+        self._zlib = zlib.compressobj(level)
+        self._previous = np.zeros((width * 3,), dtype=np.uint8)
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, tag: bytes, data: bytes):
+        body = tag + data
+        self._file.write(struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body)))
+
+    def write(self, strip: np.ndarray):
+        """Append an (n, width, 3) uint8 strip using the PNG "Up" filter."""
+        rows = strip.reshape(len(strip), -1)
+        previous = np.vstack([self._previous[None], rows[:-1]])
+        filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        filtered[:, 1:] = rows - previous  # uint8 arithmetic wraps mod 256, as the filter requires
+        self._previous = rows[-1].copy()
+        self.rows_written += len(rows)
+        data = self._zlib.compress(filtered.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self):
+        if self.rows_written != self.height:
+            self.abort()
+            raise ValueError(f"PNG expected {self.height} rows, got {self.rows_written}")
+        self._chunk(b"IDAT", self._zlib.flush())
+        self._chunk(b"IEND", b"")
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        """Drop the partial file; the previous preview (if any) stays in place."""
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class BufferedWriter:
+    """Gather strips into one uint8 buffer for encoders that need the whole frame."""
+
+    def __init__(self, path, width: int, height: int, fmt: str = "WEBP", **params):
+        self.path, self.fmt, self.params = path, fmt, params
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self.rows_written = 0
+
+    def write(self, strip: np.ndarray):
+        self.buffer[self.rows_written:self.rows_written + len(strip)] = strip
+        self.rows_written += len(strip)
+
+    def close(self):
+        save_image(Image.fromarray(self.buffer), self.path, self.fmt, **self.params)
+
+    def abort(self):
+        pass
+
+
+def open_writer(path: Path, width: int, height: int):
+    if path.suffix == ".png":
+        return PngStreamWriter(path, width, height)
+    if path.suffix == ".webp":
+        return BufferedWriter(path, width, height, "WEBP", quality=85, method=4)
+    raise ValueError(f"Unsupported preview format: {path.suffix}")
+
+
+def _size(path) -> tuple:
+    with Image.open(path) as img:
+        return img.size
+
+
+def _scaled_height(path, width: int) -> int:
+    w, h = _size(path)
+    return round(h * width / w)
+
+
+def _load(path, width: int) -> np.ndarray:
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        if img.width != width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        return np.asarray(img)
+
+
+def _to_linear(srgb: np.ndarray) -> np.ndarray:
+    return (srgb.astype(np.float32) / 255.0) ** 2.2
+
+
+def _to_srgb(linear: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(linear ** (1 / 2.2) * 255.0), 0, 255).astype(np.uint8)
+
+
+def layout(paths: list, width: int, band: float = DEFAULT_BAND) -> tuple:
+    """Panel heights at `width`, overlap rows between each neighbour pair, and total height."""
+    heights = [_scaled_height(p, width) for p in paths]
+    overlaps = [max(1, round(band * min(a, b))) for a, b in zip(heights, heights[1:])]
+    return heights, overlaps, sum(heights) - sum(overlaps)
+
+
+def strips(paths: list, width: int, band: float = DEFAULT_BAND):
+    """Yield the composite as (n, width, 3) uint8 strips, top to bottom."""
+    heights, overlaps, _ = layout(paths, width, band)
+    current = _load(paths[0], width)
+    for i in range(len(paths)):
+        top = overlaps[i - 1] if i > 0 else 0
+        bottom = heights[i] - (overlaps[i] if i < len(overlaps) else 0)
+        for start in range(top, bottom, STRIP_ROWS):
+            yield current[start:min(start + STRIP_ROWS, bottom)]
+        if i == len(overlaps):
+            break
+
+        following = _load(paths[i + 1], width)
+        overlap = overlaps[i]
+        for start in range(0, overlap, STRIP_ROWS):
+            stop = min(start + STRIP_ROWS, overlap)
+            t = (np.arange(start, stop, dtype=np.float32) + 0.5) / overlap
+            t = (t * t * (3 - 2 * t))[:, None, None]  # smoothstep
+            a = _to_linear(current[bottom + start:bottom + stop])
+            b = _to_linear(following[start:stop])
+            yield _to_srgb(a + (b - a) * t)
+        current = following
+
+
+def compose(paths: list, output, width: int = None, band: float = DEFAULT_BAND) -> dict:
+    """Stack `paths` into `output`; returns {"path", "width", "height", "bytes"}."""
+    output = Path(output)
+    if width is None:
+        width = min(_size(p)[0] for p in paths)
+    _, _, height = layout(paths, width, band)
+    writer = open_writer(output, width, height)
+    try:
+        for strip in strips(paths, width, band):
+            writer.write(strip)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return {"path": str(output), "width": width, "height": height, "bytes": output.stat().st_size}
+
+
+def compose_previews(panels: dict, output_dir: Path = PREVIEW_DIR, width: int = None,
+                     band: float = DEFAULT_BAND, fmt: str = "png", max_workers: int = None) -> list:
+    """
+    Write every neighbouring crossfade in parallel, then the full journey.
+    `panels` maps zone -> image path, in journey order.
+    """
+    zones = list(panels)
+    jobs = [([panels[a], panels[b]], output_dir / f"crossfade-{a}-{b}.{fmt}") for a, b in zip(zones, zones[1:])]
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {pool.submit(compose, [str(p) for p in paths], str(out), width, band): out for paths, out in jobs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"path": str(futures[future]), "error": str(e)})
+    results.sort(key=lambda r: r["path"])
+
+    journey = output_dir / f"full-journey-preview.{fmt}"
+    try:
+        results.append(compose(list(panels.values()), journey, width, band))
+    except Exception as e:
+        results.append({"path": str(journey), "error": str(e)})
+    return results
+
+
+def format_report(results: list) -> str:
+    lines = []
+    for r in results:
+        if "error" in r:
+            lines.append(f"  ✗ {Path(r['path']).name}: {r['error']}")
+        else:
+            lines.append(f"  ✓ {Path(r['path']).name}: {r['width']}x{r['height']}, {r['bytes'] / 1024:.0f} KB")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    band = option_from_argv(args, "--band", DEFAULT_BAND, float, __doc__)
+    width = option_from_argv(args, "--width", None, int, __doc__)
+    fmt = option_from_argv(args, "--format", "png", usage=__doc__)
+
+    latest = {p.parent.name: p for p in latest_backgrounds()}
+    zones = args or [z for z in JOURNEY if z in latest]
+    missing = [z for z in zones if z not in latest]
+    if missing or len(zones) < 2:
+        print(f"ERROR: need at least two zones with a landscape background; missing: {', '.join(missing) or '-'}")
+        print(f"Available: {', '.join(latest)}")
+        sys.exit(1)
+
+    PREVIEW_DIR.mkdir(parents=True, exist_ok=True)
+    results = compose_previews({z: latest[z] for z in zones}, PREVIEW_DIR, width, band, fmt)
+    print(format_report(results))
+    if any("error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Portrait crops for mobile variants of 16:9 backgrounds.
+
+specs/RESPONSIVE_STRATEGY.md ("Image Crop Points") gives each zone an
+object-position focus; a phone in portrait otherwise downloads the full
+2560-wide panel and shows a sliver of it. This cuts that sliver out ahead of
+time as `<stem>-portrait-crop.png` next to the landscape file.
+
+The window is chosen on a 512px working copy:
+
+    energy   centre-surround colour contrast (fine vs. coarse box blur) plus
+             the gradient of the lightly blurred luminance, so subjects and
+             horizons count for more than grass and foliage texture
+    prior    a Gaussian around the zone's anchor, so ties and flat skies
+             fall back to the hand-tuned crop point
+
+Every window position is scored at once from an integral image; the best
+one is mapped back to full resolution. Zones are processed in parallel.
+
+Requires numpy and Pillow.
+
+Usage (from scripts/):
+    python -m gencore.crop [<image> ...] [--aspect 9:16]
+
+With no images, the newest landscape PNG in each public/assets/<zone>/ is used.
+Background generators run it as a post-step with --portrait
+(`portrait_from_argv`/`run_portrait`); numpy and Pillow are imported only
+when a crop is actually computed.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .assets import ASSETS_DIR, latest_backgrounds
+from .fsutil import save_image
+from .options import option_from_argv
+
+# object-position (x%, y%) per zone, from RESPONSIVE_STRATEGY.md
+CROP_ANCHORS = {
+    "sky": (0.50, 0.30),         # sun + cloud break
+    "forest": (0.40, 0.50),      # path + god rays
+    "rocky": (0.50, 0.50),       # center rock face
+    "coastal": (0.30, 0.40),     # cliff + ocean
+    "cave": (0.50, 0.50),        # center transition
+    "datacenter": (0.50, 0.60),  # workstations
+}
+DEFAULT_ANCHOR = (0.50, 0.50)
+
+PORTRAIT_ASPECT = 9 / 16
+WORK_LONG_EDGE = 512
+CENTRE_RADIUS = 3       # px at working size; hides foliage/grass texture
+SURROUND_RADIUS = 40
+BLUR_RADIUS = 6
+GRADIENT_WEIGHT = 0.5
+ANCHOR_SIGMA = 0.25     # prior width, as a fraction of the free travel
+ANCHOR_WEIGHT = 0.5     # prior's share of the window score
+
+LUMA = (0.2126, 0.7152, 0.0722)
+
+
+def box_blur(a: np.ndarray, r: int) -> np.ndarray:
+    """Separable box blur via cumulative sums (edge-padded) over the first two axes."""
+    import numpy as np
+
+    k = 2 * r + 1
+    for axis in (0, 1):
+        pad = [(0, 0)] * a.ndim
+        pad[axis] = (r + 1, r)
+        c = np.cumsum(np.pad(a, pad, mode="edge"), axis=axis)
+        n = c.shape[axis]
+        a = (np.take(c, range(k, n), axis=axis) - np.take(c, range(0, n - k), axis=axis)) / k
+    return a
+
+
+def _normalize(a: np.ndarray) -> np.ndarray:
+    return (a - a.min()) / (a.max() - a.min() + 1e-9)
+
+
+def energy_map(rgb: np.ndarray) -> np.ndarray:
+    """Per-pixel saliency in [0, 1] for an (H, W, 3) float array."""
+    import numpy as np
+
+    fine = box_blur(rgb, CENTRE_RADIUS)
+    contrast = np.linalg.norm(fine - box_blur(rgb, SURROUND_RADIUS), axis=2)
+    y = fine @ np.asarray(LUMA, dtype=np.float32)
+    gradient = np.hypot(*np.gradient(y))
+    energy = _normalize(contrast) + GRADIENT_WEIGHT * _normalize(gradient)
+    return _normalize(box_blur(energy, BLUR_RADIUS))
+
+
+def window_size(width: int, height: int, aspect: float) -> tuple:
+    """Largest (w, h) window of `aspect` (w/h) that fits the image."""
+    if width / height > aspect:
+        return max(1, round(height * aspect)), height
+    return width, max(1, round(width / aspect))
+
+
+def best_window(energy: np.ndarray, size: tuple, anchor: tuple = DEFAULT_ANCHOR) -> tuple:
+    """Top-left (x, y) of the `size` window with the highest energy + anchor prior."""
+    import numpy as np
+
+    h, w = energy.shape
+    cw, ch = size
+    integral = np.zeros((h + 1, w + 1), dtype=np.float64)
+    integral[1:, 1:] = energy.cumsum(0).cumsum(1)
+    sums = integral[ch:, cw:] - integral[:-ch, cw:] - integral[ch:, :-cw] + integral[:-ch, :-cw]
+    sums = _normalize(sums)
+
+    # Prior: where object-position would put the window, per axis, as a fraction
+    # of the free travel (an axis without travel has a single position)
+    ys = np.arange(sums.shape[0]) / max(h - ch, 1) - anchor[1] * (h > ch)
+    xs = np.arange(sums.shape[1]) / max(w - cw, 1) - anchor[0] * (w > cw)
+    prior = np.exp(-(ys[:, None] ** 2 + xs[None, :] ** 2) / (2 * ANCHOR_SIGMA ** 2))
+
+    score = (1 - ANCHOR_WEIGHT) * sums + ANCHOR_WEIGHT * prior
+    y, x = np.unravel_index(np.argmax(score), score.shape)
+    return int(x), int(y)
+
+
+def zone_for(path: Path) -> str:
+    """Zone name from public/assets/<zone>/..., or the file name prefix."""
+    for name in (path.parent.name, path.stem.split("-")[0]):
+        if name in CROP_ANCHORS:
+            return name
+    return None
+
+
+def crop_path(source: Path) -> Path:
+    return source.with_name(f"{source.stem}-portrait-crop.png")
+
+
+def crop_portrait(source, zone: str = None, aspect: float = PORTRAIT_ASPECT) -> dict:
+    """Derive and write the portrait crop for one landscape image; runs in a worker process."""
+    import numpy as np
+    from PIL import Image
+
+    source = Path(source)
+    zone = zone or zone_for(source)
+    anchor = CROP_ANCHORS.get(zone, DEFAULT_ANCHOR)
+
+    with Image.open(source) as img:
+        img.load()
+    scale = min(1.0, WORK_LONG_EDGE / max(img.size))
+    work = img.convert("RGB").resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                                     Image.BILINEAR)
+    rgb = np.asarray(work, dtype=np.float32) / 255.0
+
+    wx, wy = best_window(energy_map(rgb), window_size(work.width, work.height, aspect), anchor)
+    cw, ch = window_size(img.width, img.height, aspect)
+    x = min(round(wx / scale), img.width - cw)
+    y = min(round(wy / scale), img.height - ch)
+
+    output = crop_path(source)
+    save_image(img.crop((x, y, x + cw, y + ch)), output, optimize=True)
+    return {
+        "source": str(source),
+        "path": str(output),
+        "zone": zone,
+        "box": (x, y, x + cw, y + ch),
+        "position": (round(x / max(img.width - cw, 1) * 100), round(y / max(img.height - ch, 1) * 100)),
+        "anchor": (round(anchor[0] * 100), round(anchor[1] * 100)),
+    }
+
+
+def crop_many(sources: list, aspect: float = PORTRAIT_ASPECT, max_workers: int = None) -> list:
+    """Crop every source across a process pool."""
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {pool.submit(crop_portrait, str(s), None, aspect): str(s) for s in sources}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"source": futures[future], "error": str(e)})
+    return sorted(results, key=lambda r: r["source"])
+
+
+def format_report(results: list) -> str:
+    lines = []
+    for r in results:
+        if "error" in r:
+            lines.append(f"  ✗ {Path(r['source']).name}: {r['error']}")
+            continue
+        x0, y0, x1, y1 = r["box"]
+        lines.append(f"  ✓ {Path(r['path']).name}: {x1 - x0}x{y1 - y0} at {r['position'][0]}% {r['position'][1]}% "
+                     f"(anchor {r['anchor'][0]}% {r['anchor'][1]}%)")
+    return "\n".join(lines)
+
+
+def portrait_from_argv(argv: list):
+    """Split `--portrait` out of argv; returns (enabled, remaining args)."""
+    return "--portrait" in argv, [a for a in argv if a != "--portrait"]
+
+
+def run_portrait(paths: list) -> list:
+    """Post-step used by the background generators: derive portrait crops, return their paths."""
+    paths = [p for p in paths if p]
+    if not paths:
+        return []
+    print(f"\nDeriving portrait crops for {len(paths)} image(s)...")
+    results = crop_many(paths)
+    print(format_report(results))
+    return [r["path"] for r in results if "error" not in r]
+
+
+def _aspect(value: str) -> float:
+    """"9:16" -> 0.5625"""
+    w, h = (int(v) for v in value.split(":"))
+    if w <= 0 or h <= 0:
+        raise ValueError(value)
+    return w / h
+
+
+def main():
+    args = sys.argv[1:]
+    aspect = option_from_argv(args, "--aspect", PORTRAIT_ASPECT, _aspect, __doc__)
+
+    sources = [Path(a) for a in args] or latest_backgrounds()
+    if not sources:
+        print(f"No landscape backgrounds found under {ASSETS_DIR}")
+        sys.exit(1)
+
+    results = crop_many(sources, aspect)
+    print(format_report(results))
+    if any("error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
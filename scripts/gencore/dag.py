@@ -0,0 +1,119 @@
+"""
+Dependency-aware scheduler for chained generation (style references).
+
+A graph is a dict mapping each node to the list of nodes it depends on.
+Every node whose prerequisites have finished is submitted immediately, so
+independent branches run side by side and a dependent node starts the moment
+its last prerequisite is done. If a prerequisite fails its dependents are
+skipped rather than run without their reference.
+
+`critical_path` walks back from the last node to finish through whichever
+prerequisite gated it, i.e. the chain that actually bounded the wall time.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def topological_order(graph: dict) -> list:
+    """Return nodes in dependency order; raises ValueError on a cycle or unknown node."""
+    order, state = [], {}
+
+    def visit(node, path):
+        if node not in graph:
+            raise ValueError(f"Unknown dependency '{node}' (needed by {path[-1]})")
+        if state.get(node) == "done":
+            return
+        if state.get(node) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [node])}")
+        state[node] = "visiting"
+        for dep in graph[node]:
+            visit(dep, path + [node])
+        state[node] = "done"
+        order.append(node)
+
+    for node in graph:
+        visit(node, [])
+    return order
+
+
+def run_graph(graph: dict, run, max_workers: int = 5) -> dict:
+    """
+    Run `run(node, finished)` for every node, respecting `graph`.
+
+    `finished` maps already-completed nodes to their return values, so a
+    node can pick up its prerequisites' outputs. `run` should return a dict
+    with a truthy "success" key. Returns {node: {"result", "start", "end",
+    "error"}} with times relative to the start of the run.
+    """
+    topological_order(graph)  # validate before submitting anything
+    t0 = time.perf_counter()
+    timings, finished = {}, {}
+    pending = dict(graph)
+    running = {}
+
+    def timed(node):
+        start = time.perf_counter() - t0
+        result = run(node, dict(finished))
+        return start, time.perf_counter() - t0, result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for node, deps in list(pending.items()):
+                failed = [d for d in deps if d in timings and timings[d]["error"]]
+                if failed:
+                    now = time.perf_counter() - t0
+                    timings[node] = {"result": None, "start": now, "end": now,
+                                     "error": f"skipped: dependency '{failed[0]}' failed"}
+                    del pending[node]
+                elif all(d in finished for d in deps):
+                    running[executor.submit(timed, node)] = node
+                    del pending[node]
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    start, end, result = future.result()
+                    error = None if result and result.get("success") else (result or {}).get("error") or "failed"
+                except Exception as e:
+                    start = end = time.perf_counter() - t0
+                    result, error = None, str(e)
+                timings[node] = {"result": result, "start": start, "end": end, "error": error}
+                if error is None:
+                    finished[node] = result
+
+    return timings
+
+
+def critical_path(graph: dict, timings: dict) -> list:
+    """Nodes on the chain that determined total wall time, first to last."""
+    ran = [n for n in timings if timings[n]["end"] > timings[n]["start"]]
+    if not ran:
+        return []
+    node = max(ran, key=lambda n: timings[n]["end"])
+    path = [node]
+    while graph.get(node):
+        node = max(graph[node], key=lambda d: timings.get(d, {}).get("end", 0))
+        if node not in timings:
+            break
+        path.append(node)
+    return path[::-1]
+
+
+def format_timeline(graph: dict, timings: dict) -> str:
+    """Per-node start/end lines followed by the critical path."""
+    lines = []
+    for node in topological_order(graph):
+        t = timings.get(node)
+        if t is None:
+            continue
+        status = "✓" if t["error"] is None else f"✗ {t['error']}"
+        lines.append(f"  {node:<18} {t['start']:6.2f}s → {t['end']:6.2f}s  {status}")
+    path = critical_path(graph, timings)
+    if path:
+        total = timings[path[-1]]["end"] - timings[path[0]]["start"]
+        lines.append(f"\nCritical path ({total:.2f}s): {' → '.join(path)}")
+    return "\n".join(lines)
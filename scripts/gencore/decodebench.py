@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Encode/decode cost benchmark for candidate background formats and sizes.
+
+LCP depends on decode time as well as bytes. For each zone's current
+background this encodes every rung of the srcset width ladder in each
+format (PNG, WebP, AVIF, progressive JPEG) at the qualities srcset.py ships,
+then measures over --repeats runs:
+
+    bytes         encoded size
+    encode        median encode time (ms)
+    decode        median full decode time (ms), Image.open + load()
+    peak          peak RSS growth while decoding (MB); each decode job runs
+                  in its own bare interpreter (only Pillow loaded) so earlier
+                  work can't hide it
+    cost          bytes over the reference link (--mbps, default Lighthouse's
+                  throttled 1.6 Mbps) + decode: the part of LCP the file
+                  itself controls
+
+Results are ranked by cost per zone and width. Jobs run one at a time by
+default so timings don't contend for cores; --workers N trades accuracy for
+speed.
+
+Requires Pillow (and numpy, via crop.py).
+
+Usage (from scripts/):
+    python -m gencore.decodebench [image ...] [--zones sky,forest] [--widths 640,1080]
+                                  [--formats png,webp,avif,jpeg] [--repeats 5] [--mbps 1.6]
+                                  [--workers 1] [--json out.json]
+"""
+import io
+import json
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from .assets import latest_backgrounds
+from .export import KB, encode
+from .options import int_list, option_from_argv, str_list
+from .srcset import QUALITY, WIDTHS, ladder
+
+FORMATS = ("png", "webp", "avif", "jpeg")
+QUALITIES = {**QUALITY, "jpeg": 80}
+DEFAULT_REPEATS = 5
+DEFAULT_MBPS = 1.6  # Lighthouse mobile throttling
+MB = 1024 * KB
+
+# Run by `python -c` with the encoded image on stdin; prints [[decode times], peak RSS growth in bytes].
+DECODE_SCRIPT = """
+import io, json, resource, sys, time
+from PIL import Image
+
+def high_water():
+    try:  # Linux: per-process peak RSS, which unlike ru_maxrss is not inherited from the parent
+        with open("/proc/self/status") as f:
+            return next(int(l.split()[1]) * 1024 for l in f if l.startswith("VmHWM"))
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # bytes on macOS
+
+Image.init()
+data = sys.stdin.buffer.read()
+try:
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")  # reset VmHWM to the current RSS
+except OSError:
+    pass
+baseline = high_water()
+times = []
+for _ in range(int(sys.argv[1])):
+    start = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+    times.append(time.perf_counter() - start)
+print(json.dumps([times, high_water() - baseline]))
+"""
+
+
+def _resized(source: str, width: int):
+    from PIL import Image
+
+    with Image.open(source) as img:
+        img = img.convert("RGB")
+        if width < img.width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        return img
+
+
+def _encode(img, fmt: str) -> bytes:
+    if fmt == "png":
+        out = io.BytesIO()
+        img.save(out, "PNG", optimize=True)
+        return out.getvalue()
+    return encode(img, fmt, QUALITIES[fmt])
+
+
+def encode_job(source: str, width: int, fmt: str, repeats: int) -> dict:
+    """Resize once and time `repeats` encodes; runs in a worker process."""
+    img = _resized(source, width)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        data = _encode(img, fmt)
+        times.append(time.perf_counter() - start)
+    return {"source": source, "width": img.width, "height": img.height, "format": fmt,
+            "data": data, "encode": statistics.median(times)}
+
+
+def decode_job(data: bytes, repeats: int) -> dict:
+    """Time `repeats` full decodes and the RSS they add, in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-c", DECODE_SCRIPT, str(repeats)], input=data,
+                          capture_output=True, check=True)
+    times, peak = json.loads(proc.stdout)
+    return {"decode": statistics.median(times), "peak": peak}
+
+
+def run(sources: list, widths: tuple = WIDTHS, formats: tuple = FORMATS, repeats: int = DEFAULT_REPEATS,
+        mbps: float = DEFAULT_MBPS, max_workers: int = 1) -> list:
+    """Benchmark every (source, rung, format); returns one row per combination."""
+    from PIL import Image
+
+    jobs = []
+    for source in sources:
+        with Image.open(source) as img:
+            rungs = sorted(set(ladder(img.width, widths)))
+            jobs.extend((str(source), width, fmt) for width in rungs for fmt in formats)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        encoded = list(pool.map(encode_job, *zip(*jobs), [repeats] * len(jobs)))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:  # each decode is its own subprocess
+        decoded = list(pool.map(decode_job, [e["data"] for e in encoded], [repeats] * len(jobs)))
+
+    rows = []
+    for e, d in zip(encoded, decoded):
+        size = len(e.pop("data"))
+        transfer = size * 8 / (mbps * 1_000_000)
+        rows.append({**e, **d, "zone": Path(e["source"]).parent.name, "bytes": size,
+                     "cost": transfer + d["decode"]})
+    return rows
+
+
+def rank(rows: list) -> dict:
+    """{zone: {width: rows sorted by cost}}."""
+    ranked = {}
+    for row in rows:
+        ranked.setdefault(row["zone"], {}).setdefault(row["width"], []).append(row)
+    return {zone: {w: sorted(rs, key=lambda r: r["cost"]) for w, rs in sorted(widths.items())}
+            for zone, widths in sorted(ranked.items())}
+
+
+def format_report(ranked: dict, mbps: float) -> str:
+    lines = []
+    for zone, widths in ranked.items():
+        lines.append(f"\n{zone}")
+        lines.append(f"  {'width':>6}  {'#':>1} {'format':<6} {'KB':>7} {'encode':>9} {'decode':>9} "
+                     f"{'peak':>8} {f'cost @{mbps:g}Mbps':>15}")
+        for width, rows in widths.items():
+            for i, r in enumerate(rows, 1):
+                lines.append(f"  {(str(width) + 'w') if i == 1 else '':>6}  {i} {r['format']:<6} "
+                             f"{r['bytes'] / KB:7.0f} {r['encode'] * 1000:7.0f}ms {r['decode'] * 1000:7.1f}ms "
+                             f"{r['peak'] / MB:6.1f}MB {r['cost'] * 1000:13.0f}ms")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    zones = option_from_argv(args, "--zones", usage=__doc__)
+    widths = option_from_argv(args, "--widths", tuple(sorted(WIDTHS)), int_list, __doc__)
+    formats = option_from_argv(args, "--formats", tuple(FORMATS), str_list, __doc__)
+    repeats = option_from_argv(args, "--repeats", DEFAULT_REPEATS, int, __doc__)
+    mbps = option_from_argv(args, "--mbps", DEFAULT_MBPS, float, __doc__)
+    workers = option_from_argv(args, "--workers", 1, int, __doc__)
+    output = option_from_argv(args, "--json", usage=__doc__)
+
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise SystemExit(f"ERROR: unknown format(s) {', '.join(sorted(unknown))} (one of {', '.join(FORMATS)})")
+    sources = [Path(a) for a in args] or latest_backgrounds()
+    if zones:
+        sources = [s for s in sources if s.parent.name in zones.split(",")]
+    if not sources:
+        print("No images to benchmark")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    rows = run(sources, widths, formats, repeats, mbps, workers)
+    print(format_report(rank(rows), mbps))
+    print(f"\n{len(rows)} combinations x {repeats} runs in {time.perf_counter() - start:.1f}s")
+    if output:
+        Path(output).write_text(json.dumps(rows, indent=2) + "\n")
+        print(f"Results: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+asyncio generation engine with bounded concurrency.
+
+Jobs are plain dicts describing one request:
+
+    {
+        "id": "forest/banana-slug",        # label used in logs and results
+        "kind": "images",                  # "images" -> generate_images
+                                           # "content" -> generate_content
+        "model": "imagen-4.0-ultra-generate-001",
+        "prompt": "...",
+        "config": types.GenerateImagesConfig(...),
+        "reference": b"...",               # optional style reference bytes
+        "reference_mime": "image/png",     # optional, defaults to image/png
+    }
+
+All requests go through the SDK's async client (`client.aio`) on the shared
+gencore connection pool, at most `concurrency` at a time, so a batch takes
+about as long as its slowest request rather than the sum of all of them.
+Transient failures are retried with backoff (see gencore/resilience.py).
+With a journal (gencore/journal.py) a job is logged as running whenever one
+of its attempts takes a slot.
+"""
+import asyncio
+import os
+import time
+
+from .cache import ImageCache
+from . import quota, trace
+from .client import get_client
+from .options import option_from_argv
+from .resilience import DEFAULT_POLICY, RetryPolicy, call_with_retry_async
+
+DEFAULT_CONCURRENCY = int(os.environ.get("GENCORE_CONCURRENCY", "5"))
+
+
+class GenerationEngine:
+    """Runs generation jobs on the async client behind a semaphore."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, cache: ImageCache = None, api_key: str = None,
+                 retry_policy: RetryPolicy = DEFAULT_POLICY, journal=None):
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.journal = journal
+        self.api_key = api_key
+        self.retry_policy = retry_policy
+        self._semaphore = None
+
+    def _slot(self) -> asyncio.Semaphore:
+        # Created lazily so the semaphore binds to the running event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def cache_key(job: dict) -> str:
+        return ImageCache.key(job["model"], job["prompt"], job.get("config"), job.get("reference"))
+
+    async def _request(self, job: dict) -> list:
+        from google.genai import types
+
+        client = get_client(self.api_key)
+
+        if job.get("kind", "images") == "images":
+            trace.mark("built")
+            response = await client.aio.models.generate_images(
+                model=job["model"],
+                prompt=job["prompt"],
+                config=job.get("config"),
+            )
+            return [g.image.image_bytes for g in response.generated_images or []]
+
+        parts = []
+        if job.get("reference"):
+            parts.append(types.Part(
+                inline_data=types.Blob(
+                    mime_type=job.get("reference_mime", "image/png"),
+                    data=job["reference"],
+                )
+            ))
+        parts.append(types.Part(text=job["prompt"]))
+        trace.mark("built")
+        response = await client.aio.models.generate_content(
+            model=job["model"],
+            contents=[types.Content(role="user", parts=parts)],
+            config=job.get("config"),
+        )
+        return [
+            part.inline_data.data
+            for candidate in response.candidates or []
+            for part in candidate.content.parts
+            if getattr(part, "inline_data", None)
+        ]
+
+    async def _request_in_slot(self, job: dict) -> list:
+        # The slot is held per attempt, so backoff sleeps don't block other jobs
+        async with self._slot():
+            trace.mark("queued")
+            if self.journal:
+                self.journal.running(job["id"])
+            return await self._request(job)
+
+    async def generate(self, job: dict, attempts: list = None):
+        """Return (images, cached) for one job; raises once retries are exhausted.
+
+        Per-attempt model/latency/error records are appended to `attempts`.
+        """
+        key = self.cache_key(job) if self.cache else None
+        if self.cache:
+            images = await asyncio.to_thread(self.cache.get, key)
+            trace.mark("cache", hit=images is not None)
+            if images is not None:
+                return images, True
+
+        # First use imports the SDK client; off the loop, and out of the queued/built spans
+        await asyncio.to_thread(get_client, self.api_key)
+        trace.mark("setup")
+        images = await call_with_retry_async(
+            job["model"], lambda: self._request_in_slot(job), self.retry_policy, attempts
+        )
+
+        if images:
+            await asyncio.to_thread(quota.count_images, job["model"], len(images))
+        if images and self.cache:
+            await asyncio.to_thread(self.cache.put, key, images)
+        return images, False
+
+    async def run_job(self, job: dict) -> dict:
+        """Run one job and wrap the outcome in a result dict instead of raising."""
+        result = {"id": job["id"], "job": job, "success": False, "images": [],
+                  "cached": False, "error": None, "elapsed": 0.0, "attempts": [],
+                  "payload_bytes": len(job.get("reference") or b"") + len(job["prompt"].encode("utf-8"))}
+        start = time.perf_counter()
+        try:
+            result["images"], result["cached"] = await self.generate(job, result["attempts"])
+            result["success"] = bool(result["images"])
+            if not result["success"]:
+                result["error"] = "No image generated"
+        except Exception as e:
+            result["error"] = str(e)
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    async def run(self, jobs):
+        """Yield result dicts for `jobs` in completion order."""
+        async for result in stream([self.run_job(job) for job in jobs]):
+            yield result
+
+
+async def stream(coros):
+    """Yield the results of `coros` as each one finishes."""
+    for next_done in asyncio.as_completed([asyncio.ensure_future(c) for c in coros]):
+        yield await next_done
+
+
+def concurrency_from_argv(argv: list, default: int = DEFAULT_CONCURRENCY):
+    """Split `--concurrency N` out of argv; returns (concurrency, remaining args)."""
+    args = list(argv)
+    return option_from_argv(args, "--concurrency", default, int), args
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Budget-driven AVIF/WebP export for generated assets.
+
+specs/PERFORMANCE_BUDGET.md caps each image type per breakpoint:
+
+    Background panel   300 KB desktop / 150 KB mobile
+    Character          200 KB desktop / 100 KB mobile
+
+For every source image, variant and format this binary-searches the encoder
+quality for the highest setting that still fits the byte budget, strips
+metadata (EXIF, ICC, text chunks) and writes `<stem>-<variant>.<ext>` next
+to the source. Jobs are spread over all cores with a process pool.
+Requires Pillow (with AVIF support for .avif output).
+
+Usage (from scripts/):
+    python -m gencore.export <image> [<image> ...] [--kind background|character]
+                                                  [--formats avif,webp]
+
+Generators run this as a post-step when given --export. Background
+generators also take --portrait, which derives portrait crops first
+(gencore/crop.py) and, with --export, uses them for the mobile variants.
+Sprite generators take --matte, which keys out the plain backdrop
+(gencore/matte.py) so --export works from the transparent cutouts.
+"""
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .fsutil import atomic_write
+from .options import option_from_argv, str_list
+
+KB = 1024
+
+BUDGETS = {
+    "background": {"desktop": 300 * KB, "mobile": 150 * KB},
+    "character": {"desktop": 200 * KB, "mobile": 100 * KB},
+}
+
+# Long edge of each variant; backgrounds are generated at 2560x1440
+VARIANT_EDGES = {
+    "background": {"desktop": 2560, "mobile": 1280},
+    "character": {"desktop": 1024, "mobile": 512},
+}
+
+FORMATS = ("avif", "webp")
+QUALITY_RANGE = (20, 95)
+
+
+def _clean(img, long_edge: int):
+    """Resize to the variant's long edge and drop all metadata."""
+    from PIL import Image
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+    scale = long_edge / max(img.size)
+    if scale < 1:
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+    clean = Image.new(img.mode, img.size)
+    clean.paste(img)
+    return clean
+
+
+def encode(img, fmt: str, quality: int) -> bytes:
+    out = io.BytesIO()
+    if fmt == "avif":
+        img.save(out, "AVIF", quality=quality, speed=6)
+    elif fmt == "webp":
+        # method 6's exhaustive alpha filtering takes seconds per sprite for ~no gain
+        img.save(out, "WEBP", quality=quality, method=4 if img.mode == "RGBA" else 6)
+    elif fmt == "jpeg":
+        img.convert("RGB").save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return out.getvalue()
+
+
+def fit_to_budget(img, fmt: str, budget: int, quality_range: tuple = QUALITY_RANGE):
+    """Highest quality whose encoding fits `budget`; returns (quality, data, fits)."""
+    lo, hi = quality_range
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        data = encode(img, fmt, mid)
+        if len(data) <= budget:
+            best = (mid, data)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    if best is None:
+        # Even the floor quality is over budget: ship it but flag it
+        return quality_range[0], encode(img, fmt, quality_range[0]), False
+    return best[0], best[1], True
+
+
+def export_variant(source: str, kind: str, variant: str, fmt: str) -> dict:
+    """Encode one (source, variant, format) combination; runs in a worker process."""
+    from PIL import Image
+
+    budget = BUDGETS[kind][variant]
+    with Image.open(source) as img:
+        img = _clean(img, VARIANT_EDGES[kind][variant])
+    quality, data, fits = fit_to_budget(img, fmt, budget)
+
+    source = Path(source)
+    output = source.with_name(f"{source.stem}-{variant}.{fmt}")
+    atomic_write(output, data)
+    return {
+        "source": str(source),
+        "path": str(output),
+        "kind": kind,
+        "variant": variant,
+        "format": fmt,
+        "width": img.width,
+        "height": img.height,
+        "quality": quality,
+        "bytes": len(data),
+        "budget": budget,
+        "fits": fits,
+    }
+
+
+def export_many(sources: list, kind: str = "background", formats: tuple = FORMATS, max_workers: int = None,
+                variants: tuple = None) -> list:
+    """Export every source in every variant and format across a process pool."""
+    variants = variants or tuple(BUDGETS[kind])
+    jobs = [(str(s), kind, variant, fmt) for s in sources for variant in variants for fmt in formats]
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {pool.submit(export_variant, *job): job for job in jobs}
+        for future in as_completed(futures):
+            source, _, variant, fmt = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"source": source, "variant": variant, "format": fmt, "error": str(e)})
+    return sorted(results, key=lambda r: (r["source"], r["variant"], r["format"]))
+
+
+def format_report(results: list) -> str:
+    lines = []
+    for r in results:
+        if "error" in r:
+            lines.append(f"  ✗ {Path(r['source']).name} {r['variant']}/{r['format']}: {r['error']}")
+            continue
+        mark = "✓" if r["fits"] else "✗ OVER BUDGET"
+        lines.append(f"  {mark} {Path(r['path']).name}: {r['bytes'] / KB:.0f} KB / {r['budget'] / KB:.0f} KB "
+                     f"(q{r['quality']}, {r['width']}x{r['height']})")
+    return "\n".join(lines)
+
+
+def export_from_argv(argv: list):
+    """Split `--export` out of argv; returns (enabled, remaining args)."""
+    return "--export" in argv, [a for a in argv if a != "--export"]
+
+
+def run_export(paths: list, kind: str, mobile: list = None) -> list:
+    """
+    Post-step used by the generators: export `paths` and print the report.
+    If `mobile` (e.g. portrait crops) is given, the mobile variants are cut
+    from those instead of the landscape sources.
+    """
+    paths = [p for p in paths if p]
+    if not paths:
+        return []
+    print(f"\nExporting {len(paths)} image(s) to {', '.join(FORMATS)} within the {kind} budget...")
+    if mobile:
+        results = export_many(paths, kind, variants=("desktop",)) + export_many(mobile, kind, variants=("mobile",))
+    else:
+        results = export_many(paths, kind)
+    print(format_report(results))
+    return results
+
+
+def main():
+    args = sys.argv[1:]
+    kind = option_from_argv(args, "--kind", "background", usage=__doc__)
+    formats = option_from_argv(args, "--formats", FORMATS, str_list, __doc__)
+
+    if not args or kind not in BUDGETS:
+        print("Usage: python -m gencore.export <image> [<image> ...] [--kind background|character] "
+              "[--formats avif,webp]")
+        sys.exit(1)
+
+    results = export_many(args, kind, formats)
+    print(format_report(results))
+    if any("error" in r or not r["fits"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Generative Language API image endpoints.
+
+Answers `models/*:predict` (Imagen generate_images) and
+`models/*:generateContent` (Gemini image generation) with a valid PNG (a small
+solid one, or random noise of a given size), and counts requests and TCP
+connections so connection reuse can be measured offline. Batch jobs
+(`models/*:batchGenerateContent`, then `GET batches/<id>` or `GET batches`) are accepted too
+and finish `batch_delay` seconds after submission with one inlined
+generateContent response per request (gencore/jobs.py). Latency is a
+constant or a distribution (see `latency_sampler`), and a fraction of
+requests can be answered with 429 + Retry-After or a 500 to exercise the
+retry path. gencore/throughput.py uses it to benchmark the generators.
+
+Usage:
+    python -m gencore.fake_server [requests] [workers]    (from scripts/)
+
+Runs the same batch twice, once with a fresh genai.Client per request and
+once with the shared gencore client, and prints connections opened and
+per-request overhead for each.
+"""
+import base64
+import itertools
+import json
+import math
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .options import fail, parse_value
+
+
+def make_png(width: int = 64, height: int = 36, noise: bool = False) -> bytes:
+    """Build a solid-colour (or incompressible noise) RGB PNG without any imaging dependency."""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    if noise:
+        raw = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+    else:
+        raw = (b"\x00" + bytes((200, 160, 90)) * width) * height
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+def payload_png(kb: float) -> bytes:
+    """A 16:9 noise PNG of roughly `kb` KB, standing in for a real generation."""
+    height = max(1, round((kb * 1024 / 3 * 9 / 16) ** 0.5))
+    return make_png(max(1, round(height * 16 / 9)), height, noise=True)
+
+
+def latency_sampler(spec) -> callable:
+    """
+    Seconds-to-wait sampler from a number or a spec string:
+        "0.5"                   constant
+        "uniform:0.2,1.5"       uniform between the bounds
+        "lognormal:0.8,0.5"     median 0.8 s, sigma 0.5 (long right tail)
+        "exp:0.8"               exponential with mean 0.8 s
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return lambda: float(spec)
+    kind, _, params = str(spec).partition(":")
+    if not params:
+        return lambda: float(kind)
+    values = [float(v) for v in params.split(",")]
+    if kind == "uniform":
+        return lambda: random.uniform(*values)
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution '{spec}' (constant, uniform:, lognormal: or exp:)")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients can reuse sockets
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+            self.server.stats["request_bytes"] += len(body)
+
+        delay = self.server.latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < self.server.rate_limit_rate:
+            self.server.count("rate_limited")
+            self._send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}},
+                            {"Retry-After": str(self.server.retry_after)})
+            return
+        if roll < self.server.rate_limit_rate + self.server.error_rate:
+            self.server.count("errors")
+            self._send_json(500, {"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}})
+            return
+
+        image_b64 = base64.b64encode(self.server.png).decode("ascii")
+        if self.path.split("?")[0].endswith(":batchGenerateContent"):
+            payload = self.server.submit_batch(self.path.split("?")[0], json.loads(body or b"{}"))
+        elif self.path.split("?")[0].endswith(":predict"):
+            request = json.loads(body or b"{}")
+            count = request.get("parameters", {}).get("sampleCount", 1)
+            payload = {"predictions": [
+                {"bytesBase64Encoded": image_b64, "mimeType": "image/png"}
+                for _ in range(count)
+            ]}
+        elif self.path.split("?")[0].endswith(":generateContent"):
+            request = json.loads(body or b"{}")
+            payload = _content_payload(image_b64, request.get("generationConfig", {}).get("candidateCount", 1))
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {self.path}", "status": "NOT_FOUND"}})
+            return
+
+        self._send_json(200, payload)
+
+    def do_GET(self):
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+        name = self.path.split("?")[0].split("/v1beta/")[-1].lstrip("/")
+        if name == "batches":
+            self._send_json(200, {"operations": self.server.list_batches()})
+            return
+        batch = self.server.batch_status(name)
+        if batch is None:
+            self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {self.path}", "status": "NOT_FOUND"}})
+            return
+        self._send_json(200, batch)
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _content_payload(image_b64: str, count: int) -> dict:
+    return {"candidates": [{
+        "content": {
+            "role": "model",
+            "parts": [{"inlineData": {"mimeType": "image/png", "data": image_b64}}],
+        },
+        "finishReason": "STOP",
+    } for _ in range(count)]}
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FakeImageServer(ThreadingHTTPServer):
+    """Threaded fake endpoint; use as a context manager to run it in the background."""
+
+    daemon_threads = True
+    request_queue_size = 128  # listen backlog; the socketserver default of 5 caps fan-out
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency=0.0, png: bytes = None,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1, error_rate: float = 0.0,
+                 batch_delay: float = 1.0):
+        super().__init__((host, port), _Handler)
+        self.latency = latency_sampler(latency)
+        self.rate_limit_rate = rate_limit_rate  # fraction of requests answered with 429
+        self.error_rate = error_rate  # fraction answered with 500
+        self.retry_after = retry_after
+        self.png = png or make_png()
+        self.stats_lock = threading.Lock()
+        self.batch_delay = batch_delay  # seconds from batch submission to results
+        self.stats = {"connections": 0, "requests": 0, "request_bytes": 0, "rate_limited": 0, "errors": 0,
+                      "batches": 0, "batch_requests": 0}
+        self._batches = {}
+        self._batch_ids = itertools.count(1)
+        self._thread = None
+
+    def count(self, stat: str):
+        with self.stats_lock:
+            self.stats[stat] += 1
+
+    def submit_batch(self, path: str, body: dict) -> dict:
+        """Accept a batchGenerateContent job; returns its (pending) batch resource."""
+        requests = body.get("batch", {}).get("inputConfig", {}).get("requests", {}).get("requests", [])
+        name = f"batches/fake-{next(self._batch_ids)}"
+        with self.stats_lock:
+            self.stats["batches"] += 1
+            self.stats["batch_requests"] += len(requests)
+            self._batches[name] = {
+                "model": path.split("/")[-1].split(":")[0],
+                "display_name": body.get("batch", {}).get("displayName"),
+                "counts": [r.get("request", {}).get("generationConfig", {}).get("candidateCount", 1) for r in requests],
+                "created": time.time(),
+            }
+        return self.batch_status(name)
+
+    def list_batches(self) -> list:
+        """Every batch resource, newest first, as `GET batches` returns them (one page)."""
+        with self.stats_lock:
+            names = list(self._batches)
+        return [self.batch_status(name) for name in reversed(names)]
+
+    def batch_status(self, name: str) -> dict:
+        """The batch resource as `GET batches/<id>` returns it; None for an unknown batch."""
+        batch = self._batches.get(name)
+        if batch is None:
+            return None
+        elapsed = time.time() - batch["created"]
+        done = elapsed >= self.batch_delay
+        metadata = {
+            "name": name,
+            "model": f"models/{batch['model']}",
+            "displayName": batch["display_name"],
+            "state": "BATCH_STATE_SUCCEEDED" if done else
+                     "BATCH_STATE_RUNNING" if elapsed >= self.batch_delay / 2 else "BATCH_STATE_PENDING",
+            "createTime": _timestamp(batch["created"]),
+        }
+        if done:
+            image_b64 = base64.b64encode(self.png).decode("ascii")
+            metadata["endTime"] = _timestamp(batch["created"] + self.batch_delay)
+            metadata["output"] = {"inlinedResponses": {"inlinedResponses": [
+                {"response": _content_payload(image_b64, count)} for count in batch["counts"]
+            ]}}
+        return {"name": name, "metadata": metadata, "done": done}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def _run_batch(server: FakeImageServer, requests: int, workers: int, shared: bool) -> dict:
+    from google import genai
+    from google.genai import types
+
+    import gencore.client as core
+
+    def one(_):
+        if shared:
+            client = core.get_client(api_key="fake-key")
+        else:
+            client = genai.Client(api_key="fake-key", http_options=types.HttpOptions(base_url=server.base_url))
+        response = client.models.generate_images(
+            model="imagen-4.0-ultra-generate-001",
+            prompt="benchmark",
+            config=types.GenerateImagesConfig(number_of_images=1),
+        )
+        return len(response.generated_images[0].image.image_bytes)
+
+    os.environ["GENCORE_BASE_URL"] = server.base_url
+    core.close_client()
+    before = dict(server.stats)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    core.close_client()
+
+    return {
+        "mode": "shared client" if shared else "client per request",
+        "requests": server.stats["requests"] - before["requests"],
+        "connections": server.stats["connections"] - before["connections"],
+        "elapsed": elapsed,
+        "per_request_ms": elapsed / requests * 1000,
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) > 2:
+        fail(f"unexpected argument '{args[2]}'", __doc__)
+    requests = parse_value("requests", args[0], int, __doc__) if args else 50
+    workers = parse_value("workers", args[1], int, __doc__) if len(args) > 1 else 5
+
+    print("=" * 70)
+    print("CONNECTION REUSE BENCHMARK (local fake endpoint)")
+    print(f"Requests: {requests}, workers: {workers}")
+    print("=" * 70)
+
+    with FakeImageServer() as server:
+        for shared in (False, True):
+            r = _run_batch(server, requests, workers, shared)
+            print(f"  {r['mode']:<20} {r['requests']:>4} requests  "
+                  f"{r['connections']:>4} connections  "
+                  f"{r['elapsed']:.2f}s  ({r['per_request_ms']:.1f} ms/request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+File-system helpers shared by the generators and the gencore modules.
+
+`atomic_write` is how every output reaches its final path (images,
+candidates, derived variants, previews, manifests, batch state): a crash
+leaves at most a stray .tmp file next to it, never a truncated image that a
+later up-to-date check would take for a finished one. `save_image` does the
+same for a PIL image, and `temp_path` names the temp file for writers that
+stream to disk.
+"""
+import io
+import os
+import threading
+from pathlib import Path
+
+
+def temp_path(path) -> Path:
+    """A hidden temp name next to `path`, unique per process and thread; os.replace it into place when done."""
+    path = Path(path)
+    return path.with_name(f".{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+
+
+def atomic_write(path, data: bytes):
+    """Write `data` to `path` via a temp file in the same directory, fsync and rename."""
+    tmp = temp_path(path)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def save_image(image, path, format: str = None, **params):
+    """Encode a PIL image in memory (format from the suffix unless given) and atomic_write it."""
+    from PIL import Image
+
+    path = Path(path)
+    out = io.BytesIO()
+    image.save(out, format or Image.registered_extensions()[path.suffix.lower()], **params)
+    atomic_write(path, out.getvalue())
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Bulk job files: generate every request in a JSONL file, streaming one result line per job.
+
+Each line of the job file is one request; only the prompt is required:
+
+    {"id": "forest-alt", "prompt": "...", "model": "imagen-4.0-ultra-generate-001",
+     "aspect_ratio": "16:9", "reference": "public/assets/forest/forest-background-v2.png",
+     "candidates": 2, "output": "assets/raw/jobs/forest-alt.png"}
+
+`prompt_ref` instead of `prompt` takes the prompt of a build node
+(gencore/build.py: `scenes/forest`, `panels/forest-bg`,
+`sprites/forest/banana-slug`, `backgrounds/sky`) as written in the script's
+table. The id defaults to the line number, the model to DEFAULT_MODEL,
+candidates to 1 (at most 4) and the output to assets/raw/jobs/<id>.png;
+relative paths are from the project root. Imagen models go through
+generate_images; other models through generate_content, with the reference
+image (if any) sent ahead of the prompt.
+
+Results are appended to <jobs>.results.jsonl (or --results) as each job
+finishes, and flushed line by line:
+
+    {"id": "forest-alt", "status": "ok", "path": "assets/raw/jobs/forest-alt.png", "candidates": [...],
+     "model": "...", "cached": false, "attempts": 1, "latency": 8.21}
+    {"id": "7", "status": "failed", "error": "..."}
+    {"id": "j1", "line": 9, "status": "invalid", "error": "duplicate id (also on an earlier line)"}
+
+Jobs that already have an "ok" line, or sit in a submitted batch, are
+skipped, and a line that is still invalid isn't reported again: rerunning
+the same command after an interruption picks up where it stopped.
+
+`run` sends each job online through the engine (gencore/engine.py, with the
+image cache). The file is read lazily and at most WINDOW × concurrency jobs
+are in flight; images are written and dropped as each one finishes, so
+memory stays flat however long the file is.
+
+`submit` sends the generate_content jobs to the batch API instead
+(client.batches: half the online price, results within 24 hours), in
+batches of --batch-size per model, recorded in <results>.batches.json under
+a unique display name before each batch is created. Imagen models can't be
+batched on the Gemini API, so those jobs run online as with `run`, in the
+same pass over the file. `poll` checks the pending batches once,
+or with --wait until all are done (backing off from --interval up to
+MAX_POLL_INTERVAL seconds), and writes the results of finished ones.
+`submit --wait` submits and then polls.
+
+Usage (from scripts/):
+    python -m gencore.jobs run <jobs.jsonl> [--results out.jsonl] [--concurrency 5] [--no-cache] [--refresh]
+    python -m gencore.jobs submit <jobs.jsonl> [--results out.jsonl] [--batch-size 100] [--wait]
+    python -m gencore.jobs poll <jobs.jsonl> [--results out.jsonl] [--wait] [--interval 30]
+"""
+import asyncio
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .fsutil import atomic_write
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = SCRIPTS_DIR.parent
+DEFAULT_MODEL = "imagen-4.0-ultra-generate-001"
+DEFAULT_OUTPUT_DIR = "assets/raw/jobs"
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_POLL_INTERVAL = 30.0
+MAX_POLL_INTERVAL = 300.0
+POLL_BACKOFF = 1.5
+WINDOW = 2  # jobs read ahead per concurrency slot
+FIELDS = {"id", "prompt", "prompt_ref", "model", "aspect_ratio", "reference", "candidates", "output"}
+FINISHED_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+FAILED_STATES = {"JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+_graph = None
+
+
+def _relative(path) -> str:
+    path = Path(path).resolve()
+    return str(path.relative_to(PROJECT_ROOT)) if PROJECT_ROOT in path.parents else str(path)
+
+
+def _project_path(path) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def prompt_for(ref: str) -> str:
+    """The prompt behind a build node id, read from the generator's source."""
+    global _graph
+    if _graph is None:
+        from .build import graph_nodes  # parses every generator; only when a job refers to one
+        _graph = graph_nodes()
+    node = _graph.get(ref)
+    if node is None or node["action"] != "generate":
+        raise ValueError(f"unknown prompt_ref '{ref}' (a build node such as scenes/forest or panels/forest-bg)")
+    entry = node["recipe"]["entry"]
+    prompt = entry.get("prompt") if isinstance(entry, dict) else entry
+    if not isinstance(prompt, str):
+        raise ValueError(f"prompt_ref '{ref}' has no literal prompt in its script")
+    return prompt
+
+
+def is_imagen(model: str) -> bool:
+    return model.startswith("imagen")
+
+
+def parse_job(line_number: int, record: dict) -> dict:
+    """A job-file line with defaults filled in; raises ValueError for an invalid one."""
+    from .candidates import MAX_CANDIDATES
+
+    if not isinstance(record, dict):
+        raise ValueError("a job must be a JSON object")
+    unknown = set(record) - FIELDS
+    if unknown:
+        raise ValueError(f"unknown field(s) {', '.join(sorted(unknown))}")
+    if ("prompt" in record) == ("prompt_ref" in record):
+        raise ValueError("give exactly one of prompt, prompt_ref")
+    job_id = str(record.get("id", line_number))
+    prompt = record["prompt"] if "prompt" in record else prompt_for(record["prompt_ref"])
+    model = record.get("model", DEFAULT_MODEL)
+    candidates = record.get("candidates", 1)
+    if not isinstance(candidates, int) or not 1 <= candidates <= MAX_CANDIDATES:
+        raise ValueError(f"candidates must be between 1 and {MAX_CANDIDATES}")
+    reference = record.get("reference")
+    if reference is not None:
+        if is_imagen(model):
+            raise ValueError(f"{model} takes no reference image; use a generate_content model")
+        if not _project_path(reference).exists():
+            raise ValueError(f"reference image not found: {reference}")
+    return {
+        "id": job_id, "line": line_number, "prompt": prompt, "model": model,
+        "aspect_ratio": record.get("aspect_ratio"), "reference": reference, "candidates": candidates,
+        "output": str(_project_path(record.get("output", f"{DEFAULT_OUTPUT_DIR}/{job_id}.png"))),
+    }
+
+
+def read_jobs(path, skip: set = ()):
+    """
+    Yield a job dict per line of `path`, or {"id", "error"} for a line that
+    isn't a valid job. Lines are read one at a time; blank lines and ids in
+    `skip` are passed over.
+    """
+    seen = set()
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = None
+            try:
+                record = json.loads(line)
+                job = parse_job(line_number, record)
+            except (json.JSONDecodeError, ValueError) as e:
+                job_id = record.get("id", line_number) if isinstance(record, dict) else line_number
+                yield {"id": str(job_id), "line": line_number, "error": str(e)}
+                continue
+            if job["id"] in seen:
+                yield {"id": job["id"], "line": line_number, "error": "duplicate id (also on an earlier line)"}
+                continue
+            seen.add(job["id"])
+            if job["id"] not in skip:
+                yield job
+
+
+def content_config(job: dict):
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        response_modalities=["IMAGE", "TEXT"],
+        candidate_count=job["candidates"] if job["candidates"] > 1 else None,
+        image_config=types.ImageConfig(aspect_ratio=job["aspect_ratio"]) if job["aspect_ratio"] else None,
+    )
+
+
+def engine_job(job: dict) -> dict:
+    """The engine request for a job (gencore/engine.py), with its reference image loaded."""
+    from google.genai import types
+
+    request = {"id": job["id"], "model": job["model"], "prompt": job["prompt"]}
+    if is_imagen(job["model"]):
+        request["kind"] = "images"
+        request["config"] = types.GenerateImagesConfig(number_of_images=job["candidates"],
+                                                       aspect_ratio=job["aspect_ratio"])
+        return request
+    request["kind"] = "content"
+    request["config"] = content_config(job)
+    if job["reference"]:
+        from .reference import prepare_reference
+
+        reference = prepare_reference(_project_path(job["reference"]))
+        request["reference"], request["reference_mime"] = reference["data"], reference["mime_type"]
+    return request
+
+
+def batch_request(job: dict):
+    """A job as one inlined request of a batch."""
+    from google.genai import types
+
+    request = engine_job(job)
+    parts = []
+    if request.get("reference"):
+        parts.append(types.Part(inline_data=types.Blob(mime_type=request["reference_mime"],
+                                                       data=request["reference"])))
+    parts.append(types.Part(text=request["prompt"]))
+    return types.InlinedRequest(contents=[types.Content(role="user", parts=parts)], config=request["config"],
+                                metadata={"id": job["id"]})
+
+
+def save_images(job: dict, images: list) -> dict:
+    """Write a job's images (best candidate at its output path); returns the result fields."""
+    from .candidates import save_candidates
+
+    Path(job["output"]).parent.mkdir(parents=True, exist_ok=True)
+    saved = save_candidates(images[:job["candidates"]], job["output"])
+    return {"path": _relative(saved["path"]),
+            "candidates": [_relative(c["path"]) for c in saved["candidates"]]}
+
+
+class ResultLog:
+    """Append-only JSONL of job results; every line is flushed and fsynced as it is written."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.counts = {"ok": 0, "failed": 0, "invalid": 0}
+        self._file = None
+        self._lock = threading.Lock()  # submit writes from the job-reading thread too
+        self._reported = None  # (line, error) of invalid lines already in the log
+
+    def _records(self):
+        if not self.path.exists():
+            return
+        for line in self.path.read_text().splitlines():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn write from a crash
+
+    def finished(self) -> set:
+        """Ids with an "ok" line from an earlier run."""
+        return {record["id"] for record in self._records() if record.get("status") == "ok"}
+
+    def write(self, result: dict):
+        line = json.dumps({k: v for k, v in result.items() if v is not None})
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a")
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.counts[result["status"]] += 1
+        detail = result.get("path") or result.get("error", "")
+        print(f"  {'✓' if result['status'] == 'ok' else '✗'} {result['id']:<28} {detail}")
+
+    def failed(self, job: dict, error, **fields):
+        self.write({"id": job["id"], "status": "failed", "error": str(error)[:500], **fields})
+
+    def invalid(self, job: dict):
+        """Report a line that isn't a valid job, unless an earlier run already reported it as is."""
+        if self._reported is None:
+            self._reported = {(r.get("line"), r.get("error")) for r in self._records() if r.get("status") == "invalid"}
+        error = str(job["error"])[:500]
+        if (job["line"], error) not in self._reported:
+            self._reported.add((job["line"], error))
+            self.write({"id": job["id"], "line": job["line"], "status": "invalid", "error": error})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class BatchState:
+    """
+    <results>.batches.json: the submitted batches still waiting for results,
+    keyed by display name. An entry is written before its batch is created,
+    so its "name" stays None if the process died before the API answered.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.batches = json.loads(self.path.read_text())["batches"] if self.path.exists() else []
+
+    def pending_ids(self) -> set:
+        return {job["id"] for batch in self.batches for job in batch["jobs"]}
+
+    def add(self, batch: dict):
+        self.batches.append(batch)
+        self._save()
+
+    def named(self, display_name: str, name: str):
+        """Fill in the API's batch name once create (or a lookup) returned it."""
+        for batch in self.batches:
+            if batch["display_name"] == display_name:
+                batch["name"] = name
+        self._save()
+
+    def remove(self, display_name: str):
+        self.batches = [b for b in self.batches if b["display_name"] != display_name]
+        self._save()
+
+    def _save(self):
+        if self.batches:
+            atomic_write(self.path, json.dumps({"batches": self.batches}, indent=2).encode())
+        else:
+            self.path.unlink(missing_ok=True)
+
+
+async def _run_one(engine, job: dict, log: ResultLog):
+    try:
+        request = await asyncio.to_thread(engine_job, job)
+        result = await engine.run_job(request)
+        if not result["success"]:
+            log.failed(job, result["error"], model=job["model"], attempts=len(result["attempts"]) or None)
+            return
+        saved = await asyncio.to_thread(save_images, job, result["images"])
+    except Exception as e:
+        log.failed(job, e, model=job["model"])
+        return
+    log.write({"id": job["id"], "status": "ok", **saved, "model": job["model"], "cached": result["cached"],
+               "attempts": len(result["attempts"]), "latency": round(result["elapsed"], 2)})
+
+
+async def run_online(jobs, engine, log: ResultLog):
+    """
+    Run `jobs` (an iterator) through `engine`, holding at most WINDOW ×
+    concurrency in flight. The iterator is advanced in a worker thread, so
+    reading the file (and, for submit, creating batches) doesn't stall the loop.
+    """
+    from .client import aclose_client
+
+    in_flight = set()
+    jobs = iter(jobs)
+    try:
+        while (job := await asyncio.to_thread(next, jobs, None)) is not None:
+            if "error" in job:
+                log.invalid(job)
+                continue
+            while len(in_flight) >= engine.concurrency * WINDOW:
+                _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            in_flight.add(asyncio.ensure_future(_run_one(engine, job, log)))
+        if in_flight:
+            await asyncio.wait(in_flight)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await aclose_client()  # release pooled sockets while their event loop is still running
+
+
+def submit(jobs, log: ResultLog, state: BatchState, batch_size: int, api_key: str = None):
+    """
+    Submit the generate_content jobs in batches of `batch_size` per model,
+    yielding the Imagen jobs (and invalid lines), which have to run online,
+    as they are read.
+    """
+    from .client import get_client
+
+    client = get_client(api_key)
+    chunks = {}
+    run = f"gencore-{log.path.stem.split('.')[0]}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    counter = itertools.count(1)
+
+    def send(model: str):
+        chunk = chunks.pop(model)
+        display_name = f"{run}-{next(counter)}"
+        state.add({"name": None, "display_name": display_name, "model": model,
+                   "submitted": datetime.now().isoformat(timespec="seconds"),
+                   "jobs": [{k: job[k] for k in ("id", "output", "candidates")} for job in chunk]})
+        try:
+            batch = client.batches.create(model=model, src=[batch_request(job) for job in chunk],
+                                          config={"display_name": display_name})
+        except Exception as e:
+            state.remove(display_name)
+            for job in chunk:
+                log.failed(job, f"batch submit failed: {e}", model=model)
+            return
+        state.named(display_name, batch.name)
+        print(f"  → {batch.name}: {len(chunk)} job(s) on {model}")
+
+    for job in jobs:
+        if "error" in job or is_imagen(job["model"]):
+            yield job
+            continue
+        chunks.setdefault(job["model"], []).append(job)
+        if len(chunks[job["model"]]) >= batch_size:
+            send(job["model"])
+    for model in list(chunks):
+        send(model)
+
+
+def _collect(batch: dict, response, log: ResultLog):
+    """Write the result of every job in a finished batch (responses come back in request order)."""
+    responses = (response.dest.inlined_responses or []) if response.dest else []
+    for job, inlined in itertools.zip_longest(batch["jobs"], responses):
+        if job is None:
+            break
+        fields = {"model": batch["model"], "batch": batch["name"]}
+        if inlined is None or inlined.error:
+            log.failed(job, getattr(inlined and inlined.error, "message", None) or "no response in batch", **fields)
+            continue
+        images = [part.inline_data.data
+                  for candidate in inlined.response.candidates or []
+                  for part in candidate.content.parts or []
+                  if getattr(part, "inline_data", None)]
+        if not images:
+            log.failed(job, "No image generated", **fields)
+            continue
+        try:
+            saved = save_images(job, images)
+        except Exception as e:
+            log.failed(job, e, **fields)
+            continue
+        log.write({"id": job["id"], "status": "ok", **saved, **fields})
+
+
+def _find_unnamed(client, log: ResultLog, state: BatchState):
+    """Look up batches whose submit was interrupted by display name; ones the API never got count as failed."""
+    unnamed = {b["display_name"]: b for b in state.batches if not b["name"]}
+    if not unnamed:
+        return
+    for remote in client.batches.list():
+        if remote.display_name in unnamed:
+            state.named(remote.display_name, remote.name)
+            del unnamed[remote.display_name]
+            if not unnamed:
+                return
+    for display_name, batch in unnamed.items():
+        for job in batch["jobs"]:
+            log.failed(job, "batch submit was interrupted and never reached the API; rerun submit",
+                       model=batch["model"])
+        state.remove(display_name)
+
+
+def poll(log: ResultLog, state: BatchState, wait: bool = False, interval: float = DEFAULT_POLL_INTERVAL,
+         api_key: str = None):
+    """Check each pending batch and collect the finished ones; with `wait`, until none are left."""
+    from .client import get_client
+
+    client = get_client(api_key)
+    _find_unnamed(client, log, state)
+    delay = interval
+    while state.batches:
+        for batch in list(state.batches):
+            response = client.batches.get(name=batch["name"])
+            status = response.state.name if response.state else "JOB_STATE_UNSPECIFIED"
+            if status in FINISHED_STATES:
+                _collect(batch, response, log)
+                state.remove(batch["display_name"])
+            elif status in FAILED_STATES:
+                error = getattr(response.error, "message", None) or status
+                for job in batch["jobs"]:
+                    log.failed(job, f"batch {status.removeprefix('JOB_STATE_').lower()}: {error}",
+                               model=batch["model"], batch=batch["name"])
+                state.remove(batch["display_name"])
+            else:
+                print(f"  … {batch['name']}: {status.removeprefix('JOB_STATE_').lower()} "
+                      f"({len(batch['jobs'])} job(s), submitted {batch['submitted']})")
+        if not wait or not state.batches:
+            break
+        time.sleep(delay)
+        delay = min(delay * POLL_BACKOFF, MAX_POLL_INTERVAL)
+
+
+def main():
+    from .cache import cache_from_argv
+    from .engine import GenerationEngine, concurrency_from_argv
+    from .options import option_from_argv
+
+    args = sys.argv[1:]
+    concurrency, args = concurrency_from_argv(args)
+    cache, args = cache_from_argv(args)
+    results = option_from_argv(args, "--results", usage=__doc__)
+    batch_size = option_from_argv(args, "--batch-size", DEFAULT_BATCH_SIZE, int, __doc__)
+    interval = option_from_argv(args, "--interval", DEFAULT_POLL_INTERVAL, float, __doc__)
+    wait = "--wait" in args
+    args = [a for a in args if a != "--wait"]
+    if len(args) != 2 or args[0] not in ("run", "submit", "poll") or any(a.startswith("-") for a in args):
+        print(__doc__.split("Usage (from scripts/):")[1].rstrip())
+        sys.exit(1)
+    command, path = args
+    path = Path(path)
+    if not path.exists():
+        print(f"ERROR: job file not found: {path}")
+        sys.exit(1)
+
+    log = ResultLog(Path(results) if results else path.with_name(f"{path.stem}.results.jsonl"))
+    state = BatchState(log.path.with_name(f"{log.path.stem}.batches.json"))
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        print("ERROR: GOOGLE_API_KEY not found in environment")
+        sys.exit(1)
+
+    if command == "poll":
+        jobs = iter(())
+        print(f"poll: {len(state.batches)} batch(es) pending in {_relative(state.path)}")
+    else:
+        skip = log.finished() | state.pending_ids()
+        jobs = read_jobs(path, skip)
+        print(f"{command}: {path} → {_relative(log.path)}"
+              f"{f' ({len(skip)} job(s) done or pending, skipped)' if skip else ''}")
+    start = time.perf_counter()
+    try:
+        if command == "submit":
+            jobs = submit(jobs, log, state, batch_size, api_key)
+        if command in ("run", "submit"):
+            engine = GenerationEngine(concurrency=concurrency, cache=cache, api_key=api_key)
+            asyncio.run(run_online(jobs, engine, log))
+        if command == "submit" and state.batches:
+            print(f"{len(state.batches)} batch(es) pending in {_relative(state.path)}")
+        if command == "poll" or wait:
+            poll(log, state, wait, interval, api_key)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; results so far are in {_relative(log.path)}. Rerun the same command to continue.")
+        sys.exit(130)
+    finally:
+        log.close()
+
+    pending = sum(len(b["jobs"]) for b in state.batches)
+    invalid = log.counts["invalid"]
+    print(f"\n{log.counts['ok']} ok, {log.counts['failed']} failed"
+          f"{f', {invalid} invalid line(s)' if invalid else ''}"
+          f"{f', {pending} pending in batches (poll to collect)' if pending else ''} "
+          f"in {time.perf_counter() - start:.1f}s")
+    if cache and command != "poll":
+        print(cache.summary())
+    if log.counts["failed"] or log.counts["invalid"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Write-ahead job journal, so an interrupted generation run can be resumed.
+
+Each run of a journaled generator (zone scenes, wildlife sprites) gets a run
+id and appends one JSON line per job state change to
+.cache/runs/<run-id>.jsonl (or under GENCORE_RUNS), flushed and fsynced
+before the job moves on:
+
+    {"run": "20261018-161158-3f2a", "script": ..., "args": [...]}   header
+    {"job": "forest", "state": "queued"}
+    {"job": "forest", "state": "running"}
+    {"job": "forest", "state": "succeeded", "path": "public/assets/forest/..."}
+    {"job": "sky", "state": "failed", "error": "..."}
+
+A job's state is its last line; a line torn by a crash is ignored. With
+`--resume <run-id>` the script runs again with the journal's original
+arguments (plus any flags given now) and reissues only the jobs that didn't
+succeed or whose output has since disappeared, appending to the same
+journal. Outputs are written with `atomic_write` (gencore/fsutil.py), so a
+file at its final path is always complete.
+
+Usage (from scripts/):
+    python -m gencore.journal               # recent runs and their unfinished jobs
+    python -m gencore.journal <run-id>      # state of every job in a run
+"""
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .options import VALUE_FLAGS, fail, option_from_argv
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = SCRIPTS_DIR.parent
+RUNS_DIR = Path(os.environ.get("GENCORE_RUNS", PROJECT_ROOT / ".cache" / "runs"))
+RECENT_RUNS = 10
+
+
+def _relative(path) -> str:
+    path = Path(path).resolve()
+    return str(path.relative_to(PROJECT_ROOT)) if PROJECT_ROOT in path.parents else str(path)
+
+
+def read_journal(path: Path) -> dict:
+    """{"run", "script", "args", "jobs": {job: last record}} from a journal file."""
+    header, jobs = {}, {}
+    for line in Path(path).read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # torn write from a crash
+        if "run" in record:
+            header = record
+        elif record.get("job") is not None:
+            jobs[record["job"]] = record
+    return {"run": header.get("run", Path(path).stem), "script": header.get("script"),
+            "args": header.get("args", []), "jobs": jobs}
+
+
+class Journal:
+    """Append-only job state log for one run; safe to share across threads."""
+
+    def __init__(self, run_id: str, script: str, args: list, previous: dict = None):
+        self.run_id = run_id
+        self.script = script
+        self.args = list(args)
+        self.path = RUNS_DIR / f"{run_id}.jsonl"
+        self.previous = previous or {}  # {job: last record} from before --resume
+        self._file = None  # opened on the first record, so dry runs and usage errors leave no journal
+        self._lock = threading.Lock()
+
+    def _append(self, record: dict):
+        line = json.dumps({**record, "t": round(time.time(), 3)})
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                new = not self.path.exists()
+                self._file = open(self.path, "a")
+                if new:
+                    self._file.write(json.dumps({"run": self.run_id, "script": self.script, "args": self.args})
+                                     + "\n")
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def done(self, job: str) -> str:
+        """Output path of `job` if an earlier session of this run finished it and the file is still there."""
+        record = self.previous.get(job)
+        if record and record["state"] == "succeeded" and (PROJECT_ROOT / record["path"]).exists():
+            return str(PROJECT_ROOT / record["path"])
+        return None
+
+    def queued(self, jobs: list):
+        for job in jobs:
+            self._append({"job": job, "state": "queued"})
+
+    def running(self, job: str):
+        self._append({"job": job, "state": "running"})
+
+    def succeeded(self, job: str, path):
+        self._append({"job": job, "state": "succeeded", "path": _relative(path)})
+
+    def failed(self, job: str, error):
+        self._append({"job": job, "state": "failed", "error": str(error)[:200]})
+
+    def resume_hint(self) -> str:
+        return f"Run {self.run_id}; resume with: python {self.script} --resume {self.run_id}"
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def journal_from_argv(argv: list):
+    """
+    Start a journal for this run, or reopen one with `--resume <run-id>`.
+    Returns (Journal, args); when resuming, args are the run's original
+    arguments with any flags given now replacing or adding to them. Call it
+    before the other *_from_argv helpers so they see the replayed arguments.
+    """
+    args = list(argv)
+    script = os.path.relpath(Path(sys.argv[0]).resolve(), SCRIPTS_DIR)  # as run from scripts/
+    run_id = option_from_argv(args, "--resume")
+    if run_id is None:
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+        return Journal(run_id, script, args), args
+
+    path = RUNS_DIR / f"{run_id}.jsonl"
+    if not path.exists():
+        fail(f"no journal for run '{run_id}' in {RUNS_DIR}")
+    previous = read_journal(path)
+    if previous["script"] != script:
+        fail(f"run '{run_id}' was started by {previous['script']}, not {script}")
+    recorded = list(previous["args"])
+    i = 0
+    while i < len(args):
+        flag = args[i]
+        if not flag.startswith("-"):
+            fail(f"--resume reuses the run's zones/creatures; only flags can be given, not '{flag}'")
+        width = 2 if flag in VALUE_FLAGS else 1
+        if flag in recorded:  # e.g. --concurrency 2 replaces the run's --concurrency 5
+            j = recorded.index(flag)
+            del recorded[j:j + width]
+        i += width
+    return Journal(run_id, script, recorded + args, previous["jobs"]), recorded + args
+
+
+def format_run(run: dict) -> str:
+    lines = [f"Run {run['run']}: {run['script']} {' '.join(run['args'])}".rstrip()]
+    for job, record in run["jobs"].items():
+        detail = record.get("path") or record.get("error") or ""
+        lines.append(f"  {record['state']:<10} {job:<28} {detail}")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    if args:
+        path = RUNS_DIR / f"{args[0]}.jsonl"
+        if not path.exists():
+            print(f"ERROR: no journal for run '{args[0]}' in {RUNS_DIR}")
+            sys.exit(1)
+        print(format_run(read_journal(path)))
+        return
+
+    paths = sorted(RUNS_DIR.glob("*.jsonl"))[-RECENT_RUNS:]
+    if not paths:
+        print(f"No runs journaled in {RUNS_DIR}")
+        return
+    for path in paths:
+        run = read_journal(path)
+        states = [r["state"] for r in run["jobs"].values()]
+        unfinished = [job for job, r in run["jobs"].items() if r["state"] != "succeeded"]
+        print(f"  {run['run']}  {run['script']:<28} {states.count('succeeded')}/{len(states)} succeeded"
+              f"{'  unfinished: ' + ', '.join(unfinished) if unfinished else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Command-line option parsing shared by the gencore modules and the generator scripts.
+
+`option_from_argv(args, "--jobs", 4, int)` removes `--jobs N` from `args` and
+returns N converted by `kind` (any callable that raises ValueError on bad
+input), or the default when the flag isn't given; `parse_value` does the
+same for positional arguments. A missing or invalid value prints an error
+and the command's usage, then exits 1, instead of ending in an
+IndexError/ValueError traceback.
+"""
+import sys
+
+# Flags whose next argument is a value, not a zone/panel/creature name
+VALUE_FLAGS = {"--concurrency", "--candidates", "--resume"}
+
+
+def usage_of(doc: str) -> str:
+    """The "Usage ..." section of a module docstring ("" if it has none)."""
+    if not doc or "Usage" not in doc:
+        return ""
+    return "Usage" + doc.split("Usage", 1)[1].rstrip()
+
+
+def fail(message: str, usage: str = None):
+    """Print `message` and the usage (by default the running module's), then exit 1."""
+    print(f"ERROR: {message}")
+    if usage is None:
+        usage = usage_of(getattr(sys.modules.get("__main__"), "__doc__", None))
+    if usage:
+        print(usage_of(usage) or usage)
+    sys.exit(1)
+
+
+def option_from_argv(args: list, flag: str, default=None, kind=str, usage: str = None):
+    """Remove `flag VALUE` from `args` in place; returns kind(VALUE), or `default` without the flag."""
+    if flag not in args:
+        return default
+    i = args.index(flag)
+    value = args[i + 1] if i + 1 < len(args) else None
+    if value is None or value.startswith("--"):
+        fail(f"{flag} needs a value", usage)
+    result = parse_value(flag, value, kind, usage)
+    del args[i:i + 2]
+    return result
+
+
+def parse_value(name: str, value: str, kind=int, usage: str = None):
+    """kind(value) for a positional argument or flag called `name`; fails with the usage if it doesn't parse."""
+    try:
+        return kind(value)
+    except ValueError:
+        fail(f"invalid value for {name}: '{value}'", usage)
+
+
+def int_list(value: str) -> tuple:
+    """"480,960" -> (480, 960), sorted."""
+    return tuple(sorted(int(v) for v in value.split(",")))
+
+
+def str_list(value: str) -> tuple:
+    """"avif,webp" -> ("avif", "webp")."""
+    return tuple(v for v in value.split(",") if v)
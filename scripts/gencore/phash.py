@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash index for spotting near-duplicate generations.
+
+Every PNG under ROOTS gets a 64-bit pHash (sign of the low-frequency 8x8
+block of a 32x32 DCT, against its median) and a 64-bit dHash (sign of
+horizontal gradients on a 9x8 thumbnail). Hashes are computed for a whole
+batch at once (one einsum for all the DCTs) and kept in
+.cache/phash/index.json keyed by path, size and mtime, so only new or
+changed files are decoded on later runs. Entries for files that are gone, or
+that aren't under the roots being indexed, are dropped on refresh.
+
+Lookups go through a BK-tree over pHash Hamming distance, so "is this a
+near-duplicate of anything we have" visits a small part of the index rather
+than every entry; candidates within PHASH_RADIUS are confirmed with dHash.
+
+Generators opt in through `dedupe_from_argv` (--dedupe): save_candidates then
+drops candidates that duplicate an existing asset and flags the rest. Files
+added during a run are written to the index once, by `save()` at the end.
+
+Usage (from scripts/):
+    python -m gencore.phash [root ...] [--radius N]     # report duplicate groups
+
+Hashing needs numpy and Pillow; the index itself is plain Python.
+"""
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .fsutil import atomic_write
+from .options import option_from_argv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+ROOTS = (
+    PROJECT_ROOT / "public" / "assets",
+    PROJECT_ROOT / "assets",                       # generate-v3-background.py
+    PROJECT_ROOT / "scripts" / "public" / "assets",  # sprites from the archive generators' old output root
+)
+INDEX_PATH = PROJECT_ROOT / ".cache" / "phash" / "index.json"
+
+PHASH_RADIUS = 8   # of 64 bits
+DHASH_RADIUS = 12
+SKIP_STEM = re.compile(r"-(c\d+|cutout|portrait-crop)$")  # candidates and derived files
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes with Hamming distance."""
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+        self.size = 0
+
+    def add(self, value: int, item):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            if d not in node[2]:
+                node[2][d] = [value, [item], {}]
+                return
+            node = node[2][d]
+
+    def search(self, value: int, radius: int) -> list:
+        """[(distance, item)] within `radius`, nearest first."""
+        found, stack = [], [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                found.extend((d, item) for item in node[1])
+            for child_d, child in node[2].items():
+                if d - radius <= child_d <= d + radius:
+                    stack.append(child)
+        return sorted(found, key=lambda f: f[0])
+
+
+def _thumbnails(source):
+    """(32x32, 9x8) float32 greyscale thumbnails from a path or bytes."""
+    import io
+
+    import numpy as np
+    from PIL import Image
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with Image.open(source) as img:
+        img.draft("L", (64, 64))  # JPEG shortcut; no-op for PNG
+        grey = img.convert("L")
+        return (np.asarray(grey.resize((32, 32), Image.BILINEAR), dtype=np.float32),
+                np.asarray(grey.resize((9, 8), Image.BILINEAR), dtype=np.float32))
+
+
+def _pack(bits) -> list:
+    import numpy as np
+
+    packed = np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return [int.from_bytes(row.tobytes(), "big") for row in packed]
+
+
+def hash_images(sources: list) -> list:
+    """[(phash, dhash)] for paths or image bytes, computed as one batch."""
+    import numpy as np
+
+    if not sources:
+        return []
+    with ThreadPoolExecutor() as pool:  # decoding dominates and releases the GIL
+        thumbs = list(pool.map(_thumbnails, sources))
+    large = np.stack([t[0] for t in thumbs])
+    small = np.stack([t[1] for t in thumbs])
+
+    n = np.arange(32)
+    dct = np.sqrt(2 / 32) * np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / 64)
+    dct[0] /= np.sqrt(2)
+    low = np.einsum("ij,njk,lk->nil", dct, large, dct)[:, :8, :8].reshape(len(sources), 64)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)  # skip the DC term
+    phashes = _pack(low > median)
+    dhashes = _pack(small[:, :, 1:] > small[:, :, :-1])
+    return list(zip(phashes, dhashes))
+
+
+class DuplicateIndex:
+    """Persistent pHash/dHash index of generated images with BK-tree lookup."""
+
+    def __init__(self, roots: tuple = ROOTS, path: Path = INDEX_PATH, radius: int = PHASH_RADIUS):
+        self.roots = [Path(r) for r in roots]
+        self.path = Path(path)
+        self.radius = radius
+        self.entries = {}
+        self.hashed = 0
+        self.flagged = 0
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text())
+        self.tree = BKTree()
+
+    def _scan(self) -> dict:
+        files = {}
+        for root in self.roots:
+            if root.exists():
+                for p in root.rglob("*.png"):
+                    if not SKIP_STEM.search(p.stem):
+                        stat = p.stat()
+                        files[str(p.resolve())] = (stat.st_size, int(stat.st_mtime))
+        return files
+
+    def refresh(self) -> "DuplicateIndex":
+        """Hash new or changed files, forget any entry that isn't a file under `roots`, rebuild the tree and save."""
+        files = self._scan()
+        stale = [p for p, (size, mtime) in files.items()
+                 if p not in self.entries or (self.entries[p]["size"], self.entries[p]["mtime"]) != (size, mtime)]
+        hashes = hash_images(stale)
+        self.entries = {p: e for p, e in self.entries.items() if p in files}
+        for p, (phash, dhash) in zip(stale, hashes):
+            size, mtime = files[p]
+            self.entries[p] = {"size": size, "mtime": mtime, "phash": f"{phash:016x}", "dhash": f"{dhash:016x}"}
+        self.hashed += len(stale)
+
+        self.tree = BKTree()
+        for p, e in self.entries.items():
+            self.tree.add(int(e["phash"], 16), p)
+        self.save()
+        return self
+
+    def save(self):
+        """Write the whole index; a file added but never saved is just re-hashed by the next refresh."""
+        with self._lock:
+            entries = json.dumps(self.entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, entries.encode("utf-8"))
+
+    def find(self, phash: int, dhash: int, exclude: str = None) -> list:
+        """[(distance, path)] of indexed images that look like (phash, dhash)."""
+        with self._lock:
+            near = self.tree.search(phash, self.radius)
+        return [(d, p) for d, p in near
+                if p != exclude and hamming(dhash, int(self.entries[p]["dhash"], 16)) <= DHASH_RADIUS]
+
+    def check(self, images: list) -> list:
+        """For each image (bytes or path), its near-duplicates as [(distance, path)]."""
+        matches = [self.find(phash, dhash) for phash, dhash in hash_images(images)]
+        self.flagged += sum(bool(m) for m in matches)
+        return matches
+
+    def add(self, path, data: bytes = None):
+        """Index a newly written file (hashing `data` if given, else the file); `save()` once after the run."""
+        path = Path(path).resolve()
+        (phash, dhash), = hash_images([data if data is not None else path])
+        stat = path.stat()
+        with self._lock:
+            self.entries[str(path)] = {"size": stat.st_size, "mtime": int(stat.st_mtime),
+                                       "phash": f"{phash:016x}", "dhash": f"{dhash:016x}"}
+            self.tree.add(phash, str(path))
+
+    def groups(self) -> list:
+        """Clusters of mutually near-duplicate indexed files (each file in at most one)."""
+        seen, groups = set(), []
+        for p in sorted(self.entries):
+            if p in seen:
+                continue
+            e = self.entries[p]
+            near = [q for _, q in self.find(int(e["phash"], 16), int(e["dhash"], 16)) if q not in seen]
+            if len(near) > 1:
+                groups.append(near)
+                seen.update(near)
+        return groups
+
+    def summary(self) -> str:
+        return (f"Duplicate index: {len(self.entries)} images, {self.hashed} hashed this run, "
+                f"{self.flagged} near-duplicate candidate(s) flagged")
+
+
+def dedupe_from_argv(argv: list):
+    """Split `--dedupe` out of argv; returns (refreshed DuplicateIndex or None, remaining args)."""
+    if "--dedupe" not in argv:
+        return None, list(argv)
+    return DuplicateIndex().refresh(), [a for a in argv if a != "--dedupe"]
+
+
+def main():
+    import sys
+
+    args = sys.argv[1:]
+    radius = option_from_argv(args, "--radius", PHASH_RADIUS, int, __doc__)
+
+    index = DuplicateIndex(roots=args or ROOTS, radius=radius).refresh()
+    groups = index.groups()
+    for group in groups:
+        print(f"\n  {len(group)} near-duplicates:")
+        for p in sorted(group, key=lambda q: index.entries[q]["mtime"]):
+            print(f"    {Path(p).relative_to(PROJECT_ROOT) if p.startswith(str(PROJECT_ROOT)) else p}")
+    print(f"\n{index.summary()}; {len(groups)} duplicate group(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Dry-run planner: what a generator invocation will send, and how long it takes.
+
+With --dry-run a generator expands its arguments into the concrete job list
+(zones x creatures x candidates, plus each job's fallback chain), prints a
+plan and exits before any request is made. For every model the plan gives:
+
+    min       requests if every first attempt succeeds (cache hits send none)
+    expected  with the model's recent 429/5xx rate, retries and fallbacks
+              included (RetryPolicy.max_attempts per model in the chain)
+    worst     every attempt on every model in the chain fails
+    images    images expected back
+
+Wall time is simulated from each model's median latency in the request log
+(gencore/quota.py; DEFAULT_LATENCY when there is no history) at the run's
+concurrency, respecting panel dependencies. When the concurrency would push
+a model past its per-minute quota the plan says so, stretches the estimate
+to what the quota allows and suggests a concurrency that fits.
+"""
+import heapq
+import math
+
+from .dag import topological_order
+from .quota import current_endpoint, get_store
+from .resilience import DEFAULT_POLICY, RetryPolicy
+
+DEFAULT_LATENCY = 10.0  # seconds per request for a model with no recorded history
+
+
+def plan_from_argv(argv: list):
+    """Split `--dry-run` out of argv; returns (dry_run, remaining args)."""
+    return "--dry-run" in argv, [a for a in argv if a != "--dry-run"]
+
+
+def plan_job(job_id: str, chain: list, images: int = 1, deps: list = (), cached: bool = False) -> dict:
+    """One planned job: `chain` is the models tried in order, `deps` the jobs it waits for."""
+    return {"id": job_id, "chain": list(chain), "images": images, "deps": list(deps), "cached": cached}
+
+
+def _expected(chain: list, models: dict, policy: RetryPolicy) -> dict:
+    """{model: (expected requests, expected images share)} for one uncached job."""
+    expected, reach = {}, 1.0
+    for model in chain:
+        f = models[model]["failure_rate"]
+        requests = reach * sum(f ** k for k in range(policy.max_attempts))
+        exhausted = f ** policy.max_attempts
+        expected[model] = (requests, reach * (1 - exhausted))
+        reach *= exhausted
+    return expected
+
+
+def _simulate(jobs: list, durations: dict, concurrency: int) -> dict:
+    """{job id: (start, end)} running `jobs` in dependency order on `concurrency` slots."""
+    by_id = {job["id"]: job for job in jobs}
+    slots = [0.0] * max(1, concurrency)
+    spans = {}
+    for job in map(by_id.get, topological_order({j["id"]: j["deps"] for j in jobs})):
+        ready = max((spans[d][1] for d in job["deps"] if d in spans), default=0.0)
+        start = max(heapq.heappop(slots), ready)
+        spans[job["id"]] = (start, start + durations[job["id"]])
+        heapq.heappush(slots, spans[job["id"]][1])
+    return spans
+
+
+def _peak_overlap(spans: list) -> int:
+    events = sorted([(start, 1) for start, end in spans if end > start] + [(end, -1) for start, end in spans
+                                                                           if end > start])
+    peak = running = 0
+    for _, step in events:
+        running += step
+        peak = max(peak, running)
+    return peak
+
+
+def estimate(jobs: list, concurrency: int, policy: RetryPolicy = DEFAULT_POLICY, store=None) -> dict:
+    """Requests per model, simulated wall time and quota warnings for `jobs`."""
+    store = store or get_store()
+    endpoint = current_endpoint()
+    models = {}
+    for job in jobs:
+        for model in job["chain"]:
+            if model not in models:
+                history = store.history(model, endpoint)
+                models[model] = {**history, "assumed": history["latency"] is None,
+                                 "latency": history["latency"] or DEFAULT_LATENCY,
+                                 "min": 0, "expected": 0.0, "worst": 0, "images": 0.0, "jobs": 0,
+                                 "limits": store.limits(model), "last_minute": store.last_minute(model, endpoint)}
+
+    durations = {}
+    for job in jobs:
+        if job["cached"]:
+            durations[job["id"]] = 0.0
+            continue
+        duration = 0.0
+        models[job["chain"][0]]["min"] += 1
+        for model, (requests, success) in _expected(job["chain"], models, policy).items():
+            m = models[model]
+            m["expected"] += requests
+            m["worst"] += policy.max_attempts
+            m["images"] += success * job["images"]
+            m["jobs"] += 1
+            duration += requests * m["latency"] + max(0.0, requests - 1) * policy.base_delay
+        durations[job["id"]] = duration
+
+    spans = _simulate(jobs, durations, concurrency)
+    wall = max((end for _, end in spans.values()), default=0.0)
+    warnings = []
+    for model, m in models.items():
+        if not m["expected"]:
+            continue
+        in_flight = _peak_overlap([spans[j["id"]] for j in jobs if model in j["chain"]])
+        share = m["expected"] / m["jobs"]  # requests per job that reach this model
+        per_request = m["images"] / m["expected"]
+        over = []  # (jobs in flight that fit, message) per exceeded limit
+        for unit, rate, total in (("rpm", 60 / m["latency"] * share, m["expected"]),
+                                  ("ipm", 60 / m["latency"] * share * per_request, m["images"])):
+            limit = m["limits"].get(unit)
+            if not limit:
+                continue
+            used = m["last_minute"][0 if unit == "rpm" else 1]  # by another run, still counting
+            wall = max(wall, (total + used) / limit * 60)
+            if in_flight * rate > limit:
+                over.append((max(1, math.floor(limit / rate)),
+                             f"~{in_flight * rate:.0f} {unit}, over its {limit} {unit}"
+                             f"{f' ({used} used in the last minute)' if used else ''}"))
+        if over:
+            fits, message = min(over)
+            warnings.append(f"{model}: {in_flight} in flight at ~{m['latency']:.1f}s is {message}; "
+                            f"lower concurrency to {fits} or expect 429s")
+    return {"jobs": jobs, "models": models, "concurrency": concurrency, "wall": wall, "warnings": warnings,
+            "endpoint": endpoint}
+
+
+def _duration(seconds: float) -> str:
+    return f"{seconds / 60:.1f} min" if seconds >= 90 else f"{seconds:.0f}s"
+
+
+def format_plan(plan: dict) -> str:
+    jobs, models = plan["jobs"], plan["models"]
+    cached = sum(j["cached"] for j in jobs)
+    lines = [f"DRY RUN: nothing sent to {plan['endpoint']}",
+             f"Jobs: {len(jobs)}{f' ({cached} cached)' if cached else ''}, concurrency {plan['concurrency']}"]
+    for job in jobs:
+        chain = " → ".join(job["chain"])
+        after = f"  after {', '.join(job['deps'])}" if job["deps"] else ""
+        lines.append(f"  {job['id']:<28} {job['images']} image(s)  {chain}"
+                     f"{'  (cached)' if job['cached'] else ''}{after}")
+    lines.append("")
+    lines.append(f"  {'model':<40} {'min':>4} {'expected':>9} {'worst':>6} {'images':>7} {'latency':>9} "
+                 f"{'limit/min':>10}")
+    for model, m in models.items():
+        latency = f"{m['latency']:.1f}s" + ("*" if m["assumed"] else "")
+        limit = f"{m['limits']['rpm']}" if m["limits"].get("rpm") else "-"
+        lines.append(f"  {model:<40} {m['min']:>4} {m['expected']:>9.1f} {m['worst']:>6} {m['images']:>7.1f} "
+                     f"{latency:>9} {limit:>10}")
+    if any(m["assumed"] for m in models.values()):
+        lines.append(f"  * no history for this endpoint, assumed {DEFAULT_LATENCY:g}s")
+    lines.append(f"\nEstimated wall time: {_duration(plan['wall'])}")
+    lines.extend(f"  ⚠ {w}" for w in plan["warnings"])
+    return "\n".join(lines)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Per-model request and image accounting, and per-minute quota limits.
+
+Every request the shared client sends (gencore/client.py) is counted by an
+httpx response hook: model, endpoint, HTTP status and latency, one row per
+request. Retries and 429s count, cache hits don't (they never reach the
+client). The hook doesn't touch the body; the images a request returned are
+added by `count_images` where the response is parsed anyway (the engine,
+store_images and the direct-call generators). The rows give the counters
+shown here and the latency/failure history the dry-run planner
+(gencore/plan.py) uses.
+
+Rows are kept per endpoint, so runs against the local stand-in server
+(GENCORE_BASE_URL) don't skew the numbers for the live API.
+
+Per-minute limits default to QUOTAS and can be overridden per model with
+`limit`. The database lives at .cache/quota.sqlite (or GENCORE_QUOTA).
+
+Usage (from scripts/):
+    python -m gencore.quota [--since HOURS]              # counters per model
+    python -m gencore.quota limit <model> <rpm> [<ipm>]  # set a per-minute limit
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .options import fail, option_from_argv, parse_value
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_PATH = Path(os.environ.get("GENCORE_QUOTA", PROJECT_ROOT / ".cache" / "quota.sqlite"))
+LIVE_ENDPOINT = "generativelanguage.googleapis.com"
+
+# Requests/images per minute for our tier; `limit` overrides these per model.
+QUOTAS = {
+    "imagen-4.0-ultra-generate-001": {"rpm": 10, "ipm": 10},
+    "imagen-4.0-generate-001": {"rpm": 20, "ipm": 20},
+    "imagen-3.0-generate-002": {"rpm": 20, "ipm": 20},
+    "gemini-2.0-flash-exp-image-generation": {"rpm": 10, "ipm": None},
+}
+HISTORY = 200  # most recent requests per model used for latency/failure estimates
+
+MODEL_PATH = re.compile(r"/models/([^/:]+):(predict|generateContent)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    at REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    model TEXT NOT NULL,
+    status INTEGER,
+    images INTEGER NOT NULL DEFAULT 0,
+    latency REAL
+);
+CREATE TABLE IF NOT EXISTS limits (
+    model TEXT PRIMARY KEY,
+    rpm INTEGER,
+    ipm INTEGER
+);
+CREATE INDEX IF NOT EXISTS requests_by_model ON requests (endpoint, model, at);
+"""
+
+
+def current_endpoint() -> str:
+    """host[:port] requests go to: the stand-in when GENCORE_BASE_URL is set, else the live API."""
+    base_url = os.environ.get("GENCORE_BASE_URL")
+    return re.sub(r"^\w+://", "", base_url).rstrip("/") if base_url else LIVE_ENDPOINT
+
+
+class QuotaStore:
+    """Thread-safe handle on the request log and limits."""
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._db.execute(sql, params)
+
+    def record(self, endpoint: str, model: str, status: int, images: int = 0, latency: float = None):
+        self._execute("INSERT INTO requests (at, endpoint, model, status, images, latency) VALUES (?, ?, ?, ?, ?, ?)",
+                      (time.time(), endpoint, model, status, images, latency))
+
+    def add_images(self, endpoint: str, model: str, images: int):
+        """Attach `images` to the latest successful request to `model` that has none yet."""
+        self._execute("UPDATE requests SET images = ? WHERE id = (SELECT id FROM requests WHERE endpoint = ? "
+                      "AND model = ? AND status = 200 AND images = 0 ORDER BY id DESC LIMIT 1)",
+                      (images, endpoint, model))
+
+    def set_limit(self, model: str, rpm: int, ipm: int = None):
+        self._execute("INSERT INTO limits (model, rpm, ipm) VALUES (?, ?, ?) "
+                      "ON CONFLICT (model) DO UPDATE SET rpm = excluded.rpm, ipm = excluded.ipm", (model, rpm, ipm))
+
+    def limits(self, model: str) -> dict:
+        """{"rpm", "ipm"} for `model` (either may be None = unknown)."""
+        row = self._execute("SELECT rpm, ipm FROM limits WHERE model = ?", (model,)).fetchone()
+        return dict(row) if row else dict(QUOTAS.get(model, {"rpm": None, "ipm": None}))
+
+    def counters(self, endpoint: str = None, since: float = 0.0) -> list:
+        """Per-model totals since `since` (epoch seconds): requests, images, rate_limited, errors."""
+        return [dict(r) for r in self._execute(
+            "SELECT model, COUNT(*) AS requests, SUM(images) AS images, "
+            "SUM(status = 429) AS rate_limited, SUM(status >= 500) AS errors, MIN(at) AS first, MAX(at) AS last "
+            "FROM requests WHERE endpoint = ? AND at >= ? GROUP BY model ORDER BY model",
+            (endpoint or current_endpoint(), since))]
+
+    def peak_per_minute(self, model: str, endpoint: str = None, since: float = 0.0) -> tuple:
+        """(requests, images) in the busiest calendar minute since `since`."""
+        row = self._execute(
+            "SELECT MAX(n) AS requests, MAX(i) AS images FROM (SELECT COUNT(*) AS n, SUM(images) AS i "
+            "FROM requests WHERE endpoint = ? AND model = ? AND at >= ? GROUP BY CAST(at / 60 AS INTEGER))",
+            (endpoint or current_endpoint(), model, since)).fetchone()
+        return row["requests"] or 0, row["images"] or 0
+
+    def last_minute(self, model: str, endpoint: str = None) -> tuple:
+        """(requests, images) sent to `model` in the last 60 seconds, e.g. by another run."""
+        row = self._execute("SELECT COUNT(*) AS n, SUM(images) AS i FROM requests "
+                            "WHERE endpoint = ? AND model = ? AND at >= ?",
+                            (endpoint or current_endpoint(), model, time.time() - 60)).fetchone()
+        return row["n"], row["i"] or 0
+
+    def history(self, model: str, endpoint: str = None, limit: int = HISTORY) -> dict:
+        """
+        Recent behaviour of `model`: {"requests", "latency" (median successful
+        request, seconds, None without history), "failure_rate" (429/5xx share)}.
+        """
+        rows = self._execute("SELECT status, latency FROM requests WHERE endpoint = ? AND model = ? "
+                             "ORDER BY at DESC LIMIT ?", (endpoint or current_endpoint(), model, limit)).fetchall()
+        ok = [r["latency"] for r in rows if r["status"] == 200 and r["latency"] is not None]
+        failed = sum(1 for r in rows if r["status"] == 429 or (r["status"] or 0) >= 500)
+        return {"requests": len(rows), "latency": statistics.median(ok) if ok else None,
+                "failure_rate": failed / len(rows) if rows else 0.0}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> QuotaStore:
+    """The process-wide store, opened on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = QuotaStore()
+    return _store
+
+
+def _count(response):
+    match = MODEL_PATH.search(response.request.url.path)
+    start = response.request.extensions.get("gencore_sent")
+    try:
+        get_store().record(response.request.url.netloc.decode("ascii"), match.group(1), response.status_code,
+                           latency=time.perf_counter() - start if start else None)
+    except sqlite3.Error as e:  # accounting must never fail a generation
+        print(f"WARNING: request not counted ({e})")
+
+
+def count_images(model: str, images: int):
+    """Record the images a request to `model` returned, once the caller has parsed them."""
+    if not images:
+        return
+    try:
+        get_store().add_images(current_endpoint(), model, images)
+    except sqlite3.Error as e:
+        print(f"WARNING: images not counted ({e})")
+
+
+def http_hooks() -> tuple:
+    """(request, response, async request, async response) httpx hooks that count generation requests."""
+    def request_hook(request):
+        if MODEL_PATH.search(request.url.path):
+            request.extensions["gencore_sent"] = time.perf_counter()
+
+    def response_hook(response):
+        if MODEL_PATH.search(response.request.url.path):
+            _count(response)
+
+    async def async_request_hook(request):
+        request_hook(request)
+
+    async def async_response_hook(response):
+        if MODEL_PATH.search(response.request.url.path):
+            await asyncio.to_thread(_count, response)  # keep the sqlite write off the event loop
+
+    return request_hook, response_hook, async_request_hook, async_response_hook
+
+
+def format_counters(store: QuotaStore, since: float = 0.0) -> str:
+    endpoint = current_endpoint()
+    rows = store.counters(endpoint, since)
+    if not rows:
+        return f"No requests recorded for {endpoint}"
+    lines = [f"Endpoint: {endpoint}", "",
+             f"  {'model':<40} {'requests':>8} {'images':>7} {'429':>5} {'5xx':>5} {'p50':>7} "
+             f"{'peak/min':>9} {'limit/min':>10}"]
+    for r in rows:
+        history = store.history(r["model"], endpoint)
+        peak, peak_images = store.peak_per_minute(r["model"], endpoint, since)
+        limits = store.limits(r["model"])
+        latency = f"{history['latency']:.1f}s" if history["latency"] is not None else "-"
+        limit = f"{limits['rpm']}" if limits["rpm"] else "-"
+        lines.append(f"  {r['model']:<40} {r['requests']:>8} {r['images'] or 0:>7} {r['rate_limited']:>5} "
+                     f"{r['errors']:>5} {latency:>7} {f'{peak}r/{peak_images}i':>9} {limit:>10}")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    store = QuotaStore()
+    if args and args[0] == "limit":
+        if len(args) not in (3, 4):
+            fail("limit needs <model> <rpm> [<ipm>]", __doc__)
+        rpm = parse_value("<rpm>", args[2], int, __doc__)
+        ipm = parse_value("<ipm>", args[3], int, __doc__) if len(args) > 3 else None
+        store.set_limit(args[1], rpm, ipm)
+        print(f"{args[1]}: {store.limits(args[1])}")
+        return
+
+    hours = option_from_argv(args, "--since", None, float, __doc__)
+    since = time.time() - hours * 3600 if hours is not None else 0.0
+    print(format_counters(store, since))
+
+
+if __name__ == "__main__":
+    main()
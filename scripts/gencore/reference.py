@@ -0,0 +1,134 @@
+"""
+Reference-image preprocessing for style-reference requests.
+
+The raw reference PNGs are 2-3 MB at 2560x1440, far more than the model uses.
+`prepare_reference` downscales to a configurable long edge and re-encodes as
+WebP, JPEG or PNG, then keeps the result both in-process and on disk under
+.cache/references keyed by the source file's hash and the settings, so a
+reference shared by several requests is only processed once.
+
+Defaults can be overridden with GENCORE_REF_LONG_EDGE / GENCORE_REF_FORMAT
+(webp, jpeg or jpg, png) / GENCORE_REF_QUALITY, read when a reference is
+prepared; an invalid value stops the script with an error message. Without
+Pillow the original bytes are sent unchanged, labelled with their own type.
+"""
+import hashlib
+import io
+import mimetypes
+import os
+import threading
+from pathlib import Path
+
+from .fsutil import atomic_write
+from .options import fail, parse_value
+
+MIME_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+FORMAT_ALIASES = {"jpg": "jpeg"}
+
+
+def normalize_format(fmt: str) -> str:
+    """"JPG" -> "jpeg"; raises ValueError for a format with no MIME type."""
+    fmt = FORMAT_ALIASES.get(fmt.lower(), fmt.lower())
+    if fmt not in MIME_TYPES:
+        raise ValueError(f"unsupported reference format '{fmt}' (one of {', '.join(MIME_TYPES)}, jpg)")
+    return fmt
+
+
+REFERENCE_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "references"
+DEFAULT_LONG_EDGE = 1024
+DEFAULT_FORMAT = "webp"
+DEFAULT_QUALITY = 85
+
+# Leading bytes of the formats a reference may already be in
+SIGNATURES = {b"\x89PNG\r\n\x1a\n": "image/png", b"\xff\xd8\xff": "image/jpeg", b"GIF8": "image/gif"}
+
+_memory = {}
+_memory_lock = threading.Lock()
+
+
+def _encode(source: bytes, long_edge: int, fmt: str, quality: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(source)) as img:
+        img = img.convert("RGB")
+        scale = long_edge / max(img.size)
+        if scale < 1:
+            img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+        out = io.BytesIO()
+        if fmt == "jpeg":
+            img.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+        elif fmt == "png":
+            img.save(out, "PNG", optimize=True)  # lossless: quality doesn't apply
+        else:
+            img.save(out, "WEBP", quality=quality, method=4)
+        return out.getvalue()
+
+
+def reference_settings() -> tuple:
+    """(long_edge, fmt, quality) from the GENCORE_REF_* variables; exits with a message on a bad value."""
+    # Environment variables, not flags: no usage to show with the error
+    long_edge = parse_value("GENCORE_REF_LONG_EDGE", os.environ.get("GENCORE_REF_LONG_EDGE", str(DEFAULT_LONG_EDGE)),
+                            int, "")
+    quality = parse_value("GENCORE_REF_QUALITY", os.environ.get("GENCORE_REF_QUALITY", str(DEFAULT_QUALITY)), int, "")
+    try:
+        fmt = normalize_format(os.environ.get("GENCORE_REF_FORMAT", DEFAULT_FORMAT))
+    except ValueError as e:
+        fail(f"GENCORE_REF_FORMAT: {e}", "")
+    return long_edge, fmt, quality
+
+
+def source_mime_type(source: bytes, path) -> str:
+    """The MIME type of reference bytes sent as they are: from their signature, else the file suffix."""
+    for signature, mime_type in SIGNATURES.items():
+        if source.startswith(signature):
+            return mime_type
+    if source[:4] == b"RIFF" and source[8:12] == b"WEBP":
+        return "image/webp"
+    return mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+
+
+def prepare_reference(path, long_edge: int = None, fmt: str = None, quality: int = None) -> dict:
+    """
+    Return {"data", "mime_type", "source_bytes", "bytes", "source_hash"} for
+    the reference at `path`, ready to go into a types.Blob. Settings left as
+    None come from reference_settings().
+    """
+    if None in (long_edge, fmt, quality):
+        env_long_edge, env_fmt, env_quality = reference_settings()
+        long_edge, fmt, quality = long_edge or env_long_edge, fmt or env_fmt, quality or env_quality
+    fmt = normalize_format(fmt)
+    source = Path(path).read_bytes()
+    source_hash = hashlib.sha256(source).hexdigest()
+    key = f"{source_hash[:32]}-{long_edge}-{fmt}-q{quality}"
+
+    with _memory_lock:
+        if key in _memory:
+            return _memory[key]
+
+    cached = REFERENCE_CACHE_DIR / f"{key}.{fmt}"
+    try:
+        if cached.exists():
+            data = cached.read_bytes()
+        else:
+            data = _encode(source, long_edge, fmt, quality)
+            REFERENCE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            atomic_write(cached, data)
+        mime_type = MIME_TYPES[fmt]
+    except ImportError:
+        data, mime_type = source, source_mime_type(source, path)
+
+    prepared = {
+        "data": data,
+        "mime_type": mime_type,
+        "source_bytes": len(source),
+        "bytes": len(data),
+        "source_hash": source_hash,
+    }
+    with _memory_lock:
+        _memory[key] = prepared
+    return prepared
+
+
+def describe(prepared: dict) -> str:
+    return (f"{prepared['source_bytes'] / 1024:.0f} KB → {prepared['bytes'] / 1024:.0f} KB "
+            f"({prepared['mime_type']})")
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+SQLite registry of generated assets.
+
+Every generator records what it wrote: prompt hash, model, config,
+reference hash, dimensions, byte size, attempts/latency and review status,
+plus the files derived from it (candidates, export variants, portrait crops,
+cutouts, srcset rungs). Lookups such as "latest approved forest background
+with a file under 300 KB" become an indexed query instead of a directory
+scan and a read of specs/01-ASSETS.md.
+
+    assets  one row per generated image (zone, subject, kind, status, ...)
+    files   the original and every derived file, with format/size/bytes
+
+New generations start as PENDING_HUMAN_REVIEW, the status values are the
+ones in 01-ASSETS.md. The database lives at .cache/registry.sqlite (or
+GENCORE_REGISTRY) and can be rebuilt from disk with `scan` + `import-spec`.
+
+Usage (from scripts/):
+    python -m gencore.registry scan                      # register existing files
+    python -m gencore.registry import-spec               # statuses from specs/01-ASSETS.md
+    python -m gencore.registry status <path> <STATUS>
+    python -m gencore.registry latest [--zone Z] [--kind K] [--status S] [--max-kb N]
+    python -m gencore.registry list [--zone Z] [--status S]
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .cache import config_fields, normalize_prompt
+from .options import option_from_argv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_PATH = Path(os.environ.get("GENCORE_REGISTRY", PROJECT_ROOT / ".cache" / "registry.sqlite"))
+SPEC_PATH = PROJECT_ROOT / "specs" / "01-ASSETS.md"
+ASSETS_DIR = PROJECT_ROOT / "public" / "assets"
+SCAN_ROOTS = (ASSETS_DIR, PROJECT_ROOT / "assets" / "raw")
+
+STATUSES = ("PENDING_HUMAN_REVIEW", "APPROVED", "NEEDS_MODIFICATION", "NEEDS_COMPOSITE_TEST", "CUT")
+DEFAULT_STATUS = "PENDING_HUMAN_REVIEW"
+
+# Files written next to an asset by candidates/export/crop/matte/srcset
+DERIVED = re.compile(r"-(c\d+|desktop|mobile|\d+w|(portrait-crop|cutout)(-desktop|-mobile|-\d+w)?)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    zone TEXT,
+    subject TEXT,
+    kind TEXT,
+    model TEXT,
+    prompt_hash TEXT,
+    config TEXT,
+    reference_hash TEXT,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER,
+    status TEXT NOT NULL DEFAULT 'PENDING_HUMAN_REVIEW',
+    created_at REAL NOT NULL,
+    latency REAL,
+    attempts INTEGER,
+    cached INTEGER
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    asset_id INTEGER NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+    path TEXT NOT NULL UNIQUE,
+    variant TEXT NOT NULL,
+    format TEXT,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS assets_lookup ON assets (zone, kind, status, created_at);
+CREATE INDEX IF NOT EXISTS assets_subject ON assets (subject, created_at);
+CREATE INDEX IF NOT EXISTS files_by_asset ON files (asset_id, bytes);
+"""
+
+
+def image_size(path) -> tuple:
+    """(width, height) from the PNG header, falling back to Pillow for other formats."""
+    with open(path, "rb") as f:
+        head = f.read(24)
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", head[16:24])
+    try:
+        from PIL import Image
+
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+def _sha256(data) -> str:
+    return hashlib.sha256(data if isinstance(data, bytes) else data.encode("utf-8")).hexdigest()
+
+
+def _zone_for(path: Path) -> str:
+    """Zone directory under public/assets, else the filename prefix (assets/raw/forest-bg-...)."""
+    path = Path(path).resolve()
+    if ASSETS_DIR in path.parents:
+        return path.relative_to(ASSETS_DIR).parts[0]
+    return path.stem.split("-")[0]
+
+
+def _kind_for(path: Path) -> str:
+    return "character" if {"characters", "critters", "wildlife"} & set(path.parts) else "background"
+
+
+def _key(path) -> str:
+    return str(Path(path).resolve())
+
+
+class Registry:
+    """Thread-safe handle on the asset database."""
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._db.execute(sql, params)
+
+    def record(self, path, job: dict = None, kind: str = None, zone: str = None, subject: str = None,
+               model: str = None, attempts: list = None, cached: bool = False, status: str = DEFAULT_STATUS) -> int:
+        """
+        Register a generated file. `job` is an engine job dict (model, prompt,
+        config, reference); `attempts` the per-attempt records from resilience,
+        whose last success names the model that actually served it (fallbacks).
+        Returns the asset id.
+        """
+        job = job or {}
+        path = Path(path)
+        width, height = image_size(path)
+        reference = job.get("reference")
+        latency = sum(a.get("latency") or 0 for a in attempts or [])
+        row = {
+            "path": _key(path),
+            "zone": zone or _zone_for(path),
+            "subject": subject or job.get("id"),
+            "kind": kind,
+            "model": model or next((a["model"] for a in reversed(attempts or []) if not a.get("error")),
+                                   job.get("model")),
+            "prompt_hash": _sha256(normalize_prompt(job["prompt"])) if job.get("prompt") else None,
+            "config": json.dumps(config_fields(job.get("config")), sort_keys=True) if job.get("config") else None,
+            "reference_hash": _sha256(reference) if reference else None,
+            "width": width,
+            "height": height,
+            "bytes": path.stat().st_size,
+            "status": status,
+            "created_at": path.stat().st_mtime,
+            "latency": round(latency, 3) if attempts else None,
+            "attempts": len(attempts) if attempts else None,
+            "cached": int(bool(cached)),
+        }
+        columns = ", ".join(row)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in row if c not in ("path", "status"))
+        with self._lock:
+            self._db.execute(f"INSERT INTO assets ({columns}) VALUES ({', '.join('?' * len(row))}) "
+                             f"ON CONFLICT(path) DO UPDATE SET {updates}", list(row.values()))
+            asset_id = self._db.execute("SELECT id FROM assets WHERE path = ?", (row["path"],)).fetchone()[0]
+        self.add_file(asset_id, path, "original")
+        self.recorded += 1
+        return asset_id
+
+    def add_file(self, asset_id: int, path, variant: str):
+        path = Path(path)
+        width, height = image_size(path)
+        self._execute(
+            "INSERT INTO files (asset_id, path, variant, format, width, height, bytes) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET asset_id = excluded.asset_id, variant = excluded.variant, "
+            "width = excluded.width, height = excluded.height, bytes = excluded.bytes",
+            (asset_id, _key(path), variant, path.suffix.lstrip("."), width, height, path.stat().st_size),
+        )
+
+    def refresh_variants(self, paths: list) -> int:
+        """Register the derived files now sitting next to each asset in `paths`."""
+        added = 0
+        for source in map(Path, filter(None, paths)):
+            row = self._execute("SELECT id FROM assets WHERE path = ?", (_key(source),)).fetchone()
+            if row is None:
+                continue
+            candidates = list(source.parent.glob(f"{source.stem}-*")) + list(
+                (source.parent / "srcset").glob(f"{source.stem}-*"))
+            for derived in candidates:
+                stem = derived.name[:-len(derived.suffix)] if derived.suffix else derived.name
+                suffix = stem[len(source.stem):]
+                if DERIVED.fullmatch(suffix):
+                    self.add_file(row["id"], derived, f"{suffix.lstrip('-')}.{derived.suffix.lstrip('.')}")
+                    added += 1
+        return added
+
+    def contains(self, path) -> bool:
+        return self._execute("SELECT 1 FROM assets WHERE path = ?", (_key(path),)).fetchone() is not None
+
+    def set_status(self, path, status: str) -> bool:
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status '{status}' (one of {', '.join(STATUSES)})")
+        cursor = self._execute("UPDATE assets SET status = ? WHERE path = ?", (status, _key(path)))
+        return cursor.rowcount > 0
+
+    def latest(self, zone: str = None, kind: str = None, status: str = None, max_bytes: int = None,
+               subject: str = None) -> dict:
+        """Newest matching asset and its largest file within `max_bytes`, or None."""
+        where, params = [], []
+        for column, value in (("a.zone", zone), ("a.kind", kind), ("a.status", status), ("a.subject", subject)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if max_bytes is not None:
+            where.append("f.bytes <= ?")
+            params.append(max_bytes)
+        sql = ("SELECT a.*, f.path AS file, f.variant, f.bytes AS file_bytes FROM assets a "
+               "JOIN files f ON f.asset_id = a.id "
+               f"{'WHERE ' + ' AND '.join(where) if where else ''} "
+               "ORDER BY a.created_at DESC, f.bytes DESC LIMIT 1")
+        row = self._execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def query(self, zone: str = None, status: str = None, kind: str = None) -> list:
+        where, params = [], []
+        for column, value in (("zone", zone), ("status", status), ("kind", kind)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        sql = (f"SELECT a.*, (SELECT COUNT(*) FROM files f WHERE f.asset_id = a.id) - 1 AS derived FROM assets a "
+               f"{'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY zone, created_at DESC")
+        return [dict(r) for r in self._execute(sql, params).fetchall()]
+
+    def scan(self, roots: tuple = SCAN_ROOTS) -> int:
+        """Register every non-derived PNG under `roots` that isn't known yet, then its variants."""
+        found = []
+        for root in roots:
+            for path in Path(root).rglob("*.png"):
+                if path.parent.name == "srcset" or DERIVED.search(path.stem):
+                    continue
+                known = self._execute("SELECT 1 FROM assets WHERE path = ?", (_key(path),)).fetchone()
+                if not known:
+                    self.record(path, kind=_kind_for(path), subject=path.stem)
+                found.append(path)
+        self.refresh_variants(found)
+        return len(found)
+
+    def import_spec(self, spec: Path = SPEC_PATH) -> list:
+        """Apply the Status Tracker table in 01-ASSETS.md; returns [(path, status)] applied."""
+        applied = []
+        for line in Path(spec).read_text().splitlines():
+            cells = [c.strip() for c in line.strip().strip("|").split("|")]
+            if len(cells) < 5:
+                continue
+            status = cells[2].strip("*")
+            location = re.search(r"`([^`]+)`", cells[4])
+            if status in STATUSES and location:
+                path = PROJECT_ROOT / location.group(1)
+                if path.exists():
+                    self._execute("UPDATE assets SET subject = ? WHERE path = ?", (cells[1], _key(path)))
+                    if self.set_status(path, status):
+                        applied.append((str(path), status))
+        return applied
+
+    def summary(self) -> str:
+        total = self._execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+        return f"Registry: {self.recorded} asset(s) recorded this run, {total} total ({self.path})"
+
+
+def registry_from_argv(argv: list):
+    """Split `--no-registry` out of argv; returns (Registry or None, remaining args)."""
+    if "--no-registry" in argv:
+        return None, [a for a in argv if a != "--no-registry"]
+    return Registry(), list(argv)
+
+
+def _relative(path: str) -> str:
+    return str(Path(path).relative_to(PROJECT_ROOT)) if path.startswith(str(PROJECT_ROOT)) else path
+
+
+def _option(args: list, flag: str):
+    return option_from_argv(args, flag, usage=__doc__)
+
+
+def main():
+    args = sys.argv[1:]
+    command = args.pop(0) if args else None
+    registry = Registry()
+
+    if command == "scan":
+        print(f"Scanned {registry.scan()} file(s); {registry.recorded} new")
+    elif command == "import-spec":
+        for path, status in registry.import_spec():
+            print(f"  {status:<22} {_relative(path)}")
+    elif command == "status" and len(args) == 2:
+        if args[1] not in STATUSES:
+            raise SystemExit(f"ERROR: unknown status '{args[1]}' (one of {', '.join(STATUSES)})")
+        if not registry.set_status(args[0], args[1]):
+            print(f"ERROR: {args[0]} is not registered (run `scan` first)")
+            sys.exit(1)
+    elif command == "latest":
+        max_kb = option_from_argv(args, "--max-kb", None, float, __doc__)
+        row = registry.latest(zone=_option(args, "--zone"), kind=_option(args, "--kind"),
+                              status=_option(args, "--status"), subject=_option(args, "--subject"),
+                              max_bytes=int(max_kb * 1024) if max_kb else None)
+        if row is None:
+            print("No matching asset")
+            sys.exit(1)
+        print(f"{_relative(row['file'])}  ({row['variant']}, {row['file_bytes'] / 1024:.0f} KB, {row['status']})")
+    elif command == "list":
+        for row in registry.query(zone=_option(args, "--zone"), status=_option(args, "--status"),
+                                  kind=_option(args, "--kind")):
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created_at"]))
+            print(f"  {row['zone'] or '-':<11} {row['status']:<22} {created}  {row['bytes'] / 1024:6.0f} KB  "
+                  f"+{row['derived']:<3} {_relative(row['path'])}")
+    else:
+        print(__doc__.split("Usage (from scripts/):")[1].rstrip())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
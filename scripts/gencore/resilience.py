@@ -0,0 +1,244 @@
+"""
+Retry, backoff and per-model circuit breakers for generation requests.
+
+Transient failures (429 rate limits, 5xx, dropped connections) are retried
+with exponential backoff and full jitter; a Retry-After header on a 429/503
+overrides the computed delay. Each model has a circuit breaker: after
+`failure_threshold` consecutive transient failures it opens and the model is
+skipped until `reset_timeout` has passed, after which a single trial call is
+let through (half-open) while concurrent callers keep being refused. Errors
+that say nothing about the model's health (a 400 for a bad prompt, an empty
+response) don't count. A fallback chain therefore moves straight on to the
+next model instead of burning retries on one that keeps failing.
+
+Every attempt is appended to an `attempts` list as
+    {"model", "attempt", "latency", "error"}
+so callers can put it in their result dict; a model skipped because its
+breaker is open is recorded as attempt 0. When a caller's own failures open
+the breaker mid-retry, it gets its last error back (chained to a
+CircuitOpenError) rather than a bare "circuit open".
+"""
+import random
+import threading
+import time
+
+from . import trace
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose breaker is open."""
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, error: Exception = None) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False  # a half-open trial call is in flight
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; when half-open, only the first caller gets the trial."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "open" or self.trial:
+                return False
+            self.trial = True
+            return True
+
+    def would_allow(self) -> bool:
+        """allow() without claiming the half-open trial."""
+        with self._lock:
+            return self.state == "closed" or (self.state == "half-open" and not self.trial)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        """A transient failure (429, 5xx, timeout); other errors go to record_other."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                # A failed half-open trial re-opens the breaker for another window
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+    def record_other(self):
+        """The call failed for a reason that says nothing about the model: just end any trial."""
+        with self._lock:
+            self.trial = False
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(model: str) -> CircuitBreaker:
+    """Return the process-wide breaker for `model`."""
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker()
+        return _breakers[model]
+
+
+def reset_breakers():
+    """Forget every breaker's state (between benchmark runs, say)."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def is_retryable(error: Exception) -> bool:
+    import httpx
+    from google.genai import errors
+
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_CODES
+    return isinstance(error, (httpx.TransportError, TimeoutError))
+
+
+def _retry_after(error: Exception):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _record(attempts: list, model: str, attempt: int, start: float, error: Exception = None):
+    if attempts is not None:
+        attempts.append({
+            "model": model,
+            "attempt": attempt,
+            "latency": round(time.perf_counter() - start, 3),
+            "error": str(error) if error else None,
+        })
+
+
+def call_with_retry(model: str, fn, policy: RetryPolicy = DEFAULT_POLICY, attempts: list = None):
+    """Call fn() with retries, honouring the model's circuit breaker."""
+    breaker = breaker_for(model)
+    last_error = None
+    for attempt in range(1, policy.max_attempts + 1):
+        if not breaker.allow():
+            refused = CircuitOpenError(f"circuit open for {model}")
+            if last_error is None:
+                raise refused
+            raise last_error from refused  # report the failure that opened it, not just "circuit open"
+        trace.attempt(model, attempt)
+        start = time.perf_counter()
+        try:
+            value = fn()
+        except BaseException as e:
+            if not isinstance(e, Exception):  # interrupted or cancelled: free a half-open trial
+                breaker.record_other()
+                raise
+            _record(attempts, model, attempt, start, e)
+            if not is_retryable(e):
+                breaker.record_other()
+                raise
+            breaker.record_failure()
+            if attempt == policy.max_attempts:
+                raise
+            last_error = e
+            if breaker.would_allow():  # else the retry would be refused: don't wait for it
+                time.sleep(policy.delay(attempt, e))
+            continue
+        _record(attempts, model, attempt, start)
+        trace.mark("parsed")
+        breaker.record_success()
+        return value
+
+
+async def call_with_retry_async(model: str, fn, policy: RetryPolicy = DEFAULT_POLICY, attempts: list = None):
+    """Async counterpart of call_with_retry; fn() returns an awaitable."""
+    import asyncio  # only needed (and already loaded) inside an event loop
+
+    breaker = breaker_for(model)
+    last_error = None
+    for attempt in range(1, policy.max_attempts + 1):
+        if not breaker.allow():
+            refused = CircuitOpenError(f"circuit open for {model}")
+            if last_error is None:
+                raise refused
+            raise last_error from refused  # report the failure that opened it, not just "circuit open"
+        trace.attempt(model, attempt)
+        start = time.perf_counter()
+        try:
+            value = await fn()
+        except BaseException as e:
+            if not isinstance(e, Exception):  # interrupted or cancelled: free a half-open trial
+                breaker.record_other()
+                raise
+            _record(attempts, model, attempt, start, e)
+            if not is_retryable(e):
+                breaker.record_other()
+                raise
+            breaker.record_failure()
+            if attempt == policy.max_attempts:
+                raise
+            last_error = e
+            if breaker.would_allow():  # else the retry would be refused: don't wait for it
+                await asyncio.sleep(policy.delay(attempt, e))
+            continue
+        _record(attempts, model, attempt, start)
+        trace.mark("parsed")
+        breaker.record_success()
+        return value
+
+
+def call_with_fallback(chain: list, policy: RetryPolicy = DEFAULT_POLICY, attempts: list = None):
+    """
+    Try each (model, fn) in `chain` in order, retrying transient errors.
+
+    Returns (model, value) for the first model that succeeds. Models whose
+    breaker is open are skipped; the last error is re-raised if all fail.
+    """
+    last_error = None
+    for model, fn in chain:
+        if not breaker_for(model).would_allow():
+            last_error = CircuitOpenError(f"circuit open for {model}")
+            if attempts is not None:
+                attempts.append({"model": model, "attempt": 0, "latency": 0.0, "error": str(last_error)})
+            continue
+        try:
+            return model, call_with_retry(model, fn, policy, attempts)
+        except Exception as e:
+            last_error = e
+    raise last_error or RuntimeError("empty fallback chain")
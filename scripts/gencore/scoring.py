@@ -0,0 +1,143 @@
+"""
+Cheap local quality metrics for picking the best of several candidates.
+
+All candidates from one request are decoded, downscaled to a common size and
+stacked into one (N, H, W, 3) float array, so each metric is a handful of
+vectorized NumPy operations over the whole batch:
+
+    sharpness   variance of the Laplacian of luminance (higher = crisper)
+    exposure    penalises clipped shadows/highlights and a mean far from mid-grey
+    emptiness   how little detail there is in the regions the prompt reserves
+                for text overlays (low gradient energy = usable copy space)
+    edge_match  how close the top/bottom bands are in colour to the
+                neighbouring panels' facing bands
+
+Metrics are z-scored across the batch and combined with WEIGHTS. The spread
+a metric is divided by never drops below its MIN_SPREAD, so differences too
+small to see (a fraction of a percent of exposure, say) don't swing the pick
+the way a real difference in sharpness does.
+
+Requires numpy and Pillow.
+"""
+import io
+
+import numpy as np
+from PIL import Image
+
+SCORE_LONG_EDGE = 512  # candidates are compared at this size
+EDGE_BAND = 0.2        # the prompts ask the top/bottom 20% to blend with neighbours
+
+WEIGHTS = {
+    "sharpness": 1.0,
+    "exposure": 1.0,
+    "emptiness": 1.0,
+    "edge_match": 1.5,
+}
+
+# Smallest spread treated as a real difference, in each metric's own units
+MIN_SPREAD = {
+    "sharpness": 1e-3,   # Laplacian variance; the current panels measure 0.006-0.036
+    "exposure": 0.01,    # 1% of pixels clipped, or the mean 1% off mid-grey
+    "emptiness": 0.005,  # mean gradient of about 1/255 per pixel
+    "edge_match": 0.02,  # RGB distance of about 5/255
+}
+
+LUMA = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def load_rgb(source, size: tuple = None) -> np.ndarray:
+    """Decode bytes or a path into a float32 RGB array in [0, 1], downscaled for scoring."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with Image.open(source) as img:
+        img = img.convert("RGB")
+        if size is None:
+            scale = SCORE_LONG_EDGE / max(img.size)
+            size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.BILINEAR)
+        return np.asarray(img, dtype=np.float32) / 255.0
+
+
+def _luma(batch: np.ndarray) -> np.ndarray:
+    return batch @ LUMA
+
+
+def sharpness(batch: np.ndarray) -> np.ndarray:
+    y = _luma(batch)
+    lap = (4 * y[:, 1:-1, 1:-1]
+           - y[:, :-2, 1:-1] - y[:, 2:, 1:-1]
+           - y[:, 1:-1, :-2] - y[:, 1:-1, 2:])
+    return lap.reshape(len(batch), -1).var(axis=1)
+
+
+def exposure(batch: np.ndarray) -> np.ndarray:
+    y = _luma(batch).reshape(len(batch), -1)
+    clipped = ((y < 0.02) | (y > 0.98)).mean(axis=1)
+    off_centre = np.abs(y.mean(axis=1) - 0.5)
+    return 1.0 - clipped - off_centre
+
+
+def emptiness(batch: np.ndarray, regions: list) -> np.ndarray:
+    """Negative mean gradient magnitude inside the (x0, y0, x1, y1) fractional regions."""
+    y = _luma(batch)
+    gx = np.abs(np.diff(y, axis=2))[:, :-1, :]
+    gy = np.abs(np.diff(y, axis=1))[:, :, :-1]
+    grad = gx + gy
+    _, h, w = grad.shape
+    energy = np.zeros(len(batch), dtype=np.float32)
+    for x0, y0, x1, y1 in regions:
+        region = grad[:, int(y0 * h):max(int(y1 * h), int(y0 * h) + 1), int(x0 * w):max(int(x1 * w), int(x0 * w) + 1)]
+        energy += region.reshape(len(batch), -1).mean(axis=1)
+    return -energy / len(regions)
+
+
+def band_mean(image: np.ndarray, edge: str, band: float = EDGE_BAND) -> np.ndarray:
+    """Mean RGB of the top or bottom band of one image, or of each image in a batch."""
+    rows = max(1, int(image.shape[-3] * band))
+    strip = image[..., :rows, :, :] if edge == "top" else image[..., -rows:, :, :]
+    return strip.mean(axis=(-3, -2))
+
+
+def edge_match(batch: np.ndarray, above: np.ndarray = None, below: np.ndarray = None) -> np.ndarray:
+    """Negative colour distance between the candidates' bands and their neighbours' facing bands."""
+    distance = np.zeros(len(batch), dtype=np.float32)
+    if above is not None:
+        distance += np.linalg.norm(band_mean(batch, "top") - band_mean(above, "bottom"), axis=1)
+    if below is not None:
+        distance += np.linalg.norm(band_mean(batch, "bottom") - band_mean(below, "top"), axis=1)
+    return -distance
+
+
+def _zscore(values: np.ndarray, min_spread: float) -> np.ndarray:
+    return (values - values.mean()) / max(float(values.std()), min_spread)
+
+
+def score_candidates(images: list, overlay_regions: list = None, above=None, below=None) -> list:
+    """
+    Score candidate image bytes; returns one dict per candidate with the raw
+    metrics and a combined "score" (higher is better).
+
+    `above` / `below` are paths or bytes of the neighbouring panels, if known.
+    """
+    first = load_rgb(images[0])
+    size = (first.shape[1], first.shape[0])
+    batch = np.stack([first] + [load_rgb(data, size) for data in images[1:]])
+
+    metrics = {
+        "sharpness": sharpness(batch),
+        "exposure": exposure(batch),
+    }
+    if overlay_regions:
+        metrics["emptiness"] = emptiness(batch, overlay_regions)
+    if above is not None or below is not None:
+        metrics["edge_match"] = edge_match(
+            batch,
+            load_rgb(above, size) if above is not None else None,
+            load_rgb(below, size) if below is not None else None,
+        )
+
+    total = sum(WEIGHTS[name] * _zscore(values, MIN_SPREAD[name]) for name, values in metrics.items())
+    return [
+        {**{name: round(float(values[i]), 5) for name, values in metrics.items()}, "score": round(float(total[i]), 4)}
+        for i in range(len(images))
+    ]
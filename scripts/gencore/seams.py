@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Seam colour-match validator for vertically adjacent panels.
+
+The panel prompts require the top and bottom 20% of every panel to
+colour-match its neighbours; this automates the "Blend Verification
+Checklist" in specs/01-ASSETS.md. Each panel is cropped to its top and
+bottom bands as soon as it is opened; only the bands are converted and
+downscaled to WORK_WIDTH. For every adjacent pair the upper panel's bottom
+band is compared with the lower panel's top band in CIE Lab:
+
+    delta_e      CIE76 distance between the bands' mean colours
+    spread       difference in lightness standard deviation (texture/contrast)
+    histogram    Hellinger distance between the bands' L/a/b histograms (0-1)
+    seam_step    mean |ΔL| across the seam, column by column, using the rows
+                 right at the edge, as a multiple of the step between
+                 neighbouring rows inside the bands themselves (a visible
+                 horizontal line rather than texture)
+    slope_jump   change in vertical lightness gradient across the seam
+                 (a light-to-dark fade that suddenly reverses or flattens)
+
+A pair fails if any metric exceeds THRESHOLDS. Pairs listed in KNOWN_BAD
+are still measured and shown, but don't fail the run.
+
+Requires numpy and Pillow.
+
+Usage (from scripts/):
+    python -m gencore.seams [<image> ...] [--band 0.2] [--set metric=value ...]
+
+Images are checked top to bottom in the order given; by default the newest
+landscape background of each journey zone is used, and a journey zone with no
+background is reported as skipped (its neighbours are compared directly).
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .compose import JOURNEY
+from .assets import ASSETS_DIR, latest_backgrounds
+from .options import fail, option_from_argv
+
+WORK_WIDTH = 512
+DEFAULT_BAND = 0.2
+EDGE_ROWS = 4  # rows either side of the seam used for seam_step / slope_jump
+HIST_BINS = 32
+
+# Calibrated on the seams signed off in the Blend Verification Checklist
+# (sky → forest, forest → coastal, coastal → cave): about 20% above the worst
+# approved value of each metric, so the approved panels pass and a noticeably
+# worse seam doesn't. Measured on those seams:
+#               sky→forest  forest→coastal  coastal→cave
+#   delta_e       12.6          43.0            21.4     the crossfade carries large tint changes
+#   spread         6.6           0.1             2.3
+#   histogram      0.35          0.66            0.30
+#   seam_step      3.3           5.3             2.8
+#   slope_jump     0.82          0.07            0.13
+THRESHOLDS = {
+    "delta_e": 50.0,
+    "spread": 8.0,
+    "histogram": 0.75,
+    "seam_step": 6.5,
+    "slope_jump": 1.0,
+}
+
+# Seams the checklist already lists as open, by (upper zone, lower zone): they are
+# reported but don't fail the check. Remove an entry once its seam passes.
+KNOWN_BAD = {
+    ("cave", "datacenter"): "datacenter-bg still needs the cave ceiling in its top band (specs/01-ASSETS.md)",
+}
+MIN_TEXTURE_STEP = 1.0  # L*, about one JND: a flat band doesn't make every edge infinitely visible
+
+# sRGB (D65) -> XYZ
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+], dtype=np.float32)
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+LAB_RANGES = ((0, 100), (-128, 128), (-128, 128))
+
+
+def srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """(..., 3) uint8 sRGB -> (..., 3) float32 CIE Lab."""
+    c = rgb.astype(np.float32) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ RGB_TO_XYZ.T / WHITE_D65
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def load_bands(path, band: float = DEFAULT_BAND) -> dict:
+    """Crop the top and bottom bands on open, then convert and downscale only those, in Lab."""
+    with Image.open(path) as img:
+        width, height = img.size
+        size = (WORK_WIDTH, max(EDGE_ROWS * 2, round(height * band * WORK_WIDTH / width)))
+        rows = min(height, round(size[1] * width / WORK_WIDTH))  # band height in source pixels
+        boxes = {"top": (0, 0, width, rows), "bottom": (0, height - rows, width, height)}
+        bands = {name: img.crop(box).convert("RGB").resize(size, Image.BILINEAR) for name, box in boxes.items()}
+    return {name: srgb_to_lab(np.asarray(b)) for name, b in bands.items()}
+
+
+def _histogram(lab: np.ndarray) -> np.ndarray:
+    flat = lab.reshape(-1, 3)
+    hists = [np.histogram(flat[:, i], bins=HIST_BINS, range=LAB_RANGES[i])[0] for i in range(3)]
+    hist = np.concatenate(hists).astype(np.float64)
+    return hist / hist.sum()
+
+
+def _row_profile(lab: np.ndarray) -> np.ndarray:
+    """Mean lightness per row."""
+    return lab[..., 0].mean(axis=1)
+
+
+def _texture_step(lab: np.ndarray) -> float:
+    """Median seam_step between neighbouring EDGE_ROWS blocks inside one band."""
+    lightness = lab[..., 0]
+    steps = [np.abs(lightness[i - EDGE_ROWS:i].mean(axis=0) - lightness[i:i + EDGE_ROWS].mean(axis=0)).mean()
+             for i in range(EDGE_ROWS, lightness.shape[0] - EDGE_ROWS + 1, EDGE_ROWS)]
+    return float(np.median(steps))
+
+
+def compare(upper: np.ndarray, lower: np.ndarray) -> dict:
+    """Metrics for the seam between `upper` (bottom band) and `lower` (top band)."""
+    mean_u = upper.reshape(-1, 3).mean(axis=0)
+    mean_l = lower.reshape(-1, 3).mean(axis=0)
+    bc = np.sqrt(_histogram(upper) * _histogram(lower)).sum()  # Bhattacharyya coefficient
+    edge_u = upper[-EDGE_ROWS:, :, 0].mean(axis=0)
+    edge_l = lower[:EDGE_ROWS, :, 0].mean(axis=0)
+    slope_u = np.diff(_row_profile(upper[-EDGE_ROWS * 2:])).mean()
+    slope_l = np.diff(_row_profile(lower[:EDGE_ROWS * 2])).mean()
+    texture = max(MIN_TEXTURE_STEP, _texture_step(upper), _texture_step(lower))
+    return {
+        "delta_e": float(np.linalg.norm(mean_u - mean_l)),
+        "spread": float(abs(upper[..., 0].std() - lower[..., 0].std())),
+        "histogram": float(np.sqrt(max(0.0, 1 - bc))),
+        "seam_step": float(np.abs(edge_u - edge_l).mean() / texture),
+        "slope_jump": float(abs(slope_u - slope_l)),
+    }
+
+
+def check_seams(paths: list, band: float = DEFAULT_BAND, thresholds: dict = None) -> list:
+    """Compare every adjacent pair; returns one dict per seam with metrics and failures."""
+    thresholds = {**THRESHOLDS, **(thresholds or {})}
+    with ThreadPoolExecutor() as pool:  # Pillow releases the GIL while decoding
+        bands = list(pool.map(lambda p: load_bands(p, band), paths))
+
+    seams = []
+    for (a, b), (band_a, band_b) in zip(zip(paths, paths[1:]), zip(bands, bands[1:])):
+        metrics = compare(band_a["bottom"], band_b["top"])
+        failures = [name for name, value in metrics.items() if value > thresholds[name]]
+        known = KNOWN_BAD.get((Path(a).parent.name, Path(b).parent.name))
+        seams.append({"upper": str(a), "lower": str(b), "metrics": metrics, "failures": failures, "known": known})
+    return seams
+
+
+def failed(seams: list) -> list:
+    """Seams that fail and aren't listed in KNOWN_BAD."""
+    return [s for s in seams if s["failures"] and not s.get("known")]
+
+
+def format_report(seams: list, thresholds: dict = None) -> str:
+    thresholds = {**THRESHOLDS, **(thresholds or {})}
+    lines = []
+    for seam in seams:
+        mark = "✓" if not seam["failures"] else "!" if seam.get("known") else "✗"
+        lines.append(f"  {mark} {Path(seam['upper']).name} → {Path(seam['lower']).name}")
+        if seam.get("known"):
+            lines.append(f"      known: {seam['known']}"
+                         f"{'' if seam['failures'] else ' (now passes: remove it from KNOWN_BAD)'}")
+        for name, value in seam["metrics"].items():
+            flag = "  FAIL" if name in seam["failures"] else ""
+            lines.append(f"      {name:<11} {value:7.3f}  (max {thresholds[name]:g}){flag}")
+    passed = sum(not s["failures"] for s in seams)
+    known = sum(bool(s["failures"] and s.get("known")) for s in seams)
+    lines.append(f"\n{passed}/{len(seams)} seams pass{f', {known} known-bad' if known else ''}")
+    return "\n".join(lines)
+
+
+def _setting(value: str) -> tuple:
+    """"step=30" -> ("step", 30.0)"""
+    name, number = value.split("=")
+    return name, float(number)
+
+
+def main():
+    args = sys.argv[1:]
+    band, overrides = option_from_argv(args, "--band", DEFAULT_BAND, float, __doc__), {}
+    while "--set" in args:
+        name, value = option_from_argv(args, "--set", kind=_setting, usage=__doc__)
+        if name not in THRESHOLDS:
+            fail(f"unknown metric '{name}' (one of {', '.join(THRESHOLDS)})", __doc__)
+        overrides[name] = value
+
+    if args:
+        paths = [Path(a) for a in args]
+        missing = [str(p) for p in paths if not p.is_file()]
+        if missing:
+            fail(f"no such image: {', '.join(missing)}", __doc__)
+    else:
+        latest = {p.parent.name: p for p in latest_backgrounds()}
+        paths = [latest[z] for z in JOURNEY if z in latest]
+        for zone in JOURNEY:
+            if zone not in latest:
+                print(f"  - {zone}: skipped, no landscape background in {ASSETS_DIR.name}/{zone}/")
+    if len(paths) < 2:
+        fail("need at least two panels to check", __doc__)
+
+    seams = check_seams(paths, band, overrides)
+    print(format_report(seams, overrides))
+    if failed(seams):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
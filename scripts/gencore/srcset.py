@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Responsive width ladder and asset manifest for the frontend.
+
+For the current background of every zone in public/assets (and its portrait
+crop, if gencore/crop.py made one) this encodes each rung of WIDTHS in each
+modern format under public/assets/<zone>/srcset/, then writes
+public/assets/manifest.json:
+
+    {
+      "widths": [640, 1080, 1600, 2560],
+      "zones": {
+        "sky": {
+          "landscape": {
+            "src": "/assets/sky/sky-background-v3.png", "width": 1376, "height": 768,
+            "variants": [{"src", "type", "width", "height", "bytes"}, ...],
+            "srcset": {"image/avif": "/assets/sky/srcset/...-640w.avif 640w, ...", ...}
+          },
+          "portrait": {...}
+        }
+      }
+    }
+
+Rungs wider than the source are skipped (the source width is used as the top
+rung instead), and outputs newer than their source are not re-encoded.
+Encoding runs in a process pool. Requires Pillow (and numpy, via crop.py).
+
+Usage (from scripts/):
+    python -m gencore.srcset [--widths 640,1080,1600,2560] [--formats avif,webp]
+"""
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from .assets import ASSETS_DIR, latest_backgrounds
+from .crop import crop_path
+from .export import encode
+from .fsutil import atomic_write
+from .options import int_list, option_from_argv, str_list
+
+WIDTHS = (640, 1080, 1600, 2560)
+FORMATS = ("avif", "webp")
+QUALITY = {"avif": 55, "webp": 78}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+MANIFEST_PATH = ASSETS_DIR / "manifest.json"
+
+
+def ladder(source_width: int, widths: tuple = WIDTHS) -> list:
+    """Rungs that fit the source, capped by the source width itself."""
+    top = min(source_width, max(widths))
+    return [w for w in widths if w < top] + [top]
+
+
+def rung_path(source: Path, width: int, fmt: str) -> Path:
+    return source.parent / "srcset" / f"{source.stem}-{width}w.{fmt}"
+
+
+def encode_rung(source: str, width: int, fmt: str) -> dict:
+    """Encode one (source, width, format) rung unless an up-to-date file exists; runs in a worker process."""
+    from PIL import Image
+
+    source = Path(source)
+    output = rung_path(source, width, fmt)
+    if output.exists() and output.stat().st_mtime >= source.stat().st_mtime:
+        with Image.open(output) as img:
+            size = img.size
+        reused = True
+    else:
+        with Image.open(source) as img:
+            height = round(img.height * width / img.width)
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            img = img.convert("RGBA" if has_alpha else "RGB").resize((width, height), Image.LANCZOS)
+        output.parent.mkdir(exist_ok=True)
+        atomic_write(output, encode(img, fmt, QUALITY[fmt]))
+        size = img.size
+        reused = False
+    return {
+        "source": str(source),
+        "path": str(output),
+        "type": MIME_TYPES[fmt],
+        "width": size[0],
+        "height": size[1],
+        "bytes": output.stat().st_size,
+        "reused": reused,
+    }
+
+
+def public_url(path) -> str:
+    return "/" + Path(path).resolve().relative_to(ASSETS_DIR.parent).as_posix()
+
+
+def build(sources: list, widths: tuple = WIDTHS, formats: tuple = FORMATS, max_workers: int = None) -> dict:
+    """Encode every rung for `sources` (+ their portrait crops) and return the manifest dict."""
+    from PIL import Image
+
+    entries = []  # (zone, orientation, source, width, height)
+    for source in sources:
+        source = Path(source).resolve()
+        for orientation, path in (("landscape", source), ("portrait", crop_path(source))):
+            if path.exists():
+                with Image.open(path) as img:
+                    entries.append((source.parent.name, orientation, path, img.width, img.height))
+
+    jobs = [(str(path), width, fmt)
+            for _, _, path, source_width, _ in entries
+            for width in ladder(source_width, widths)
+            for fmt in formats]
+    rungs, errors = {}, []
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {pool.submit(encode_rung, *job): job for job in jobs}
+        for future in as_completed(futures):
+            source, width, fmt = futures[future]
+            try:
+                rungs.setdefault(source, []).append(future.result())
+            except Exception as e:
+                errors.append(f"{Path(source).name} {width}w {fmt}: {e}")
+
+    zones = {}
+    for zone, orientation, path, width, height in entries:
+        variants = sorted(rungs.get(str(path), []), key=lambda r: (r["type"], r["width"]))
+        zones.setdefault(zone, {})[orientation] = {
+            "src": public_url(path),
+            "width": width,
+            "height": height,
+            "variants": [{"src": public_url(r["path"]), **{k: r[k] for k in ("type", "width", "height", "bytes")}}
+                         for r in variants],
+            "srcset": {
+                MIME_TYPES[fmt]: ", ".join(f"{public_url(r['path'])} {r['width']}w"
+                                           for r in variants if r["type"] == MIME_TYPES[fmt])
+                for fmt in formats
+            },
+        }
+
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "widths": list(widths),
+        "zones": dict(sorted(zones.items())),
+        "errors": errors,
+        "encoded": sum(not r["reused"] for rs in rungs.values() for r in rs),
+        "reused": sum(r["reused"] for rs in rungs.values() for r in rs),
+    }
+
+
+def write_manifest(manifest: dict, path: Path = MANIFEST_PATH):
+    """Write the frontend-facing part of `manifest` atomically."""
+    public = {k: manifest[k] for k in ("generated", "widths", "zones")}
+    atomic_write(path, (json.dumps(public, indent=2) + "\n").encode("utf-8"))
+
+
+def format_report(manifest: dict) -> str:
+    lines = []
+    for zone, orientations in manifest["zones"].items():
+        for orientation, entry in orientations.items():
+            total = sum(v["bytes"] for v in entry["variants"])
+            smallest = min(entry["variants"], key=lambda v: v["bytes"], default=None)
+            detail = f", smallest {smallest['bytes'] / 1024:.0f} KB ({smallest['width']}w)" if smallest else ""
+            lines.append(f"  {zone:<11} {orientation:<9} {len(entry['variants'])} files, "
+                         f"{total / 1024:.0f} KB total{detail}")
+    lines.extend(f"  ✗ {e}" for e in manifest["errors"])
+    lines.append(f"\n{manifest['encoded']} encoded, {manifest['reused']} up to date")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    widths = option_from_argv(args, "--widths", WIDTHS, int_list, __doc__)
+    formats = option_from_argv(args, "--formats", FORMATS, str_list, __doc__)
+
+    sources = latest_backgrounds()
+    if not sources:
+        print(f"No landscape backgrounds found under {ASSETS_DIR}")
+        sys.exit(1)
+
+    manifest = build(sources, widths, formats)
+    write_manifest(manifest)
+    print(format_report(manifest))
+    print(f"Manifest: {MANIFEST_PATH}")
+    if manifest["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the gencore CLI (gencore/cli.py).
+
+Runs each command as a fresh process --repeats times and reports the median
+and worst wall time, and the median above a bare interpreter (`python -c
+pass`, the floor no command can beat). Listing, help and validation commands
+are held to BUDGET_MS; anything else is shown for comparison: a direct
+script invocation (which imports the script and gencore, but not the SDK)
+and the SDK import alone, which every command paid before imports were
+deferred.
+
+Exits 1 if a budgeted command's median is over BUDGET_MS.
+
+Usage (from scripts/):
+    python -m gencore.startup [--repeats 10]
+"""
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .options import option_from_argv
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+BUDGET_MS = 100
+DEFAULT_REPEATS = 10
+
+CLI = [sys.executable, "-m", "gencore"]
+BUDGETED = [
+    ("help", CLI + ["--help"]),
+    ("scenes --list", CLI + ["scenes", "--list"]),
+    ("scenes <bad zone>", CLI + ["scenes", "atlantis"]),
+    ("panels --list", CLI + ["panels", "--list"]),
+    ("panels <bad panel>", CLI + ["panels", "moon-bg"]),
+    ("sprites --list", CLI + ["sprites", "--list"]),
+    ("sprites <bad creature>", CLI + ["sprites", "forest", "yeti"]),
+    ("backgrounds <bad zone>", CLI + ["backgrounds", "atlantis"]),
+    ("models", CLI + ["models"]),
+]
+REFERENCE = [
+    ("python -c pass", [sys.executable, "-c", "pass"]),
+    ("script <bad zone>", [sys.executable, "generate-zone-scenes.py", "atlantis"]),
+    ("import google.genai", [sys.executable, "-c", "import google.genai"]),
+]
+
+
+def measure(argv: list, repeats: int) -> list:
+    """Wall times (seconds) of `repeats` runs of `argv` from scripts/."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    args = sys.argv[1:]
+    repeats = option_from_argv(args, "--repeats", DEFAULT_REPEATS, int, __doc__)
+
+    reference = {name: measure(argv, repeats) for name, argv in REFERENCE}
+    floor = statistics.median(reference["python -c pass"])
+    print(f"{'command':<26} {'median':>8} {'max':>8} {'over python':>12}")
+
+    over = []
+    for name, argv in BUDGETED:
+        times = measure(argv, repeats)
+        median = statistics.median(times)
+        ok = median * 1000 <= BUDGET_MS
+        if not ok:
+            over.append(name)
+        print(f"{'✓' if ok else '✗'} {name:<24} {median * 1000:6.0f}ms {max(times) * 1000:6.0f}ms "
+              f"{(median - floor) * 1000:10.0f}ms")
+    print()
+    for name, times in reference.items():
+        median = statistics.median(times)
+        print(f"  {name:<24} {median * 1000:6.0f}ms {max(times) * 1000:6.0f}ms {(median - floor) * 1000:10.0f}ms")
+
+    print(f"\n{repeats} runs each; budget {BUDGET_MS} ms for listing/help/validation")
+    if over:
+        print(f"Over budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
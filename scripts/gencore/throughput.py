@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Offline throughput/latency benchmark for the generation pipeline.
+
+Runs the real generator code paths against the local stand-in server
+(gencore/fake_server.py), so concurrency settings and overheads can be
+measured without touching the live API:
+
+    zone-scenes   generate-zone-scenes.py      generate_zone_scene (async engine)
+    wildlife      archive/generate-realistic-wildlife.py  generate_wildlife (async engine)
+    v3            generate-v3-background.py    generate_with_imagen (threads, fallback chain)
+
+Each scenario runs --jobs jobs at every concurrency level. The stand-in's
+latency distribution, payload size, 429 rate and 500 rate are configurable.
+For each level the report gives throughput, p50/p95/p99 job latency (from
+the job starting, retries included), failed jobs, retries and what the
+server saw, plus the smallest concurrency that reaches 90% of the best
+throughput. The random draws (latency, 429/500 rolls, retry jitter) are
+seeded per level so runs with the same settings are comparable.
+
+Results can be saved as a baseline (.cache/bench/throughput.json); later runs
+with the same settings are compared against it, and a throughput drop or p95
+rise beyond REGRESSION is flagged and exits 1.
+
+Usage (from scripts/):
+    python -m gencore.throughput [scenario ...] [--jobs 24] [--concurrency 1,2,4,8,16]
+                                 [--latency lognormal:0.3,0.5] [--payload-kb 200]
+                                 [--rate-429 0.05] [--error-rate 0.02] [--retry-after 0.5]
+                                 [--seed 0] [--save-baseline] [--verbose]
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .cli import load_script as _load_script
+from .client import aclose_client, close_client
+from .engine import GenerationEngine
+from .fake_server import FakeImageServer, payload_png
+from .options import option_from_argv
+from .resilience import reset_breakers
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = SCRIPTS_DIR.parent / ".cache" / "bench" / "throughput.json"
+
+SCENARIOS = {
+    "zone-scenes": "generate-zone-scenes.py",
+    "wildlife": "archive/generate-realistic-wildlife.py",
+    "v3": "generate-v3-background.py",
+}
+DEFAULT_JOBS = 24
+DEFAULT_CONCURRENCY = (1, 2, 4, 8, 16)
+DEFAULT_SERVER = {"latency": "lognormal:0.3,0.5", "payload_kb": 200.0, "rate_429": 0.0, "error_rate": 0.0,
+                  "retry_after": 0.5}
+REGRESSION = {"throughput": -0.15, "p95": 0.25}  # relative change that counts as a regression
+GOOD_ENOUGH = 0.9  # fraction of peak throughput for the suggested concurrency
+
+def load_script(name: str):
+    """The generator module behind scenario `name`."""
+    return _load_script(SCRIPTS_DIR / SCENARIOS[name])
+
+
+async def _timed(coro, slot: asyncio.Semaphore) -> tuple:
+    # Gate here too, so the measured time is the job's own (retries included), not its wait for a slot
+    async with slot:
+        start = time.perf_counter()
+        result = await coro
+        return time.perf_counter() - start, result
+
+
+def _run_engine(name: str, module, jobs: int, concurrency: int, output_dir: Path) -> list:
+    engine = GenerationEngine(concurrency=concurrency)
+    if name == "zone-scenes":
+        zones = list(module.ZONE_SCENES)
+        calls = [module.generate_zone_scene(zones[i % len(zones)], output_dir, engine) for i in range(jobs)]
+    else:
+        creatures = [(zone, c) for zone, cs in module.WILDLIFE.items() for c in cs]
+        calls = [module.generate_wildlife(*creatures[i % len(creatures)], output_dir, engine) for i in range(jobs)]
+
+    async def run_all():
+        slot = asyncio.Semaphore(concurrency)
+        try:
+            return await asyncio.gather(*(_timed(call, slot) for call in calls))
+        finally:
+            await aclose_client()  # inside the loop, before asyncio.run closes it
+
+    return asyncio.run(run_all())
+
+
+def _run_threads(module, jobs: int, concurrency: int, output_dir: Path) -> list:
+    panels = list(module.PANEL_PROMPTS.items())
+
+    def one(i):
+        start = time.perf_counter()
+        panel, prompt = panels[i % len(panels)]
+        result = module.generate_with_imagen(prompt, str(output_dir / f"{panel}-{i}.png"))
+        return time.perf_counter() - start, result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(jobs)))
+
+
+def percentile(values: list, p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def run_level(name: str, server: FakeImageServer, jobs: int, concurrency: int, seed: int = 0,
+              verbose: bool = False) -> dict:
+    """Run `jobs` jobs of scenario `name` at `concurrency`; returns the level's metrics."""
+    module = load_script(name)
+    random.seed(seed)
+    reset_breakers()
+    close_client()  # fresh pool (and event-loop binding) per level
+    before = dict(server.stats)
+    output = io.StringIO()
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stdout if verbose else output):
+        start = time.perf_counter()
+        if name == "v3":
+            timed = _run_threads(module, jobs, concurrency, Path(tmp))
+        else:
+            timed = _run_engine(name, module, jobs, concurrency, Path(tmp))
+        elapsed = time.perf_counter() - start
+    close_client()
+
+    latencies = [t for t, r in timed if r["success"]]
+    seen = {k: server.stats[k] - before[k] for k in server.stats}
+    return {
+        "concurrency": concurrency,
+        "jobs": jobs,
+        "ok": len(latencies),
+        "failed": jobs - len(latencies),
+        "retries": sum(max(0, len(r["attempts"]) - 1) for _, r in timed),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "server": {k: seen[k] for k in ("requests", "connections", "rate_limited", "errors")},
+    }
+
+
+def suggest(levels: list) -> int:
+    """Smallest concurrency within GOOD_ENOUGH of the best throughput."""
+    best = max(level["throughput"] for level in levels)
+    return min(level["concurrency"] for level in levels if level["throughput"] >= GOOD_ENOUGH * best)
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """Regressions of `results` against `baseline` as readable strings."""
+    regressions = []
+    for name, levels in results.items():
+        old_levels = {lv["concurrency"]: lv for lv in baseline.get(name, [])}
+        for level in levels:
+            old = old_levels.get(level["concurrency"])
+            if not old:
+                continue
+            throughput = level["throughput"] / old["throughput"] - 1 if old["throughput"] else 0.0
+            p95 = level["p95"] / old["p95"] - 1 if old["p95"] else 0.0
+            if throughput < REGRESSION["throughput"]:
+                regressions.append(f"{name} @{level['concurrency']}: throughput {throughput:+.0%} "
+                                   f"({old['throughput']:.2f} -> {level['throughput']:.2f} jobs/s)")
+            if p95 > REGRESSION["p95"]:
+                regressions.append(f"{name} @{level['concurrency']}: p95 {p95:+.0%} "
+                                   f"({old['p95'] * 1000:.0f} -> {level['p95'] * 1000:.0f} ms)")
+    return regressions
+
+
+def format_report(name: str, levels: list, baseline: list = None) -> str:
+    old = {lv["concurrency"]: lv for lv in baseline or []}
+    best = max(level["throughput"] for level in levels) or 1
+    lines = [f"\n{name}",
+             f"  {'conc':>4} {'jobs/s':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'failed':>6} {'retries':>7} "
+             f"{'reqs':>5} {'429':>4} {'500':>4} {'conns':>5}"]
+    for lv in levels:
+        s = lv["server"]
+        delta = ""
+        if lv["concurrency"] in old and old[lv["concurrency"]]["throughput"]:
+            delta = f" ({lv['throughput'] / old[lv['concurrency']]['throughput'] - 1:+.0%} vs baseline)"
+        bar = "█" * round(20 * lv["throughput"] / best)
+        lines.append(f"  {lv['concurrency']:>4} {lv['throughput']:7.2f} {lv['p50'] * 1000:5.0f}ms "
+                     f"{lv['p95'] * 1000:5.0f}ms {lv['p99'] * 1000:5.0f}ms {lv['failed']:>6} {lv['retries']:>7} "
+                     f"{s['requests']:>5} {s['rate_limited']:>4} {s['errors']:>4} {s['connections']:>5}  {bar}{delta}")
+    lines.append(f"  suggested concurrency: {suggest(levels)} (>= {GOOD_ENOUGH:.0%} of peak throughput)")
+    return "\n".join(lines)
+
+
+def _levels(value: str) -> tuple:
+    """"1,4,8" -> (1, 4, 8), in the order given."""
+    return tuple(int(c) for c in value.split(","))
+
+
+def main():
+    args = sys.argv[1:]
+    verbose, save = "--verbose" in args, "--save-baseline" in args
+    args = [a for a in args if a not in ("--verbose", "--save-baseline")]
+    jobs = option_from_argv(args, "--jobs", DEFAULT_JOBS, int, __doc__)
+    seed = option_from_argv(args, "--seed", 0, int, __doc__)
+    levels = option_from_argv(args, "--concurrency", DEFAULT_CONCURRENCY, _levels, __doc__)
+    server_settings = {
+        "latency": option_from_argv(args, "--latency", DEFAULT_SERVER["latency"], usage=__doc__),
+        "payload_kb": option_from_argv(args, "--payload-kb", DEFAULT_SERVER["payload_kb"], float, __doc__),
+        "rate_429": option_from_argv(args, "--rate-429", DEFAULT_SERVER["rate_429"], float, __doc__),
+        "error_rate": option_from_argv(args, "--error-rate", DEFAULT_SERVER["error_rate"], float, __doc__),
+        "retry_after": option_from_argv(args, "--retry-after", DEFAULT_SERVER["retry_after"], float, __doc__),
+    }
+    scenarios = args or list(SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"ERROR: unknown scenario(s) {', '.join(sorted(unknown))} (one of {', '.join(SCENARIOS)})")
+
+    settings = {"jobs": jobs, "seed": seed, **server_settings}
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else None
+    if baseline and baseline["settings"] != settings:
+        print(f"Baseline {BASELINE_PATH} was recorded with different settings; not comparing")
+        baseline = None
+
+    print("=" * 70)
+    print("GENERATION THROUGHPUT BENCHMARK (local stand-in server)")
+    print(f"Jobs per level: {jobs}, concurrency: {', '.join(map(str, levels))}")
+    print(f"Server: latency {server_settings['latency']}, payload {server_settings['payload_kb']:g} KB, "
+          f"429 rate {server_settings['rate_429']:g}, 500 rate {server_settings['error_rate']:g}")
+    print("=" * 70)
+
+    os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+    results = {}
+    with FakeImageServer(latency=server_settings["latency"], png=payload_png(server_settings["payload_kb"]),
+                         rate_limit_rate=server_settings["rate_429"], error_rate=server_settings["error_rate"],
+                         retry_after=server_settings["retry_after"]) as server:
+        os.environ["GENCORE_BASE_URL"] = server.base_url
+        for name in scenarios:
+            results[name] = [run_level(name, server, jobs, c, seed, verbose) for c in levels]
+            print(format_report(name, results[name], (baseline or {}).get("results", {}).get(name)))
+
+    regressions = compare(results, baseline["results"]) if baseline else []
+    if save:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps({"settings": settings, "results": results}, indent=2) + "\n")
+        print(f"\nBaseline saved: {BASELINE_PATH}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against baseline:")
+        for r in regressions:
+            print(f"  ✗ {r}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Per-job tracing for the generators, written as JSON lines.
+
+A job is opened with `trace.job(id, model)` around everything a generator
+does for one zone/creature/panel. Milestones are marked as the job passes
+them, and each mark emits the span since the previous one:
+
+    cache       cache lookup done (only with a cache)
+    setup       SDK imported and shared client created (paid once per process;
+                the job itself is described before the trace opens)
+    queued      engine slot acquired (wait behind other jobs)
+    built       request contents built (reference encoding, parts)
+    connect     new TCP connection opened (absent when a pooled one is reused)
+    sent        request body uploaded
+    first_byte  response headers received (model latency)
+    parsed      response read and decoded into images
+    backoff     wait before a retry (after a 429/5xx)
+    written     outputs written (candidates, scoring, dedupe)
+    total       whole job, with status ok/error (and the error)
+
+Every line carries job, model, attempt, stage, start (epoch seconds) and
+duration_ms. `sent` and `first_byte` come from httpx's trace hooks on the
+shared client (gencore/client.py).
+
+Tracing is off unless a generator is run with --trace (or GENCORE_TRACE is
+set to a file path); traces go to .cache/traces/<script>-<timestamp>.jsonl.
+
+Usage (from scripts/):
+    python -m gencore.trace [trace.jsonl ...]     # summarize (default: newest trace)
+"""
+import contextlib
+import contextvars
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+TRACE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "traces"
+STAGES = ("cache", "setup", "queued", "built", "connect", "sent", "first_byte", "parsed", "backoff", "written", "total")
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# httpcore trace events that end a stage
+HTTP_EVENTS = {
+    "connection.connect_tcp.complete": "connect",
+    "http11.send_request_body.complete": "sent",
+    "http2.send_request_body.complete": "sent",
+    "http11.receive_response_headers.complete": "first_byte",
+    "http2.receive_response_headers.complete": "first_byte",
+}
+
+_tracer = None
+_current = contextvars.ContextVar("gencore_trace_job", default=None)
+
+
+class Tracer:
+    """Appends trace records to a JSONL file; safe to share across threads."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None  # opened on the first record, so runs that fail early leave no empty trace
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict):
+        line = json.dumps(record)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", buffering=1)
+            self._file.write(line + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class Timeline:
+    """Milestones of one job; each mark emits the span since the previous one."""
+
+    def __init__(self, tracer: Tracer, job_id: str, model: str = None):
+        self.tracer = tracer
+        self.job_id = job_id
+        self.model = model
+        self.attempt = 1
+        self.error = None
+        self.started = time.perf_counter()
+        self.wall = time.time()
+        self.last = self.started
+
+    def mark(self, stage: str, **fields):
+        now = time.perf_counter()
+        self.tracer.emit({"job": self.job_id, "model": self.model, "attempt": self.attempt, "stage": stage,
+                          "start": round(self.wall + self.last - self.started, 6),
+                          "duration_ms": round((now - self.last) * 1000, 3), **fields})
+        self.last = now
+
+
+def enable(path: Path) -> Tracer:
+    global _tracer
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def trace_from_argv(argv: list):
+    """Split `--trace` out of argv and start tracing; returns (trace path or None, remaining args)."""
+    args = list(argv)
+    path = os.environ.get("GENCORE_TRACE")
+    if "--trace" in args:
+        args.remove("--trace")
+        script = Path(sys.argv[0]).stem or "trace"
+        path = path or TRACE_DIR / f"{script}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+    if not path:
+        return None, args
+    return enable(path).path, args
+
+
+@contextlib.contextmanager
+def job(job_id: str, model: str = None):
+    """Trace one job; marks made inside (in this task/thread) belong to it."""
+    if _tracer is None:
+        yield None
+        return
+    timeline = Timeline(_tracer, job_id, model)
+    token = _current.set(timeline)
+    try:
+        yield timeline
+    except BaseException as e:
+        timeline.error = timeline.error or str(e)[:200]
+        raise
+    finally:
+        _current.reset(token)
+        now = time.perf_counter()
+        _tracer.emit({"job": job_id, "model": timeline.model, "attempt": timeline.attempt, "stage": "total",
+                      "start": round(timeline.wall, 6), "duration_ms": round((now - timeline.started) * 1000, 3),
+                      "status": "error" if timeline.error else "ok", "error": timeline.error})
+
+
+def mark(stage: str, **fields):
+    """Mark a milestone for the current job (no-op when tracing is off or outside a job)."""
+    timeline = _current.get()
+    if timeline is not None:
+        timeline.mark(stage, **fields)
+
+
+def attempt(model: str, number: int):
+    """Note that attempt `number` against `model` is starting; retries close a backoff span."""
+    timeline = _current.get()
+    if timeline is None:
+        return
+    if number > 1 or model != (timeline.model or model):
+        timeline.mark("backoff")
+    timeline.model, timeline.attempt = model, number
+
+
+def fail(error):
+    """Flag the current job as failed; generators report errors in result dicts rather than raising."""
+    timeline = _current.get()
+    if timeline is not None:
+        timeline.error = str(error)[:200]
+
+
+def http_hooks() -> tuple:
+    """(sync, async) httpx request hooks that report connect/sent/first_byte for the current job."""
+    def tracer_for(timeline):
+        def on_event(name, info):
+            stage = HTTP_EVENTS.get(name)
+            if stage:
+                timeline.mark(stage)
+        return on_event
+
+    def request_hook(request):
+        timeline = _current.get()
+        if timeline is not None:
+            request.extensions["trace"] = tracer_for(timeline)
+
+    async def async_request_hook(request):
+        timeline = _current.get()
+        if timeline is not None:
+            on_event = tracer_for(timeline)
+
+            async def trace(name, info):
+                on_event(name, info)
+            request.extensions["trace"] = trace
+
+    return request_hook, async_request_hook
+
+
+def load(paths: list) -> list:
+    records = []
+    for path in paths:
+        with open(path) as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def _histogram(values: list) -> str:
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for v in values:
+        counts[next((i for i, b in enumerate(BUCKETS_MS) if v < b), len(BUCKETS_MS))] += 1
+    peak = max(counts) or 1
+    return "".join(" ▁▂▃▄▅▆▇█"[round(8 * c / peak)] if c else "·" for c in counts)
+
+
+def summarize(records: list) -> str:
+    """Latency table (count, p50, p95, max, histogram) per model and stage."""
+    groups = {}
+    for r in records:
+        groups.setdefault((r["model"] or "-", r["stage"]), []).append(r["duration_ms"])
+    edges = " ".join(f"{b}" for b in BUCKETS_MS)
+    lines = [f"histogram buckets (ms): <{edges.replace(' ', ' <')} >=", ""]
+    for model in sorted({m for m, _ in groups}):
+        lines.append(model)
+        lines.append(f"  {'stage':<11} {'n':>4} {'p50':>9} {'p95':>9} {'max':>9}  histogram")
+        ordered = sorted((s for m, s in groups if m == model),
+                         key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES))
+        for stage in ordered:
+            values = sorted(groups[(model, stage)])
+            p95 = statistics.quantiles(values, n=20, method="inclusive")[18] if len(values) > 1 else values[0]
+            lines.append(f"  {stage:<11} {len(values):>4} {statistics.median(values):7.1f}ms {p95:7.1f}ms "
+                         f"{values[-1]:7.1f}ms  {_histogram(values)}")
+        lines.append("")
+    jobs = [r for r in records if r["stage"] == "total"]
+    failed = sum(r.get("status") != "ok" for r in jobs)
+    lines.append(f"{len(jobs)} job(s), {failed} failed")
+    return "\n".join(lines)
+
+
+def main():
+    paths = sys.argv[1:]
+    if not paths:
+        traces = sorted(TRACE_DIR.glob("*.jsonl"), key=lambda p: p.stat().st_mtime) if TRACE_DIR.exists() else []
+        if not traces:
+            print(f"No traces in {TRACE_DIR}; run a generator with --trace")
+            sys.exit(1)
+        paths = [traces[-1]]
+    print(f"Trace: {', '.join(str(p) for p in paths)}\n")
+    print(summarize(load(paths)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,35 @@
 """
 Generate photorealistic backgrounds using Google Imagen 3.
 Per specs/ASSET_PROMPTS.md - sequential generation with style reference chaining.
+
+Usage:
+    python generate-v3-background.py <panel-name> [reference-image]
+    python generate-v3-background.py all | <panel-name> <panel-name> ...
+
+The second form schedules panels over PANEL_REFERENCES: each panel starts as
+soon as the panel it takes its style reference from is done, and panels whose
+reference is outside the run (and already has a preview) start immediately.
 """
 import os
 import sys
 import base64
+import contextlib
+import importlib.util
 import json
 from pathlib import Path
 from datetime import datetime
 
-# Try the google.genai package first
-try:
-    from google import genai
-    from google.genai import types
-    USE_GENAI = True
-except ImportError:
-    import google.generativeai as genai_old
-    USE_GENAI = False
+# Use the google.genai package when installed, else the legacy SDK (imported only when generating).
+# find_spec doesn't import it, so listing and argument errors stay fast.
+USE_GENAI = importlib.util.find_spec("google.genai") is not None
+if USE_GENAI:
+    from gencore import (
+        ImageCache, atomic_write, cache_from_argv, call_with_fallback, candidates_from_argv, dedupe_from_argv,
+        estimate, export_from_argv, format_duplicates, format_plan, format_scores, format_timeline, get_client,
+        lookup_images, plan_from_argv, plan_job, portrait_from_argv, run_export, registry_from_argv, run_graph,
+        run_portrait, save_candidates, store_images, trace, trace_from_argv,
+    )
+    from gencore.reference import describe as describe_reference, prepare_reference
 
 # Shared suffix from ASSET_PROMPTS.md
 SHARED_SUFFIX = """Photorealistic, cinematic 16:9 aspect ratio, 2560x1440,
@@ -81,81 +94,147 @@ transitioning to cool blue-green artificial light below,
 Big Sur California, shot on 35mm film.""",
 }
 
-def generate_with_imagen(prompt: str, output_path: str, reference_image_path: str = None):
-    """Generate image using Imagen 3 or Gemini image generation."""
+# Style reference chain: each panel is generated using the panel above it
+PANEL_REFERENCES = {
+    "sky-hero": None,
+    "forest-bg": "sky-hero",
+    "rocky-bg": "forest-bg",
+    "coastal-bg": "rocky-bg",
+    "cave-transition": "coastal-bg",
+}
+
+GEMINI_MODEL = "gemini-2.0-flash-exp-image-generation"
+IMAGEN_FALLBACK_MODEL = "imagen-3.0-generate-002"
+
+
+def generate_with_imagen(prompt: str, output_path: str, reference_image_path: str = None, cache=None,
+                         candidates: int = 1, below_image_path: str = None, index=None) -> dict:
+    """Generate image using Imagen 3 or Gemini image generation.
+
+    Tries Gemini first and falls back to Imagen 3, retrying transient errors
+    on each and skipping any model whose circuit breaker is open. Returns a
+    result dict; `attempts` holds per-attempt model, latency and error, and
+    `job` the request that succeeded (for the asset registry).
+
+    With candidates > 1 every image is kept as `<output>-c<i>.png` and the one
+    whose edge bands best match the reference (panel above) and
+    `below_image_path` (panel below) is promoted to `output_path`.
+    """
+    result = {"success": False, "path": None, "model": None, "cached": False, "attempts": [], "error": None,
+              "candidates": [], "payload_bytes": 0}
 
     api_key = os.environ.get('GOOGLE_API_KEY')
     if not api_key:
         print("ERROR: GOOGLE_API_KEY not found")
-        return False
+        result["error"] = "GOOGLE_API_KEY not found"
+        return result
 
     if USE_GENAI:
-        client = genai.Client(api_key=api_key)
+        from google.genai import types
+
+        client = get_client(api_key)
+        trace.mark("setup")
 
         # Build content parts
         parts = []
+        image_data = None
 
         # Add reference image if provided
         if reference_image_path and Path(reference_image_path).exists():
-            print(f"Using style reference: {reference_image_path}")
-            with open(reference_image_path, "rb") as f:
-                image_data = f.read()
+            reference = prepare_reference(reference_image_path)
+            print(f"Using style reference: {reference_image_path} ({describe_reference(reference)})")
+            image_data = reference["data"]
             parts.append(types.Part(
                 inline_data=types.Blob(
-                    mime_type="image/png",
+                    mime_type=reference["mime_type"],
                     data=image_data
                 )
             ))
             prompt = f"Using this image as a style reference for color temperature, lighting, and atmosphere, generate a new image: {prompt}"
 
         parts.append(types.Part(text=prompt))
-
-        try:
-            # Try Gemini 2.0 image generation first
-            print("Attempting generation with gemini-2.0-flash-exp-image-generation...")
+        result["payload_bytes"] = len(image_data or b"") + len(prompt.encode("utf-8"))
+
+        gemini_config = types.GenerateContentConfig(
+            response_modalities=["IMAGE", "TEXT"],
+            candidate_count=candidates if candidates > 1 else None,
+        )
+        imagen_config = types.GenerateImagesConfig(
+            number_of_images=candidates,
+            aspect_ratio="16:9",
+        )
+
+        def request_gemini():
+            print(f"Attempting generation with {GEMINI_MODEL}...")
             response = client.models.generate_content(
-                model="gemini-2.0-flash-exp-image-generation",
+                model=GEMINI_MODEL,
                 contents=[types.Content(role="user", parts=parts)],
-                config=types.GenerateContentConfig(
-                    response_modalities=["IMAGE", "TEXT"],
-                )
+                config=gemini_config,
             )
+            images = [
+                part.inline_data.data
+                for candidate in response.candidates
+                for part in candidate.content.parts
+                if hasattr(part, 'inline_data') and part.inline_data
+            ]
+            if not images:
+                raise ValueError("No image in response")
+            return images
+
+        def request_imagen():
+            print(f"Attempting generation with {IMAGEN_FALLBACK_MODEL}...")
+            response = client.models.generate_images(
+                model=IMAGEN_FALLBACK_MODEL,
+                prompt=prompt,
+                config=imagen_config,
+            )
+            images = [g.image.image_bytes for g in response.generated_images or []]
+            if not images:
+                raise ValueError("No image generated")
+            return images
+
+        gemini_key = ImageCache.key(GEMINI_MODEL, prompt, gemini_config, image_data)
+        imagen_key = ImageCache.key(IMAGEN_FALLBACK_MODEL, prompt, imagen_config)
+        chain = [
+            (GEMINI_MODEL, lambda: store_images(cache, gemini_key, request_gemini(), GEMINI_MODEL)),
+            (IMAGEN_FALLBACK_MODEL, lambda: store_images(cache, imagen_key, request_imagen(), IMAGEN_FALLBACK_MODEL)),
+        ]
+        trace.mark("built")
 
-            # Extract image
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, 'inline_data') and part.inline_data:
-                    with open(output_path, "wb") as f:
-                        f.write(part.inline_data.data)
-                    print(f"SUCCESS: Saved to {output_path}")
-                    return True
-
+        try:
+            # Looked up once here; the retries below only repeat the request
+            stored = lookup_images(cache, [(GEMINI_MODEL, gemini_key), (IMAGEN_FALLBACK_MODEL, imagen_key)])
+            cached = stored is not None
+            model, images = stored if cached else call_with_fallback(chain, attempts=result["attempts"])
+            saved = save_candidates(
+                images, output_path,
+                above=reference_image_path if image_data else None,
+                below=below_image_path if below_image_path and Path(below_image_path).exists() else None,
+                index=index,
+            )
+            print(f"SUCCESS{' (cached)' if cached else ''}: Saved to {output_path} ({model})")
+            if saved["candidates"]:
+                print(f"{len(images)} candidates, promoted c{saved['best']}:")
+                print(format_scores(saved))
+            if saved["duplicates"]:
+                print("Near-duplicates of existing assets:")
+                print(format_duplicates(saved))
+            result.update(success=True, path=output_path, model=model, cached=cached,
+                          candidates=saved["candidates"],
+                          job={"model": model, "prompt": prompt, "reference": image_data,
+                               "config": gemini_config if model == GEMINI_MODEL else imagen_config})
         except Exception as e:
-            print(f"gemini-2.0 failed: {e}")
-
-            # Try Imagen 3 directly
-            try:
-                print("Attempting generation with imagen-3.0-generate-002...")
-                response = client.models.generate_images(
-                    model="imagen-3.0-generate-002",
-                    prompt=prompt,
-                    config=types.GenerateImagesConfig(
-                        number_of_images=1,
-                        aspect_ratio="16:9",
-                    )
-                )
-
-                if response.generated_images:
-                    img = response.generated_images[0]
-                    with open(output_path, "wb") as f:
-                        f.write(img.image.image_bytes)
-                    print(f"SUCCESS: Saved to {output_path}")
-                    return True
-
-            except Exception as e2:
-                print(f"imagen-3.0 failed: {e2}")
+            for attempt in result["attempts"]:
+                if attempt["error"]:
+                    print(f"  {attempt['model']} attempt {attempt['attempt']}: {attempt['error']}")
+            print(f"All models failed: {e}")
+            result["error"] = str(e)
+            trace.fail(e)
 
     else:
         # Fallback to older API
+        import google.generativeai as genai_old
+
         genai_old.configure(api_key=api_key)
         try:
             model = genai_old.GenerativeModel('gemini-pro-vision')
@@ -163,27 +242,14 @@ def generate_with_imagen(prompt: str, output_path: str, reference_image_path: st
             print(f"Response: {response.text[:200]}...")
         except Exception as e:
             print(f"ERROR: {e}")
+            result["error"] = str(e)
 
-    return False
-
+    return result
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python generate-v3-background.py <panel-name> [reference-image]")
-        print(f"Panels: {', '.join(PANEL_PROMPTS.keys())}")
-        sys.exit(1)
-
-    panel = sys.argv[1]
-    reference = sys.argv[2] if len(sys.argv) > 2 else None
-
-    if panel not in PANEL_PROMPTS:
-        print(f"ERROR: Unknown panel '{panel}'")
-        print(f"Valid panels: {', '.join(PANEL_PROMPTS.keys())}")
-        sys.exit(1)
 
-    # Output paths
-    project_root = Path(__file__).parent.parent
-    assets_dir = project_root / "assets"
+def generate_panel(panel: str, reference: str, assets_dir: Path, cache=None, candidates: int = 1,
+                   index=None) -> dict:
+    """Generate one panel into assets/raw and refresh its preview copy."""
     raw_dir = assets_dir / "raw"
     raw_dir.mkdir(parents=True, exist_ok=True)
 
@@ -194,23 +260,156 @@ def main():
     print(f"\n=== Generating {panel} ===")
     print(f"Prompt preview: {prompt[:200]}...")
 
-    success = generate_with_imagen(prompt, str(output_path), reference)
+    # The next panel's preview (if generated already) is the seam below this one
+    panels = list(PANEL_PROMPTS)
+    below = None
+    if panels.index(panel) + 1 < len(panels):
+        below = str(assets_dir / "preview" / f"{panels[panels.index(panel) + 1]}-v1-preview.png")
+
+    with trace.job(panel, GEMINI_MODEL) if USE_GENAI else contextlib.nullcontext():
+        result = generate_with_imagen(prompt, str(output_path), reference, cache, candidates, below, index)
+        for a in result["attempts"]:
+            status = "ok" if a["error"] is None else a["error"][:80]
+            print(f"  [{panel}] {a['model']} attempt {a['attempt']}: {a['latency']:.2f}s {status}")
+        print(f"  [{panel}] request payload: {result['payload_bytes'] / 1024:.0f} KB")
+
+        if result["success"]:
+            print(f"\n✓ Generation complete: {output_path}")
+
+            # Create preview copy
+            preview_dir = assets_dir / "preview"
+            preview_dir.mkdir(parents=True, exist_ok=True)
+            preview_path = preview_dir / f"{panel}-v1-preview.png"
+
+            atomic_write(preview_path, output_path.read_bytes())
+            print(f"✓ Preview saved: {preview_path}")
+            result["preview"] = str(preview_path)
+            trace.mark("written")
+
+    return result
+
+
+def generate_panel_graph(panels: list, assets_dir: Path, cache=None, candidates: int = 1, index=None) -> dict:
+    """Generate `panels` concurrently, chaining style references per PANEL_REFERENCES."""
+    graph = {
+        panel: [PANEL_REFERENCES[panel]] if PANEL_REFERENCES[panel] in panels else []
+        for panel in panels
+    }
+
+    def run(panel, finished):
+        parent = PANEL_REFERENCES[panel]
+        if parent in finished:
+            reference = finished[parent]["path"]
+        else:
+            # Parent not part of this run: reuse its last preview if there is one
+            preview = assets_dir / "preview" / f"{parent}-v1-preview.png" if parent else None
+            reference = str(preview) if preview and preview.exists() else None
+        return generate_panel(panel, reference, assets_dir, cache, candidates, index)
+
+    timings = run_graph(graph, run, max_workers=len(panels))
+    print("\n" + "=" * 60)
+    print("PANEL SCHEDULE")
+    print("=" * 60)
+    print(format_timeline(graph, timings))
+    return timings
 
-    if success:
-        print(f"\n✓ Generation complete: {output_path}")
 
-        # Create preview copy
-        preview_dir = assets_dir / "preview"
-        preview_dir.mkdir(parents=True, exist_ok=True)
-        preview_path = preview_dir / f"{panel}-v1-preview.png"
+def main():
+    cache, args = cache_from_argv(sys.argv[1:]) if USE_GENAI else (None, sys.argv[1:])
+    candidates, args = candidates_from_argv(args) if USE_GENAI else (1, args)
+    index, args = dedupe_from_argv(args) if USE_GENAI else (None, args)
+    export, args = export_from_argv(args) if USE_GENAI else (False, args)
+    portrait, args = portrait_from_argv(args) if USE_GENAI else (False, args)
+    registry, args = registry_from_argv(args) if USE_GENAI else (None, args)
+    trace_path, args = trace_from_argv(args) if USE_GENAI else (None, args)
+    dry_run, args = plan_from_argv(args) if USE_GENAI else (False, args)
+
+    if len(args) < 1:
+        print("Usage: python generate-v3-background.py <panel-name> [reference-image] [--no-cache | --refresh]")
+        print("                                        [--candidates N] [--dedupe] [--export] [--portrait]")
+        print("                                        [--no-registry] [--trace] [--dry-run]")
+        print("       python generate-v3-background.py all | <panel-name> <panel-name> ...")
+        print(f"Panels: {', '.join(PANEL_PROMPTS.keys())}")
+        sys.exit(1)
 
-        import shutil
-        shutil.copy(output_path, preview_path)
-        print(f"✓ Preview saved: {preview_path}")
+    project_root = Path(__file__).parent.parent
+    assets_dir = project_root / "assets"
+
+    if args == ["all"]:
+        panels = list(PANEL_PROMPTS)
+    elif len(args) > 1 and all(arg in PANEL_PROMPTS for arg in args):
+        panels = args
     else:
+        panels = args[:1]  # <panel-name> [reference-image]
+
+    for panel in panels:
+        if panel not in PANEL_PROMPTS:
+            print(f"ERROR: Unknown panel '{panel}'")
+            print(f"Valid panels: {', '.join(PANEL_PROMPTS.keys())}")
+            sys.exit(1)
+
+    if dry_run:
+        # A panel waits for its reference when that is generated in the same run (see generate_panel_graph)
+        jobs = [plan_job(panel, [GEMINI_MODEL, IMAGEN_FALLBACK_MODEL], candidates,
+                         deps=[PANEL_REFERENCES[panel]] if PANEL_REFERENCES[panel] in panels else [])
+                for panel in panels]
+        print(format_plan(estimate(jobs, len(panels))))
+        return
+
+    if len(panels) > 1:
+        if not USE_GENAI:
+            print("ERROR: scheduling several panels requires the google.genai package")
+            sys.exit(1)
+        timings = generate_panel_graph(panels, assets_dir, cache, candidates, index)
+        if cache:
+            print(cache.summary())
+        if index:
+            index.save()
+            print(index.summary())
+        done = {panel: t["result"] for panel, t in timings.items() if t["error"] is None}
+        paths = [r["path"] for r in done.values()]
+        if registry:
+            for panel, r in done.items():
+                registry.record(r["path"], r["job"], "background", subject=panel, attempts=r["attempts"],
+                                cached=r["cached"])
+        crops = run_portrait(paths) if portrait else None
+        if export:
+            run_export(paths, "background", mobile=crops)
+        if registry:
+            registry.refresh_variants(paths)
+            print(registry.summary())
+        if trace_path:
+            print(f"Trace: {trace_path}")
+        if any(t["error"] for t in timings.values()):
+            sys.exit(1)
+        return
+
+    panel = panels[0]
+    reference = args[1] if len(args) > 1 else None
+
+    result = generate_panel(panel, reference, assets_dir, cache, candidates, index)
+    if cache:
+        print(cache.summary())
+    if index:
+        index.save()
+        print(index.summary())
+
+    if not result["success"]:
         print("\n✗ Generation failed")
         sys.exit(1)
 
+    if registry:
+        registry.record(result["path"], result["job"], "background", subject=panel, attempts=result["attempts"],
+                        cached=result["cached"])
+    crops = run_portrait([result["path"]]) if portrait else None
+    if export:
+        run_export([result["path"]], "background", mobile=crops)
+    if registry:
+        registry.refresh_variants([result["path"]])
+        print(registry.summary())
+    if trace_path:
+        print(f"Trace: {trace_path}")
+
 
 if __name__ == "__main__":
     main()
@@ -9,11 +9,17 @@ import base64
 from pathlib import Path
 from datetime import datetime
 
-from google import genai
-from google.genai import types
+from gencore import (
+    atomic_write, call_with_retry, count_images, estimate, export_from_argv, format_plan, get_client, plan_from_argv, plan_job,
+    portrait_from_argv, registry_from_argv, run_export, run_portrait, trace, trace_from_argv,
+)
 
-def generate_with_imagen4(zone: str, reference_image_path: str, output_dir: str):
+IMAGEN_MODEL = "imagen-4.0-generate-001"  # or imagen-4.0-ultra-generate-001 for higher quality
+ZONES = ["sky", "forest", "rocky", "coastal", "burrows"]
+
+def generate_with_imagen4(zone: str, reference_image_path: str, output_dir: str, registry=None):
     """Generate a high-quality Pixar-style background using Imagen 4."""
+    from google.genai import types
 
     # Zone-specific detailed prompts
     zone_prompts = {
@@ -97,67 +103,87 @@ def generate_with_imagen4(zone: str, reference_image_path: str, output_dir: str)
         print("ERROR: GOOGLE_API_KEY not found in environment")
         return None
 
-    client = genai.Client(api_key=api_key)
+    client = get_client(api_key)
 
     prompt = zone_prompts[zone].strip()
 
     print(f"\n=== Generating {zone.upper()} with Imagen 4 ===")
     print(f"Prompt preview: {prompt[:300]}...")
 
-    try:
-        # Use Imagen 4 for high quality
-        response = client.models.generate_images(
-            model="imagen-4.0-generate-001",  # or imagen-4.0-ultra-generate-001 for higher quality
-            prompt=prompt,
-            config=types.GenerateImagesConfig(
-                number_of_images=1,
-                aspect_ratio="16:9",  # Wide format for website backgrounds
-                safety_filter_level="block_low_and_above",
-                person_generation="dont_allow",
+    model = IMAGEN_MODEL
+    config = types.GenerateImagesConfig(
+        number_of_images=1,
+        aspect_ratio="16:9",  # Wide format for website backgrounds
+        safety_filter_level="block_low_and_above",
+        person_generation="dont_allow",
+    )
+
+    with trace.job(zone, model):
+        attempts = []
+        try:
+            # Use Imagen 4 for high quality; transient errors are retried
+            trace.mark("built")
+            response = call_with_retry(
+                model, lambda: client.models.generate_images(model=model, prompt=prompt, config=config),
+                attempts=attempts,
             )
-        )
-
-        if response.generated_images:
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            output_filename = f"{zone}-background-pixar-v3-{timestamp}.png"
-            output_path = Path(output_dir) / output_filename
-
-            # Save the image
-            image_data = response.generated_images[0].image.image_bytes
-            with open(output_path, "wb") as f:
-                f.write(image_data)
-
-            print(f"SUCCESS: Generated image saved to {output_path}")
-            return str(output_path)
-        else:
-            print("WARNING: No images generated")
-            if hasattr(response, 'filtered_text'):
-                print(f"Filtered: {response.filtered_text}")
+            count_images(model, len(response.generated_images or []))
+
+            if response.generated_images:
+                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                output_filename = f"{zone}-background-pixar-v3-{timestamp}.png"
+                output_path = Path(output_dir) / output_filename
+
+                # Save the image
+                image_data = response.generated_images[0].image.image_bytes
+                atomic_write(output_path, image_data)
+                trace.mark("written")
+
+                print(f"SUCCESS: Generated image saved to {output_path}")
+                if registry:
+                    registry.record(output_path, {"model": model, "prompt": prompt, "config": config}, "background",
+                                    zone=zone, subject=f"{zone}-bg", attempts=attempts)
+                return str(output_path)
+            else:
+                print("WARNING: No images generated")
+                trace.fail("No images generated")
+                if hasattr(response, 'filtered_text'):
+                    print(f"Filtered: {response.filtered_text}")
+                return None
+
+        except Exception as e:
+            print(f"ERROR: {e}")
+            trace.fail(e)
+            import traceback
+            traceback.print_exc()
             return None
 
-    except Exception as e:
-        print(f"ERROR: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python generate-with-imagen4.py <zone>")
-        print("Zones: sky, forest, rocky, coastal, burrows")
+    export, args = export_from_argv(sys.argv[1:])
+    portrait, args = portrait_from_argv(args)
+    registry, args = registry_from_argv(args)
+    trace_path, args = trace_from_argv(args)
+    dry_run, args = plan_from_argv(args)
+    if len(args) < 1:
+        print("Usage: python generate-with-imagen4.py <zone> [--export] [--portrait] [--no-registry] [--trace]")
+        print("                                       [--dry-run]")
+        print(f"Zones: {', '.join(ZONES)}")
         print("\nThis uses Imagen 4 for higher quality output.")
         sys.exit(1)
 
-    zone = sys.argv[1].lower()
+    zone = args[0].lower()
 
     project_root = Path(__file__).parent.parent
     assets_dir = project_root / "public" / "assets"
 
-    valid_zones = ["sky", "forest", "rocky", "coastal", "burrows"]
-    if zone not in valid_zones:
-        print(f"ERROR: Unknown zone. Valid options: {valid_zones}")
+    if zone not in ZONES:
+        print(f"ERROR: Unknown zone. Valid options: {ZONES}")
         sys.exit(1)
 
+    if dry_run:
+        print(format_plan(estimate([plan_job(zone, [IMAGEN_MODEL])], 1)))
+        return
+
     output_dir = assets_dir / zone
     output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -170,10 +196,18 @@ def main():
         "burrows": assets_dir / "burrows" / "underground-transition-v2.png",
     }
 
-    result = generate_with_imagen4(zone, str(reference_images[zone]), str(output_dir))
+    result = generate_with_imagen4(zone, str(reference_images[zone]), str(output_dir), registry)
 
     if result:
         print(f"\n✓ Generation complete: {result}")
+        crops = run_portrait([result]) if portrait else None
+        if export:
+            run_export([result], "background", mobile=crops)
+        if registry:
+            registry.refresh_variants([result])
+            print(registry.summary())
+        if trace_path:
+            print(f"Trace: {trace_path}")
     else:
         print("\n✗ Generation failed")
         sys.exit(1)
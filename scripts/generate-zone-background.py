@@ -5,21 +5,21 @@ Uses existing background as style reference.
 """
 import os
 import sys
-import base64
 from pathlib import Path
 from datetime import datetime
 
-# Use the newer google.genai package
-from google import genai
-from google.genai import types
+from gencore import (
+    atomic_write, call_with_retry, count_images, estimate, export_from_argv, format_plan, get_client, plan_from_argv, plan_job,
+    portrait_from_argv, registry_from_argv, run_export, run_portrait, trace, trace_from_argv,
+)
+from gencore.reference import describe as describe_reference, prepare_reference
 
-def encode_image_to_base64(image_path: str) -> str:
-    """Read image and encode to base64."""
-    with open(image_path, "rb") as f:
-        return base64.standard_b64encode(f.read()).decode("utf-8")
+MODEL = "gemini-2.0-flash-exp-image-generation"
+ZONES = ["sky", "forest", "rocky", "coastal", "burrows"]
 
-def generate_background(zone: str, reference_image_path: str, output_dir: str):
+def generate_background(zone: str, reference_image_path: str, output_dir: str, registry=None):
     """Generate a Pixar-style background for a zone."""
+    from google.genai import types
 
     # Zone-specific prompts
     zone_prompts = {
@@ -89,81 +89,104 @@ def generate_background(zone: str, reference_image_path: str, output_dir: str):
         print("ERROR: GOOGLE_API_KEY not found in environment")
         return None
 
-    client = genai.Client(api_key=api_key)
-
-    # Load reference image
-    print(f"Loading reference image: {reference_image_path}")
-    reference_data = encode_image_to_base64(reference_image_path)
-
-    prompt = zone_prompts[zone].strip()
-
-    print(f"\n=== Generating {zone.upper()} background ===")
-    print(f"Prompt: {prompt[:200]}...")
-
-    try:
-        # Use Gemini with image generation
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp-image-generation",
-            contents=[
-                types.Content(
-                    role="user",
-                    parts=[
-                        types.Part(
-                            inline_data=types.Blob(
-                                mime_type="image/png",
-                                data=base64.standard_b64decode(reference_data)
-                            )
-                        ),
-                        types.Part(
-                            text=f"""Using this image as a reference for the composition and scene layout,
-                            create a new image in Pixar animation style:
-
-                            {prompt}
-
-                            IMPORTANT: Transform this photorealistic scene into Pixar-style animation art.
-                            Keep the same general composition but make it look like a frame from a
-                            Pixar animated film - stylized, warm, inviting, with painterly textures."""
-                        )
-                    ]
-                )
-            ],
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE", "TEXT"],
-            )
-        )
+    client = get_client(api_key)
 
-        # Extract image from response
-        for part in response.candidates[0].content.parts:
-            if hasattr(part, 'inline_data') and part.inline_data:
-                # Save the generated image
-                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-                output_filename = f"{zone}-background-pixar-{timestamp}.png"
-                output_path = Path(output_dir) / output_filename
+    with trace.job(zone, MODEL):
+        # Load reference image, downscaled to what the model actually uses
+        reference = prepare_reference(reference_image_path)
+        print(f"Loading reference image: {reference_image_path} ({describe_reference(reference)})")
 
-                with open(output_path, "wb") as f:
-                    f.write(part.inline_data.data)
+        prompt = zone_prompts[zone].strip()
 
-                print(f"SUCCESS: Generated image saved to {output_path}")
-                return str(output_path)
-            elif hasattr(part, 'text') and part.text:
-                print(f"Response text: {part.text}")
-
-        print("WARNING: No image found in response")
-        return None
+        print(f"\n=== Generating {zone.upper()} background ===")
+        print(f"Prompt: {prompt[:200]}...")
 
-    except Exception as e:
-        print(f"ERROR generating image: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+        model = MODEL
+        config = types.GenerateContentConfig(
+            response_modalities=["IMAGE", "TEXT"],
+        )
+        trace.mark("built")
+
+        attempts = []
+        try:
+            # Use Gemini with image generation; transient errors are retried
+            response = call_with_retry(model, lambda: client.models.generate_content(
+                model=model,
+                contents=[
+                    types.Content(
+                        role="user",
+                        parts=[
+                            types.Part(
+                                inline_data=types.Blob(
+                                    mime_type=reference["mime_type"],
+                                    data=reference["data"]
+                                )
+                            ),
+                            types.Part(
+                                text=f"""Using this image as a reference for the composition and scene layout,
+                                create a new image in Pixar animation style:
+
+                                {prompt}
+
+                                IMPORTANT: Transform this photorealistic scene into Pixar-style animation art.
+                                Keep the same general composition but make it look like a frame from a
+                                Pixar animated film - stylized, warm, inviting, with painterly textures."""
+                            )
+                        ]
+                    )
+                ],
+                config=config,
+            ), attempts=attempts)
+            print(f"Request: {reference['bytes'] / 1024:.0f} KB reference payload, {attempts[-1]['latency']:.2f}s"
+                  f"{f' ({len(attempts)} attempts)' if len(attempts) > 1 else ''}")
+
+            parts = response.candidates[0].content.parts
+            count_images(model, sum(1 for part in parts if getattr(part, "inline_data", None)))
+
+            # Extract image from response
+            for part in parts:
+                if hasattr(part, 'inline_data') and part.inline_data:
+                    # Save the generated image
+                    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                    output_filename = f"{zone}-background-pixar-{timestamp}.png"
+                    output_path = Path(output_dir) / output_filename
+
+                    atomic_write(output_path, part.inline_data.data)
+                    trace.mark("written")
+
+                    print(f"SUCCESS: Generated image saved to {output_path}")
+                    if registry:
+                        job = {"model": model, "prompt": prompt, "config": config, "reference": reference["data"]}
+                        registry.record(output_path, job, "background", zone=zone, subject=f"{zone}-bg",
+                                        attempts=attempts)
+                    return str(output_path)
+                elif hasattr(part, 'text') and part.text:
+                    print(f"Response text: {part.text}")
+
+            print("WARNING: No image found in response")
+            trace.fail("No image found in response")
+            return None
+
+        except Exception as e:
+            print(f"ERROR generating image: {e}")
+            trace.fail(e)
+            import traceback
+            traceback.print_exc()
+            return None
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python generate-zone-background.py <zone>")
-        print("Zones: sky, forest, rocky, coastal, burrows")
+    export, args = export_from_argv(sys.argv[1:])
+    portrait, args = portrait_from_argv(args)
+    registry, args = registry_from_argv(args)
+    trace_path, args = trace_from_argv(args)
+    dry_run, args = plan_from_argv(args)
+    if len(args) < 1:
+        print("Usage: python generate-zone-background.py <zone> [--export] [--portrait] [--no-registry] [--trace]")
+        print("                                          [--dry-run]")
+        print(f"Zones: {', '.join(ZONES)}")
         sys.exit(1)
 
-    zone = sys.argv[1].lower()
+    zone = args[0].lower()
 
     # Paths
     project_root = Path(__file__).parent.parent
@@ -178,10 +201,14 @@ def main():
         "burrows": assets_dir / "burrows" / "underground-transition-v2.png",
     }
 
-    if zone not in reference_images:
-        print(f"ERROR: Unknown zone. Valid options: {list(reference_images.keys())}")
+    if zone not in ZONES:
+        print(f"ERROR: Unknown zone. Valid options: {ZONES}")
         sys.exit(1)
 
+    if dry_run:
+        print(format_plan(estimate([plan_job(zone, [MODEL])], 1)))
+        return
+
     ref_path = reference_images[zone]
     if not ref_path.exists():
         print(f"ERROR: Reference image not found: {ref_path}")
@@ -190,10 +217,18 @@ def main():
     output_dir = assets_dir / zone
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    result = generate_background(zone, str(ref_path), str(output_dir))
+    result = generate_background(zone, str(ref_path), str(output_dir), registry)
 
     if result:
         print(f"\n✓ Generation complete: {result}")
+        crops = run_portrait([result]) if portrait else None
+        if export:
+            run_export([result], "background", mobile=crops)
+        if registry:
+            registry.refresh_variants([result])
+            print(registry.summary())
+        if trace_path:
+            print(f"Trace: {trace_path}")
     else:
         print("\n✗ Generation failed")
         sys.exit(1)
@@ -3,16 +3,25 @@
 Generate complete zone scenes with integrated wildlife using Imagen 4 Ultra.
 Each scene is a full backdrop with critters already placed in the composition.
 
+Usage: python generate-zone-scenes.py [zone ...] [--no-cache | --refresh] [--concurrency N]
+                                      [--candidates N] [--dedupe] [--export] [--portrait] [--no-registry]
+                                      [--trace] [--dry-run]
+       python generate-zone-scenes.py --resume <run-id>    # only the zones that didn't finish
+
 ALWAYS uses: imagen-4.0-ultra-generate-001 (highest quality as of Feb 2026)
 """
+import asyncio
 import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from google import genai
-from google.genai import types
+from gencore import (
+    GenerationEngine, aclose_client, cache_from_argv, candidates_from_argv, concurrency_from_argv, dedupe_from_argv,
+    estimate, export_from_argv, format_duplicates, format_plan, format_scores, journal_from_argv, plan_from_argv,
+    plan_job, portrait_from_argv, registry_from_argv, run_export, run_portrait, save_candidates, stream, trace,
+    trace_from_argv,
+)
 
 # ============================================================================
 # MODEL CONFIGURATION - ALWAYS USE LATEST/BEST
@@ -23,6 +32,7 @@ IMAGEN_MODEL = "imagen-4.0-ultra-generate-001"
 ZONE_SCENES = {
     "sky": {
         "output_name": "sky-scene-pixar",
+        "overlay_regions": [(0.0, 0.15, 0.65, 0.75)],  # text copy space, as fractions (x0, y0, x1, y1)
         "prompt": """
             A breathtaking California coastal morning sky, wide panoramic view.
 
@@ -46,6 +56,7 @@ ZONE_SCENES = {
     },
     "forest": {
         "output_name": "forest-scene-pixar",
+        "overlay_regions": [(0.5, 0.0, 1.0, 0.6)],  # text copy space, as fractions (x0, y0, x1, y1)
         "prompt": """
             Interior of a majestic California coastal redwood forest, eye-level perspective.
 
@@ -73,6 +84,7 @@ ZONE_SCENES = {
     },
     "rocky": {
         "output_name": "rocky-scene-pixar",
+        "overlay_regions": [(0.0, 0.15, 0.65, 0.75)],  # text copy space, as fractions (x0, y0, x1, y1)
         "prompt": """
             Dramatic Big Sur rocky coastal terrain at golden hour, wide view.
 
@@ -101,6 +113,7 @@ ZONE_SCENES = {
     },
     "coastal": {
         "output_name": "coastal-scene-pixar",
+        "overlay_regions": [(0.35, 0.15, 1.0, 0.75)],  # text copy space, as fractions (x0, y0, x1, y1)
         "prompt": """
             Sweeping Big Sur coastal overlook at golden hour, cinematic wide view.
 
@@ -157,9 +170,28 @@ ZONE_SCENES = {
 }
 
 
-def generate_zone_scene(zone: str, output_dir: Path) -> dict:
+def zone_scene_job(zone: str, candidates: int = 1) -> dict:
+    """Describe the generation request for one zone scene."""
+    from google.genai import types  # deferred so listing/validation don't pay for the SDK import
+
+    return {
+        "id": zone,
+        "kind": "images",
+        "model": IMAGEN_MODEL,
+        "prompt": ZONE_SCENES[zone]["prompt"].strip(),
+        "config": types.GenerateImagesConfig(
+            number_of_images=candidates,
+            aspect_ratio="16:9",  # Wide format for website backgrounds
+            safety_filter_level="block_low_and_above",
+            person_generation="dont_allow",
+        ),
+    }
+
+
+async def generate_zone_scene(zone: str, output_dir: Path, engine: GenerationEngine, candidates: int = 1,
+                              index=None, journal=None) -> dict:
     """Generate a single zone scene."""
-    result = {"zone": zone, "success": False, "path": None, "error": None}
+    result = {"zone": zone, "success": False, "path": None, "error": None, "cached": False, "attempts": []}
 
     if zone not in ZONE_SCENES:
         result["error"] = f"Unknown zone: {zone}"
@@ -171,49 +203,79 @@ def generate_zone_scene(zone: str, output_dir: Path) -> dict:
         return result
 
     scene = ZONE_SCENES[zone]
-    prompt = scene["prompt"].strip()
 
     print(f"\n[{zone.upper()}] Starting generation with {IMAGEN_MODEL}...")
 
-    try:
-        client = genai.Client(api_key=api_key)
-
-        response = client.models.generate_images(
-            model=IMAGEN_MODEL,
-            prompt=prompt,
-            config=types.GenerateImagesConfig(
-                number_of_images=1,
-                aspect_ratio="16:9",  # Wide format for website backgrounds
-                safety_filter_level="block_low_and_above",
-                person_generation="dont_allow",
-            )
-        )
-
-        if response.generated_images:
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            output_filename = f"{scene['output_name']}-{timestamp}.png"
-            output_path = output_dir / output_filename
-
-            image_data = response.generated_images[0].image.image_bytes
-            with open(output_path, "wb") as f:
-                f.write(image_data)
-
-            print(f"[{zone.upper()}] ✓ SUCCESS: {output_path}")
-            result["success"] = True
-            result["path"] = str(output_path)
-        else:
-            result["error"] = "No image generated"
-            print(f"[{zone.upper()}] ✗ No image generated")
-
-    except Exception as e:
-        result["error"] = str(e)
-        print(f"[{zone.upper()}] ✗ ERROR: {e}")
+    job = zone_scene_job(zone, candidates)  # imports the SDK on first use, so outside the traced job
+    with trace.job(zone, IMAGEN_MODEL):
+        try:
+            images, result["cached"] = await engine.generate(job, result["attempts"])
+
+            if images:
+                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                output_filename = f"{scene['output_name']}-{timestamp}.png"
+                output_path = output_dir / output_filename
+
+                saved = save_candidates(images, output_path, scene.get("overlay_regions"), index=index)
+
+                source = " (cached)" if result["cached"] else ""
+                print(f"[{zone.upper()}] ✓ SUCCESS{source}: {output_path}")
+                if saved["candidates"]:
+                    print(f"[{zone.upper()}] {len(images)} candidates, promoted c{saved['best']}:")
+                    print(format_scores(saved))
+                if saved["duplicates"]:
+                    print(f"[{zone.upper()}] near-duplicates of existing assets:")
+                    print(format_duplicates(saved))
+                result["success"] = True
+                result["path"] = str(output_path)
+                result["candidates"] = saved["candidates"]
+                trace.mark("written")
+                if journal:
+                    journal.succeeded(zone, output_path)
+            else:
+                result["error"] = "No image generated"
+                trace.fail(result["error"])
+                if journal:
+                    journal.failed(zone, result["error"])
+                print(f"[{zone.upper()}] ✗ No image generated")
+
+        except Exception as e:
+            result["error"] = str(e)
+            trace.fail(e)
+            if journal:
+                journal.failed(zone, e)
+            print(f"[{zone.upper()}] ✗ ERROR: {e}")
 
     return result
 
 
+async def generate_zone_scenes(zones: list, assets_dir: Path, engine: GenerationEngine, candidates: int = 1,
+                               index=None, journal=None) -> list:
+    """Generate every zone concurrently, collecting results as they finish."""
+    tasks = []
+    for zone in zones:
+        output_dir = assets_dir / zone
+        output_dir.mkdir(parents=True, exist_ok=True)
+        tasks.append(generate_zone_scene(zone, output_dir, engine, candidates, index, journal))
+
+    try:
+        return [result async for result in stream(tasks)]
+    finally:
+        await aclose_client()  # release pooled sockets while their event loop is still running
+
+
 def main():
-    zones_to_generate = sys.argv[1:] if len(sys.argv) > 1 else list(ZONE_SCENES.keys())
+    journal, args = journal_from_argv(sys.argv[1:])
+    cache, args = cache_from_argv(args)
+    concurrency, args = concurrency_from_argv(args)
+    candidates, args = candidates_from_argv(args)
+    index, args = dedupe_from_argv(args)
+    export, args = export_from_argv(args)
+    portrait, args = portrait_from_argv(args)
+    registry, args = registry_from_argv(args)
+    trace_path, args = trace_from_argv(args)
+    dry_run, args = plan_from_argv(args)
+    zones_to_generate = args if args else list(ZONE_SCENES.keys())
 
     # Validate zones
     for zone in zones_to_generate:
@@ -229,26 +291,33 @@ def main():
     print("ZONE SCENE GENERATION")
     print(f"Model: {IMAGEN_MODEL} (highest quality)")
     print(f"Zones: {', '.join(zones_to_generate)}")
+    print(f"Concurrency: {concurrency}, candidates per zone: {candidates}")
     print("=" * 70)
 
-    results = []
-
-    # Generate in parallel using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {}
-        for zone in zones_to_generate:
-            output_dir = assets_dir / zone
-            output_dir.mkdir(parents=True, exist_ok=True)
-            future = executor.submit(generate_zone_scene, zone, output_dir)
-            futures[future] = zone
-
-        for future in as_completed(futures):
-            zone = futures[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                results.append({"zone": zone, "success": False, "error": str(e)})
+    if dry_run:
+        jobs = [
+            plan_job(zone, [IMAGEN_MODEL], candidates,
+                     cached=bool(cache) and cache.contains(GenerationEngine.cache_key(zone_scene_job(zone, candidates))))
+            for zone in zones_to_generate
+        ]
+        print(format_plan(estimate(jobs, concurrency)))
+        return
+
+    # Zones an earlier session of this run (--resume) already wrote are not reissued
+    done = {zone: journal.done(zone) for zone in zones_to_generate}
+    pending = [zone for zone in zones_to_generate if not done[zone]]
+    if len(pending) < len(zones_to_generate):
+        print(f"Resuming run {journal.run_id}: {len(zones_to_generate) - len(pending)} zone(s) already done")
+    journal.queued(pending)
+
+    engine = GenerationEngine(concurrency=concurrency, cache=cache, journal=journal)
+    try:
+        results = asyncio.run(generate_zone_scenes(pending, assets_dir, engine, candidates, index, journal))
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. {journal.resume_hint()}")
+        sys.exit(130)
+    results = [{"zone": zone, "success": True, "path": path, "error": None, "cached": False, "attempts": [],
+                "resumed": True} for zone, path in done.items() if path] + results
 
     # Summary
     print("\n" + "=" * 70)
@@ -260,12 +329,35 @@ def main():
 
     print(f"\nSuccessful: {len(successful)}/{len(results)}")
     for r in successful:
-        print(f"  ✓ {r['zone']}: {r['path']}")
+        print(f"  ✓ {r['zone']}: {r['path']}{' (earlier session)' if r.get('resumed') else ''}")
 
     if failed:
         print(f"\nFailed: {len(failed)}")
         for r in failed:
             print(f"  ✗ {r['zone']}: {r['error']}")
+        print(journal.resume_hint())
+
+    if cache:
+        print(f"\n{cache.summary()}")
+    if index:
+        index.save()
+        print(index.summary())
+    if registry:
+        for r in successful:
+            if r.get("resumed") and registry.contains(r["path"]):
+                continue
+            registry.record(r["path"], zone_scene_job(r["zone"], candidates), "background", zone=r["zone"],
+                            attempts=r["attempts"], cached=r["cached"])
+
+    paths = [r["path"] for r in successful]
+    crops = run_portrait(paths) if portrait else None
+    if export:
+        run_export(paths, "background", mobile=crops)
+    if registry:
+        registry.refresh_variants(paths)
+        print(registry.summary())
+    if trace_path:
+        print(f"Trace: {trace_path}")
 
 
 if __name__ == "__main__":
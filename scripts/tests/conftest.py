@@ -0,0 +1,66 @@
+"""
+Shared fixtures for the gencore tests. Run from scripts/:
+
+    python -m pytest -q tests
+
+Nothing here talks to the live API: requests go to gencore/fake_server.py,
+and the quota and registry databases, journals and lockfiles live in temp
+directories.
+"""
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# Read at import time by gencore.quota and gencore.registry, so set before any test imports them
+_STATE_DIR = Path(tempfile.mkdtemp(prefix="gencore-tests-"))
+os.environ["GENCORE_QUOTA"] = str(_STATE_DIR / "quota.sqlite")
+os.environ["GENCORE_REGISTRY"] = str(_STATE_DIR / "registry.sqlite")
+os.environ.pop("GENCORE_TRACE", None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_STATE_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_breakers():
+    from gencore.resilience import reset_breakers
+
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    """A running FakeImageServer with the shared client pointed at it."""
+    from gencore.client import close_client
+    from gencore.fake_server import FakeImageServer
+
+    close_client()
+    with FakeImageServer(batch_delay=0.2) as server:
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        monkeypatch.setenv("GENCORE_BASE_URL", server.base_url)
+        yield server
+        close_client()
+
+
+@pytest.fixture
+def load_script():
+    """Import one of the hyphen-named scripts in scripts/ (or scripts/archive/) as a module."""
+    def load(name: str):
+        path = SCRIPTS_DIR / name
+        spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
@@ -0,0 +1,105 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from gencore import atlas
+
+
+def _cutout(path, size=(60, 40), colour=(200, 80, 40, 255), mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGBA", size, colour).save(path)
+    if mtime:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    monkeypatch.setattr(atlas, "ASSETS_DIR", tmp_path / "public" / "assets")
+    monkeypatch.setattr(atlas, "ATLAS_DIR", tmp_path / "public" / "assets" / "atlas")
+    atlas.ASSETS_DIR.mkdir(parents=True)
+    return atlas.ASSETS_DIR
+
+
+class _Stop(Exception):
+    pass
+
+
+@pytest.mark.parametrize("script", ["archive/generate-wildlife-sprite.py", "archive/generate-realistic-wildlife.py"])
+def test_sprite_generators_write_under_the_atlas_root(script, load_script, monkeypatch):
+    module = load_script(script)
+    real_mkdir = Path.mkdir
+
+    def mkdir(self, *args, **kwargs):
+        if "sky" in self.parts:
+            raise _Stop(self)
+        return real_mkdir(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "mkdir", mkdir)
+    monkeypatch.setattr(sys, "argv", [script, "sky", "--no-cache"])
+    with pytest.raises(_Stop) as stop:
+        module.main()
+    output_dir = stop.value.args[0]
+    assert output_dir.relative_to(atlas.ASSETS_DIR).parts[0] == "sky"
+
+
+def test_find_sprites_keeps_the_newest_cutout_per_id(assets):
+    zone = assets / "coastal"
+    _cutout(zone / "wildlife" / "sea-otter-20250101-120000-cutout.png", mtime=1000)
+    newest = _cutout(zone / "wildlife" / "sea-otter-20250102-120000-cutout.png", mtime=2000)
+    jay = _cutout(zone / "stellers-jay-cutout.png")
+    (zone / "sea-otter-20250102-120000.png").write_bytes(b"")  # the source with its backdrop
+    assert atlas.find_sprites(zone) == {"sea-otter": newest, "stellers-jay": jay}
+
+
+def test_pack_places_every_sprite_without_overlap():
+    sizes = {"a": (100, 50), "b": (60, 60), "c": (30, 90), "d": (100, 20)}
+    positions, width, height = atlas.pack(sizes)
+    rects = [(x, y, x + sizes[n][0], y + sizes[n][1]) for n, (x, y) in positions.items()]
+    assert set(positions) == set(sizes)
+    assert all(r[2] <= width and r[3] <= height for r in rects)
+    for i, a in enumerate(rects):
+        for b in rects[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
+
+
+def test_site_atlas_keeps_same_named_sprites_of_different_zones(assets, monkeypatch, capsys):
+    _cutout(assets / "sky" / "wildlife" / "pelican-20250101-120000-cutout.png", size=(80, 50))
+    _cutout(assets / "coastal" / "wildlife" / "pelican-20250101-120000-cutout.png", size=(50, 80))
+    _cutout(assets / "coastal" / "wildlife" / "sea-otter-20250101-120000-cutout.png")
+    monkeypatch.setattr(sys, "argv", ["atlas", "--site", "--formats", "webp"])
+
+    atlas.main()
+
+    manifest = json.loads((assets / "atlas" / "site.json").read_text())
+    assert set(manifest["frames"]) == {"coastal/pelican", "coastal/sea-otter", "sky/pelican"}
+    assert (manifest["frames"]["sky/pelican"]["w"], manifest["frames"]["coastal/pelican"]["w"]) == (80, 50)
+    assert manifest["images"] == {"image/webp": "/assets/atlas/site.webp"}
+    with Image.open(assets / "atlas" / "site.webp") as sheet:
+        assert sheet.size == (manifest["width"], manifest["height"])
+    assert "site: 3 frames" in capsys.readouterr().out
+
+
+def test_zone_atlas_uses_plain_sprite_ids(assets, monkeypatch):
+    _cutout(assets / "sky" / "pelican-20250101-120000-cutout.png")
+    monkeypatch.setattr(sys, "argv", ["atlas", "sky", "--formats", "webp"])
+    atlas.main()
+    assert list(json.loads((assets / "atlas" / "sky.json").read_text())["frames"]) == ["pelican"]
+
+
+def test_help_prints_usage(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["atlas", "--help"])
+    atlas.main()
+    assert "Usage (from scripts/):" in capsys.readouterr().out
+
+
+def test_unknown_zone_fails(assets, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["atlas", "tundra"])
+    with pytest.raises(SystemExit) as exc:
+        atlas.main()
+    assert exc.value.code == 1
+    assert "unknown option or zone: tundra" in capsys.readouterr().out
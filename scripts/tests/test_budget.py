@@ -0,0 +1,126 @@
+import json
+import sys
+
+import pytest
+
+from gencore import budget
+from gencore.budget import KB, MB, check, pick_variant, resolve, scan_sources
+
+
+def _file(path, size: int = 0, text: str = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if text is not None:
+        path.write_text(text)
+    else:
+        path.write_bytes(b"\x00" * size)
+    return path
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """An empty project (src/, public/) that the budget module looks at."""
+    monkeypatch.setattr(budget, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(budget, "PUBLIC_DIR", tmp_path / "public")
+    monkeypatch.setattr(budget, "SRC_DIR", tmp_path / "src")
+    monkeypatch.setattr(budget, "MANIFEST_PATH", tmp_path / "public" / "assets" / "manifest.json")
+    monkeypatch.setattr(budget, "BUNDLE_DIR", tmp_path / ".next" / "static" / "chunks")
+    return tmp_path
+
+
+def _variants(src: str, widths: list, mime: str = "image/avif", size: int = 100 * KB) -> list:
+    return [{"src": src.replace(".png", f"-{w}w.{mime[6:]}"), "type": mime, "width": w, "bytes": size + w}
+            for w in widths]
+
+
+def test_scan_sources_finds_references_and_expands_templates(site):
+    _file(site / "public" / "assets" / "sky" / "otter-1.webp")
+    _file(site / "public" / "assets" / "sky" / "otter-2.webp")
+    _file(site / "src" / "Sky.tsx", text="""
+        const bg = '/assets/sky/sky-bg.png';
+        const frames = [1, 2].map(i => `/assets/sky/otter-${i}.webp`);
+    """)
+    _file(site / "src" / "zones.css", text=".forest { background: url(/assets/forest/forest-bg.avif); }")
+    _file(site / "src" / "notes.md", text="'/assets/sky/ignored.png'")
+
+    assert scan_sources(site / "src") == {
+        "/assets/sky/sky-bg.png": ["src/Sky.tsx"],
+        "/assets/sky/otter-1.webp": ["src/Sky.tsx"],
+        "/assets/sky/otter-2.webp": ["src/Sky.tsx"],
+        "/assets/forest/forest-bg.avif": ["src/zones.css"],
+    }
+
+
+def test_portrait_sibling_splits_the_breakpoints(site):
+    _file(site / "public" / "assets" / "forest" / "forest.png", 10 * KB)
+    _file(site / "public" / "assets" / "forest" / "forest-portrait.png", 5 * KB)
+    loads = resolve({"/assets/forest/forest.png": ["a"], "/assets/forest/forest-portrait.png": ["a"],
+                     "/assets/forest/wildlife/jay.png": ["a"]})
+    assert {(l["url"], l["breakpoint"]) for l in loads} == {
+        ("/assets/forest/forest.png", "desktop"), ("/assets/forest/forest-portrait.png", "mobile"),
+        ("/assets/forest/wildlife/jay.png", "desktop"), ("/assets/forest/wildlife/jay.png", "mobile")}
+    jay = next(l for l in loads if l["url"].endswith("jay.png"))
+    assert (jay["kind"], jay["bytes"]) == ("character", None)
+
+
+def test_pick_variant_prefers_avif_and_the_smallest_covering_width():
+    entry = {"variants": _variants("/a.png", [960, 1920, 2560], "image/webp")
+             + _variants("/a.png", [960, 2560], "image/avif")}
+    assert pick_variant(entry, "desktop")["src"] == "/a-2560w.avif"
+    assert pick_variant(entry, "mobile")["src"] == "/a-2560w.avif"
+    assert pick_variant({"variants": _variants("/a.png", [480, 960])}, "desktop")["width"] == 960
+    assert pick_variant({}, "desktop") is None
+
+
+def test_manifest_stands_in_for_the_background(site):
+    _file(site / "public" / "assets" / "sky" / "sky.png", 900 * KB)
+    manifest = {"zones": {"sky": {
+        "landscape": {"src": "/assets/sky/sky.png", "variants": _variants("/assets/sky/sky.png", [1920, 2560])},
+        "portrait": {"src": "/assets/sky/sky-portrait.png",
+                     "variants": _variants("/assets/sky/sky-portrait.png", [1080])},
+    }}}
+    loads = resolve({"/assets/sky/sky.png": ["a"], "/assets/sky/sky-portrait.png": ["a"]}, manifest)
+    assert [(l["breakpoint"], l["url"]) for l in loads] == [
+        ("desktop", "/assets/sky/sky-1920w.avif"), ("mobile", "/assets/sky/sky-portrait-1080w.avif")]
+
+
+def test_check_flags_files_totals_and_page_weight():
+    def load(zone, breakpoint, kb, kind="background", url=None):
+        return {"zone": zone, "breakpoint": breakpoint, "kind": kind, "bytes": None if kb is None else int(kb * KB),
+                "url": url or f"/assets/{zone}/{breakpoint}-{kind}.avif", "refs": []}
+
+    loads = [load("sky", "desktop", 290), load("sky", "mobile", 160), load("sky", "desktop", 50, "character"),
+             load("forest", "desktop", None, url="/assets/forest/gone.png")]
+    report = check(loads)
+    assert report["zones"] == {"sky": {"desktop": 340 * KB, "mobile": 160 * KB}}
+    assert report["missing"] == ["/assets/forest/gone.png"]
+    assert report["violations"] == ["/assets/sky/mobile-background.avif (mobile): 160 KB > 150 KB background cap"]
+
+    big = [load(z, "desktop", 280) for z in ("a", "b", "c", "d", "e", "f", "g", "h", "i", "j", "k")]
+    report = check(big, js_bytes=2 * MB)
+    assert any(v.startswith("total images (desktop)") for v in report["violations"])
+    assert any(v.startswith("total page weight") for v in report["violations"])
+
+
+def test_main_exits_1_on_a_violation(site, monkeypatch, capsys):
+    _file(site / "public" / "assets" / "cave" / "cave.png", 400 * KB)
+    _file(site / "src" / "Cave.tsx", text="<img src='/assets/cave/cave.png' />")
+    monkeypatch.setattr(sys, "argv", ["budget"])
+    with pytest.raises(SystemExit) as exc:
+        budget.main()
+    assert exc.value.code == 1
+    out = capsys.readouterr().out
+    assert "/assets/cave/cave.png  OVER" in out and "2 budget violation(s)" in out
+
+
+def test_main_reads_the_manifest_unless_told_not_to(site, monkeypatch, capsys):
+    _file(site / "public" / "assets" / "cave" / "cave.png", 400 * KB)
+    _file(site / "src" / "Cave.tsx", text="<img src='/assets/cave/cave.png' />")
+    _file(budget.MANIFEST_PATH, text=json.dumps({"zones": {"cave": {"landscape": {
+        "src": "/assets/cave/cave.png", "variants": _variants("/assets/cave/cave.png", [1920], size=20 * KB)}}}}))
+    monkeypatch.setattr(sys, "argv", ["budget"])
+    budget.main()
+    assert "All budgets met" in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["budget", "--no-manifest"])
+    with pytest.raises(SystemExit):
+        budget.main()
@@ -0,0 +1,123 @@
+import pytest
+
+from gencore import build
+from gencore.build import Lockfile, input_hash, plan
+
+
+def _nodes():
+    """A generate node and a derived node that depends on it."""
+    return {
+        "scenes/sky": {"id": "scenes/sky", "action": "generate", "deps": [], "files": [], "recipe": {"prompt": "sky"}},
+        "scenes/sky:portrait": {"id": "scenes/sky:portrait", "action": "portrait", "deps": ["scenes/sky"],
+                                "files": [], "recipe": {"aspect": 0.5}},
+    }
+
+
+@pytest.fixture
+def built(tmp_path):
+    """Both nodes locked as up to date; returns (nodes, lock, source path, derived path)."""
+    nodes = _nodes()
+    source, derived = tmp_path / "sky-20260101-000000.png", tmp_path / "sky-portrait-crop.png"
+    source.write_bytes(b"source")
+    derived.write_bytes(b"derived")
+    lock = Lockfile(tmp_path / "assets.lock.json")
+    for node_id, paths, sources in (("scenes/sky", [source], {}),
+                                    ("scenes/sky:portrait", [derived], {"scenes/sky": [str(source)]})):
+        node = nodes[node_id]
+        lock.record(node_id, build._hash_json(node["recipe"]), input_hash(node, lock, sources), paths)
+    return nodes, lock, source, derived
+
+
+def test_new_nodes_are_stale(tmp_path):
+    stale = plan(_nodes(), Lockfile(tmp_path / "assets.lock.json"))
+    assert stale == {"scenes/sky": "new", "scenes/sky:portrait": "new"}
+
+
+def test_locked_nodes_are_up_to_date(built):
+    nodes, lock, _, _ = built
+    assert plan(nodes, lock) == {"scenes/sky": None, "scenes/sky:portrait": None}
+    assert set(plan(nodes, lock, force=True).values()) == {"forced"}
+
+
+def test_lock_survives_a_reload(built, tmp_path):
+    nodes, _, _, _ = built
+    assert plan(nodes, Lockfile(tmp_path / "assets.lock.json")) == {"scenes/sky": None, "scenes/sky:portrait": None}
+
+
+def test_prompt_change_rebuilds_dependents(built):
+    nodes, lock, _, _ = built
+    nodes["scenes/sky"]["recipe"]["prompt"] = "a different sky"
+    assert plan(nodes, lock) == {"scenes/sky": "prompt changed", "scenes/sky:portrait": "after scenes/sky"}
+
+
+def test_prompt_whitespace_is_normalized(built):
+    nodes, lock, _, _ = built
+    nodes["scenes/sky"]["recipe"] = build._normalized({"prompt": "  sky\n"})
+    assert plan(nodes, lock)["scenes/sky"] is None
+
+
+def test_recipe_change_rebuilds_only_the_derived_node(built):
+    nodes, lock, _, _ = built
+    nodes["scenes/sky:portrait"]["recipe"]["aspect"] = 0.6
+    assert plan(nodes, lock) == {"scenes/sky": None, "scenes/sky:portrait": "recipe changed"}
+
+
+def test_edited_or_missing_outputs_are_stale(built):
+    nodes, lock, source, derived = built
+    derived.write_bytes(b"hand-edited")
+    assert plan(nodes, lock)["scenes/sky:portrait"].startswith("output modified")
+    derived.unlink()
+    assert plan(nodes, lock)["scenes/sky:portrait"].startswith("output missing")
+
+
+def test_identical_rebuild_skips_dependents(built, tmp_path, monkeypatch):
+    nodes, lock, _, _ = built
+    regenerated = tmp_path / "sky-20260202-000000.png"  # new timestamped name, same bytes
+    derived_runs = []
+
+    def generate(node, sources):
+        regenerated.write_bytes(b"source")
+        return [str(regenerated)]
+
+    monkeypatch.setattr(build, "_run_generate", generate)
+    monkeypatch.setattr(build, "_run_derived", lambda node, sources: derived_runs.append(node["id"]))
+    nodes["scenes/sky"]["recipe"]["prompt"] = "sky, re-rolled"
+
+    report = build.build(nodes, lock, jobs=2)
+    assert report["scenes/sky"]["status"] == "built"
+    assert report["scenes/sky:portrait"]["status"] == "skipped"
+    assert derived_runs == []
+
+
+def test_changed_rebuild_reruns_dependents(built, tmp_path, monkeypatch):
+    nodes, lock, _, derived = built
+    regenerated = tmp_path / "sky-20260202-000000.png"
+
+    def generate(node, sources):
+        regenerated.write_bytes(b"new source")
+        return [str(regenerated)]
+
+    def derive(node, sources):
+        derived.write_bytes(b"derived from " + sources["scenes/sky"][0].encode())
+        return [str(derived)]
+
+    monkeypatch.setattr(build, "_run_generate", generate)
+    monkeypatch.setattr(build, "_run_derived", derive)
+    nodes["scenes/sky"]["recipe"]["prompt"] = "sky, re-rolled"
+
+    report = build.build(nodes, lock, jobs=2)
+    assert (report["scenes/sky:portrait"]["status"], report["scenes/sky:portrait"]["reason"]) == (
+        "built", "after scenes/sky")
+    assert plan(nodes, lock) == {"scenes/sky": None, "scenes/sky:portrait": None}
+
+
+def test_failed_node_blocks_dependents(built, monkeypatch):
+    nodes, lock, _, _ = built
+
+    def generate(node, sources):
+        raise RuntimeError("quota exhausted")
+
+    monkeypatch.setattr(build, "_run_generate", generate)
+    report = build.build(nodes, lock, force=True)
+    assert report["scenes/sky"]["status"] == "failed"
+    assert report["scenes/sky:portrait"]["status"] == "blocked"
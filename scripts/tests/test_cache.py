@@ -0,0 +1,121 @@
+import os
+from pathlib import Path
+
+from gencore.cache import ImageCache, fetch_images, lookup_images, store_images
+
+
+def test_key_ignores_prompt_whitespace():
+    assert ImageCache.key("m", "a  forest\n   at dawn") == ImageCache.key("m", "a forest at dawn")
+
+
+def test_key_separates_models_configs_and_references():
+    base = ImageCache.key("m", "p")
+    assert ImageCache.key("other", "p") != base
+    assert ImageCache.key("m", "p", {"aspect_ratio": "16:9"}) != base
+    assert ImageCache.key("m", "p", reference=b"png") != base
+
+
+def test_key_includes_endpoint(monkeypatch):
+    monkeypatch.delenv("GENCORE_BASE_URL", raising=False)
+    live = ImageCache.key("m", "p")
+    monkeypatch.setenv("GENCORE_BASE_URL", "http://127.0.0.1:8000/")
+    fake = ImageCache.key("m", "p")
+    assert fake != live
+    monkeypatch.setenv("GENCORE_BASE_URL", "http://127.0.0.1:8000")
+    assert ImageCache.key("m", "p") == fake  # trailing slash doesn't matter
+
+
+def test_put_get_and_refresh(tmp_path):
+    cache = ImageCache(tmp_path)
+    cache.put("ab" * 32, [b"one", b"two"])
+    assert cache.get("ab" * 32) == [b"one", b"two"]
+    assert cache.get("cd" * 32) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert ImageCache(tmp_path, refresh=True).get("ab" * 32) is None
+
+
+def _age(cache, key, seconds_ago):
+    entry = cache._entry_dir(key)
+    t = entry.stat().st_mtime - seconds_ago
+    os.utime(entry, (t, t))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ImageCache(tmp_path, max_bytes=250)
+    keys = [c * 64 for c in "abc"]
+    cache.put(keys[0], [b"x" * 100])
+    cache.put(keys[1], [b"x" * 100])
+    _age(cache, keys[0], 20)
+    _age(cache, keys[1], 10)
+    cache.get(keys[0])  # a hit makes it the most recently used
+    cache.put(keys[2], [b"x" * 100])
+
+    assert cache.evictions == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) and cache.get(keys[2])
+    assert cache._size == 200
+
+
+def test_running_total_counts_existing_entries_and_replacements(tmp_path):
+    ImageCache(tmp_path).put("a" * 64, [b"x" * 100])
+    cache = ImageCache(tmp_path, max_bytes=1000)
+    cache.put("a" * 64, [b"x" * 40])  # replaces the 100-byte entry
+    cache.put("b" * 64, [b"x" * 60])
+    assert cache._size == 100
+    assert cache.evictions == 0
+
+
+def test_fetch_images_produces_once(tmp_path):
+    cache, calls = ImageCache(tmp_path), []
+
+    def produce():
+        calls.append(1)
+        return [b"img"]
+
+    assert fetch_images(cache, "k" * 64, produce) == ([b"img"], False)
+    assert fetch_images(cache, "k" * 64, produce) == ([b"img"], True)
+    assert fetch_images(None, "k" * 64, produce) == ([b"img"], False)
+    assert len(calls) == 2
+
+
+def test_entry_evicted_during_a_read_is_a_miss(tmp_path, monkeypatch):
+    cache = ImageCache(tmp_path)
+    cache.put("e" * 64, [b"img"])
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(Path, "read_bytes", evicted)
+    assert cache.get("e" * 64) is None
+    assert cache.misses == 1
+
+
+def test_lookup_images_reads_each_key_once_in_order(tmp_path):
+    cache = ImageCache(tmp_path)
+    assert lookup_images(cache, [("gemini", "g" * 64), ("imagen", "i" * 64)]) is None
+    assert cache.misses == 1  # the fallback key doesn't count
+
+    store_images(cache, "i" * 64, [b"imagen"])
+    assert lookup_images(cache, [("gemini", "g" * 64), ("imagen", "i" * 64)]) == ("imagen", [b"imagen"])
+    store_images(cache, "g" * 64, [b"gemini"])
+    assert lookup_images(cache, [("gemini", "g" * 64), ("imagen", "i" * 64)]) == ("gemini", [b"gemini"])
+    assert lookup_images(None, [("gemini", "g" * 64)]) is None
+
+
+def test_v3_looks_the_cache_up_once_per_panel(fake_server, load_script, tmp_path, monkeypatch):
+    from gencore.resilience import DEFAULT_POLICY
+
+    monkeypatch.setattr(DEFAULT_POLICY, "base_delay", 0.0)
+    fake_server.error_rate = 1.0
+    v3 = load_script("generate-v3-background.py")
+    cache = ImageCache(tmp_path / "cache")
+
+    result = v3.generate_with_imagen("a sky", str(tmp_path / "sky.png"), cache=cache)
+    assert not result["success"]
+    assert len(result["attempts"]) == 2 * DEFAULT_POLICY.max_attempts
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    fake_server.error_rate = 0.0
+    assert v3.generate_with_imagen("a sky", str(tmp_path / "sky.png"), cache=cache)["success"]
+    assert v3.generate_with_imagen("a sky", str(tmp_path / "sky.png"), cache=cache)["cached"]
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,101 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+from gencore.candidates import candidate_path, candidates_from_argv, format_scores, save_candidates
+from gencore.scoring import score_candidates
+
+
+def _png(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _noise(seed: int, size=(160, 90)) -> Image.Image:
+    pixels = np.random.default_rng(seed).integers(40, 216, (size[1], size[0], 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def _solid(colour, size=(160, 90)) -> bytes:
+    return _png(Image.new("RGB", size, colour))
+
+
+def test_sharper_candidate_scores_higher():
+    sharp = _noise(1)
+    blurred = sharp.filter(ImageFilter.GaussianBlur(3))
+    scores = score_candidates([_png(blurred), _png(sharp)])
+    assert scores[1]["sharpness"] > scores[0]["sharpness"]
+    assert scores[1]["score"] > scores[0]["score"]
+
+
+def test_clipped_exposure_scores_lower():
+    scores = score_candidates([_solid((0, 0, 0)), _solid((128, 128, 128))])
+    assert scores[1]["exposure"] > scores[0]["exposure"]
+
+
+def test_edge_match_prefers_the_candidate_that_blends():
+    above = _solid((200, 120, 60))
+    scores = score_candidates([_solid((30, 60, 200)), _solid((190, 125, 70))], above=above)
+    assert scores[1]["edge_match"] > scores[0]["edge_match"]
+    assert scores[1]["score"] > scores[0]["score"]
+
+
+def test_empty_overlay_region_scores_higher():
+    busy = np.asarray(_noise(2)).copy()
+    calm = busy.copy()
+    calm[:30, :80] = 128  # the top-left copy space is flat
+    scores = score_candidates([_png(Image.fromarray(busy)), _png(Image.fromarray(calm))],
+                              overlay_regions=[(0.0, 0.0, 0.5, 0.33)])
+    assert scores[1]["emptiness"] > scores[0]["emptiness"]
+
+
+def test_best_candidate_is_promoted(tmp_path):
+    sharp = _noise(3)
+    images = [_png(sharp.filter(ImageFilter.GaussianBlur(4))), _png(sharp)]
+    saved = save_candidates(images, tmp_path / "sky.png")
+
+    assert saved["best"] == 1
+    assert [c["path"] for c in saved["candidates"]] == [str(tmp_path / "sky-c0.png"), str(tmp_path / "sky-c1.png")]
+    assert (tmp_path / "sky.png").read_bytes() == images[1]
+    assert (tmp_path / "sky-c0.png").read_bytes() == images[0]
+    assert "* c1" in format_scores(saved)
+
+
+def test_single_image_is_written_directly(tmp_path):
+    saved = save_candidates([_solid((10, 20, 30))], tmp_path / "sky.png")
+    assert saved["candidates"] == [] and saved["best"] == 0
+    assert list(tmp_path.iterdir()) == [tmp_path / "sky.png"]
+
+
+class _Index:
+    """Stands in for phash.DuplicateIndex: candidate 0 looks like an existing asset."""
+
+    def __init__(self):
+        self.added = []
+
+    def check(self, images):
+        return [[(3, "/assets/old.png")] if i == 0 else [] for i in range(len(images))]
+
+    def add(self, path, data):
+        self.added.append(path)
+
+
+def test_duplicates_are_dropped_while_a_fresh_candidate_remains(tmp_path):
+    index = _Index()
+    images = [_solid((10, 20, 30)), _solid((200, 100, 50))]
+    saved = save_candidates(images, tmp_path / "sky.png", index=index)
+
+    assert saved["duplicates"] == [{"candidate": 0, "match": "/assets/old.png", "distance": 3, "dropped": True}]
+    assert (tmp_path / "sky.png").read_bytes() == images[1]
+    assert index.added == [tmp_path / "sky.png"]
+
+
+def test_candidates_flag(capsys):
+    assert candidates_from_argv(["sky", "--candidates", "3"]) == (3, ["sky"])
+    assert candidates_from_argv(["sky"], default=2) == (2, ["sky"])
+    assert candidate_path("out/sky.png", 2).name == "sky-c2.png"
+    with pytest.raises(SystemExit):
+        candidates_from_argv(["--candidates", "9"])
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from gencore.client import close_client, get_client
+from gencore.fake_server import _run_batch
+
+
+def test_one_client_per_process(fake_server):
+    seen, lock = [], threading.Lock()
+
+    def grab():
+        client = get_client()
+        with lock:
+            seen.append(client)
+
+    threads = [threading.Thread(target=grab) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(c) for c in seen}) == 1
+    close_client()
+    assert get_client() is not seen[0]
+
+
+def test_missing_key_is_an_error(monkeypatch):
+    close_client()
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    with pytest.raises(RuntimeError, match="GOOGLE_API_KEY"):
+        get_client()
+
+
+def test_shared_client_reuses_connections(fake_server):
+    shared = _run_batch(fake_server, requests=20, workers=4, shared=True)
+    assert shared["requests"] == 20
+    assert shared["connections"] <= 4
+
+
+def test_async_scripts_close_the_client_inside_their_loop(fake_server, load_script, tmp_path):
+    import asyncio
+
+    from gencore import client
+    from gencore.engine import GenerationEngine
+
+    scenes = load_script("generate-zone-scenes.py")
+    zone = next(iter(scenes.ZONE_SCENES))
+    results = asyncio.run(scenes.generate_zone_scenes([zone], tmp_path, GenerationEngine(concurrency=2)))
+
+    assert results[0]["success"]
+    assert client._client is None
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from gencore import compose as compose_module
+from gencore.compose import PngStreamWriter, compose, compose_previews, layout
+
+RED, BLUE = (200, 40, 40), (40, 40, 200)
+
+
+def _panel(path, colour, size=(160, 90)):
+    Image.new("RGB", size, colour).save(path)
+    return str(path)
+
+
+def test_streamed_png_decodes_to_the_same_pixels(tmp_path):
+    pixels = np.random.default_rng(0).integers(0, 256, (100, 37, 3), dtype=np.uint8)
+    writer = PngStreamWriter(tmp_path / "out.png", 37, 100)
+    for start in range(0, 100, 30):
+        writer.write(pixels[start:start + 30])
+    writer.close()
+    with Image.open(tmp_path / "out.png") as img:
+        assert np.array_equal(np.asarray(img), pixels)
+
+
+def test_short_png_is_an_error_and_leaves_no_file(tmp_path):
+    writer = PngStreamWriter(tmp_path / "out.png", 10, 10)
+    writer.write(np.zeros((4, 10, 3), dtype=np.uint8))
+    with pytest.raises(ValueError, match="expected 10 rows"):
+        writer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("suffix", [".png", ".webp"])
+def test_crossfade_blends_the_overlap(tmp_path, suffix):
+    paths = [_panel(tmp_path / "a.png", RED), _panel(tmp_path / "b.png", BLUE, size=(320, 180))]
+    heights, overlaps, height = layout(paths, 160, band=0.25)
+    assert (heights, overlaps, height) == ([90, 90], [22], 158)
+
+    result = compose(paths, tmp_path / f"out{suffix}", band=0.25)
+    assert (result["width"], result["height"]) == (160, 158)
+    with Image.open(result["path"]) as img:
+        column = np.asarray(img.convert("RGB"))[:, 80].astype(int)
+    tolerance = 0 if suffix == ".png" else 12
+    assert np.abs(column[0] - RED).max() <= tolerance
+    assert np.abs(column[-1] - BLUE).max() <= tolerance
+    middle = column[68 + 11]  # half way through the overlap
+    assert RED[2] < middle[2] and middle[0] > BLUE[0]  # a mix of both, not a hard cut
+
+
+def test_failed_compose_keeps_the_previous_preview(tmp_path, monkeypatch):
+    paths = [_panel(tmp_path / "a.png", RED), _panel(tmp_path / "b.png", BLUE)]
+    compose(paths, tmp_path / "out.png")
+    before = (tmp_path / "out.png").read_bytes()
+
+    def broken(*args):
+        yield np.zeros((8, 160, 3), dtype=np.uint8)
+        raise OSError("panel unreadable")
+
+    monkeypatch.setattr(compose_module, "strips", broken)
+    with pytest.raises(OSError):
+        compose(paths, tmp_path / "out.png")
+    assert (tmp_path / "out.png").read_bytes() == before
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.png", "b.png", "out.png"]
+
+
+def test_previews_cover_every_neighbour_pair_and_the_journey(tmp_path):
+    panels = {zone: _panel(tmp_path / f"{zone}.png", colour)
+              for zone, colour in (("sky", RED), ("forest", (40, 160, 40)), ("cave", BLUE))}
+    results = compose_previews(panels, tmp_path, max_workers=2)
+    assert [r["path"].rsplit("/", 1)[1] for r in results] == [
+        "crossfade-forest-cave.png", "crossfade-sky-forest.png", "full-journey-preview.png"]
+    assert results[-1]["height"] == 3 * 90 - 2 * 22
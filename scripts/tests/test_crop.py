@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from gencore.assets import latest_backgrounds
+from gencore.crop import best_window, crop_portrait, energy_map, window_size, zone_for
+
+
+def _panel(path, size=(640, 360), subject_x=None):
+    """A flat panel, optionally with a high-contrast subject centred at `subject_x` (fraction of width)."""
+    pixels = np.full((size[1], size[0], 3), (150, 170, 190), dtype=np.uint8)
+    if subject_x is not None:
+        cx, r = int(subject_x * size[0]), size[1] // 8
+        pixels[size[1] // 2 - r:size[1] // 2 + r, cx - r:cx + r] = (20, 30, 10)
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_window_size():
+    assert window_size(2560, 1440, 9 / 16) == (810, 1440)
+    assert window_size(1000, 2000, 9 / 16) == (1000, 1778)
+
+
+def test_flat_panel_falls_back_to_the_anchor():
+    energy = np.zeros((90, 160), dtype=np.float32)
+    w, h = window_size(160, 90, 9 / 16)
+    x, _ = best_window(energy, (w, h), anchor=(0.3, 0.5))
+    assert x == round(0.3 * (160 - w))
+
+
+def test_window_follows_the_subject(tmp_path):
+    source = _panel(tmp_path / "sky-1.png", subject_x=0.85)
+    result = crop_portrait(source)
+
+    x0, y0, x1, y1 = result["box"]
+    assert result["zone"] == "sky" and result["anchor"] == (50, 30)
+    assert (x1 - x0, y1 - y0) == window_size(640, 360, 9 / 16)
+    assert x0 < 0.85 * 640 < x1  # pulled well away from the centred anchor
+    with Image.open(result["path"]) as img:
+        assert img.size == (x1 - x0, y1 - y0)
+
+
+def test_energy_peaks_on_the_subject(tmp_path):
+    with Image.open(_panel(tmp_path / "p.png", subject_x=0.25)) as img:
+        energy = energy_map(np.asarray(img.convert("RGB"), dtype=np.float32) / 255)
+    assert energy[:, :320].sum() > 2 * energy[:, 320:].sum()
+
+
+def test_zone_for():
+    from pathlib import Path
+
+    assert zone_for(Path("public/assets/forest/whatever.png")) == "forest"
+    assert zone_for(Path("out/coastal-overlook-v3.png")) == "coastal"
+    assert zone_for(Path("out/unknown.png")) is None
+
+
+def test_latest_backgrounds_skips_derived_files(tmp_path):
+    sky = tmp_path / "sky"
+    sky.mkdir()
+    old = _panel(sky / "sky-old.png")
+    new = _panel(sky / "sky-new.png")
+    for derived in ("sky-new-portrait-crop.png", "sky-new-c0.png"):
+        _panel(sky / derived)
+    _panel(sky / "sky-tall.png", size=(360, 640))
+    os.utime(old, (1, 1))
+    (tmp_path / "empty").mkdir()
+
+    assert latest_backgrounds(tmp_path) == [new]
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from gencore.dag import run_graph, topological_order
+
+
+def test_topological_order_and_errors():
+    assert topological_order({"c": ["b"], "b": ["a"], "a": []}) == ["a", "b", "c"]
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order({"a": ["b"], "b": ["a"]})
+    with pytest.raises(ValueError, match="Unknown dependency"):
+        topological_order({"a": ["missing"]})
+
+
+def test_failure_skips_dependents_only():
+    graph = {"a": [], "b": ["a"], "c": ["b"], "d": [], "e": ["d"]}
+    ran, lock = [], threading.Lock()
+
+    def run(node, finished):
+        with lock:
+            ran.append(node)
+        if node == "a":
+            return {"success": False, "error": "boom"}
+        return {"success": True, "value": node}
+
+    timings = run_graph(graph, run)
+
+    assert sorted(ran) == ["a", "d", "e"]
+    assert timings["a"]["error"] == "boom"
+    assert timings["b"]["error"] == "skipped: dependency 'a' failed"
+    assert timings["c"]["error"] == "skipped: dependency 'b' failed"
+    assert timings["e"]["error"] is None
+
+
+def test_exceptions_count_as_failures():
+    def run(node, finished):
+        if node == "a":
+            raise RuntimeError("crashed")
+        return {"success": True}
+
+    timings = run_graph({"a": [], "b": ["a"]}, run)
+    assert timings["a"]["error"] == "crashed"
+    assert timings["b"]["error"].startswith("skipped")
+
+
+def test_dependents_see_prerequisite_results():
+    def run(node, finished):
+        return {"success": True, "seen": sorted(finished)}
+
+    timings = run_graph({"a": [], "b": ["a"], "c": ["a", "b"]}, run)
+    assert timings["c"]["result"]["seen"] == ["a", "b"]
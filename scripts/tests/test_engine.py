@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+from gencore.engine import GenerationEngine, stream
+
+
+def _track_in_flight(server, seconds: float) -> dict:
+    """Make each request take `seconds` on the server and record the peak number in flight."""
+    seen = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def latency():
+        with lock:
+            seen["active"] += 1
+            seen["peak"] = max(seen["peak"], seen["active"])
+        time.sleep(seconds)
+        with lock:
+            seen["active"] -= 1
+        return 0.0
+
+    server.latency = latency
+    return seen
+
+
+def _job(i: int) -> dict:
+    return {"id": f"job-{i}", "kind": "images", "model": "imagen-test", "prompt": f"prompt {i}"}
+
+
+def _run(engine, jobs) -> list:
+    async def run_all():
+        from gencore.client import aclose_client
+
+        try:
+            return [result async for result in engine.run(jobs)]
+        finally:
+            await aclose_client()  # inside the loop, before asyncio.run closes it
+
+    return asyncio.run(run_all())
+
+
+def test_concurrency_bound(fake_server):
+    seen = _track_in_flight(fake_server, 0.05)
+    results = _run(GenerationEngine(concurrency=3), [_job(i) for i in range(10)])
+
+    assert all(r["success"] and r["images"] for r in results)
+    assert sorted(r["id"] for r in results) == sorted(f"job-{i}" for i in range(10))
+    assert seen["peak"] == 3
+
+
+def test_cached_jobs_skip_the_server(fake_server, tmp_path):
+    from gencore.cache import ImageCache
+
+    engine = GenerationEngine(concurrency=2, cache=ImageCache(tmp_path))
+    first = _run(engine, [_job(1)])
+    requests = fake_server.stats["requests"]
+    second = _run(engine, [_job(1)])
+
+    assert not first[0]["cached"] and second[0]["cached"]
+    assert second[0]["images"] == first[0]["images"]
+    assert fake_server.stats["requests"] == requests
+
+
+def test_stream_yields_in_completion_order():
+    async def after(seconds, value):
+        await asyncio.sleep(seconds)
+        return value
+
+    async def collect():
+        return [v async for v in stream([after(0.06, "slow"), after(0.0, "fast"), after(0.03, "middle")])]
+
+    assert asyncio.run(collect()) == ["fast", "middle", "slow"]
+
+
+def test_failed_job_becomes_a_result(fake_server):
+    fake_server.error_rate = 1.0  # every request answered with a 500
+    from gencore.resilience import RetryPolicy
+
+    engine = GenerationEngine(concurrency=2, retry_policy=RetryPolicy(max_attempts=2, base_delay=0.0))
+    result, = _run(engine, [_job(1)])
+
+    assert not result["success"]
+    assert result["error"]
+    assert len(result["attempts"]) == 2
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from gencore import export
+from gencore.export import BUDGETS, KB, export_many, export_variant, fit_to_budget
+
+
+def _panel_png(path, size=(1280, 720)) -> str:
+    """A sky-like gradient with some grain: compressible, but not trivially."""
+    y, x = np.mgrid[0:size[1], 0:size[0]]
+    grain = np.random.default_rng(0).normal(0, 6, (size[1], size[0], 1))
+    pixels = np.dstack([120 + 100 * y / size[1], 140 + 60 * x / size[0], 220 - 80 * y / size[1]]) + grain
+    Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(path)
+    return str(path)
+
+
+def test_variants_fit_the_budget(tmp_path):
+    source = _panel_png(tmp_path / "owl.png", size=(800, 600))
+    results = export_many([source], "character", formats=("webp",), max_workers=2)
+
+    assert [(r["variant"], r["format"]) for r in results] == [("desktop", "webp"), ("mobile", "webp")]
+    for r in results:
+        assert r["fits"] and r["bytes"] <= BUDGETS["character"][r["variant"]]
+        assert os.path.getsize(r["path"]) == r["bytes"]
+    assert [(r["width"], r["height"]) for r in results] == [(800, 600), (512, 384)]  # only ever scaled down
+    with Image.open(results[1]["path"]) as img:
+        assert not img.info.get("exif") and not img.info.get("icc_profile")
+
+
+def test_quality_is_the_highest_that_fits():
+    img = Image.fromarray(np.random.default_rng(1).integers(0, 256, (200, 300, 3), dtype=np.uint8))
+    quality, data, fits = fit_to_budget(img, "webp", 40 * KB)
+    assert fits and len(data) <= 40 * KB
+    assert len(export.encode(img, "webp", quality + 1)) > 40 * KB
+
+    quality, data, fits = fit_to_budget(img, "webp", 100)
+    assert not fits and quality == export.QUALITY_RANGE[0]
+
+
+def test_alpha_survives_for_characters(tmp_path):
+    sprite = Image.new("RGBA", (400, 300), (0, 0, 0, 0))
+    sprite.paste((200, 120, 40, 255), (100, 50, 300, 250))
+    sprite.save(tmp_path / "fox.png")
+    result = export_variant(str(tmp_path / "fox.png"), "character", "mobile", "webp")
+    with Image.open(result["path"]) as img:
+        assert img.mode == "RGBA" and img.getpixel((0, 0))[3] == 0
+
+
+def test_interrupted_export_keeps_the_previous_file(tmp_path, monkeypatch):
+    source = _panel_png(tmp_path / "sky.png", size=(320, 180))
+    previous = export_variant(source, "background", "mobile", "webp")
+    before = open(previous["path"], "rb").read()
+
+    def interrupted(fd):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(os, "fsync", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        export_variant(source, "background", "mobile", "webp")
+    assert open(previous["path"], "rb").read() == before
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["sky-mobile.webp", "sky.png"]
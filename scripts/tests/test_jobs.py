@@ -0,0 +1,113 @@
+import json
+import sys
+
+import pytest
+
+from gencore import jobs
+from gencore.client import close_client
+
+GEMINI = "gemini-2.0-flash-exp-image-generation"
+
+
+def _main(monkeypatch, *args) -> int:
+    monkeypatch.setattr(sys, "argv", ["gencore.jobs", *args])
+    try:
+        jobs.main()
+        return 0
+    except SystemExit as e:
+        return e.code
+    finally:
+        close_client()  # a fresh client (and event loop binding) per command, as per process
+
+
+def _write_jobs(path, lines):
+    path.write_text("".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines))
+    return path
+
+
+def _results(path) -> list:
+    return [json.loads(line) for line in path.with_name(f"{path.stem}.results.jsonl").read_text().splitlines()]
+
+
+@pytest.fixture
+def job_file(tmp_path):
+    return _write_jobs(tmp_path / "jobs.jsonl", [
+        {"id": "sky", "prompt": "a sky", "output": str(tmp_path / "out" / "sky.png")},
+        {"id": "cave", "prompt": "a cave", "candidates": 2, "output": str(tmp_path / "out" / "cave.png")},
+        {"id": "slug", "prompt": "a slug", "model": GEMINI, "output": str(tmp_path / "out" / "slug.png")},
+        {"id": "bad", "prompt": "x", "colour": "red"},
+        {"id": "sky", "prompt": "the same id again"},
+        "not json",
+    ])
+
+
+def test_run_writes_results_and_resumes(fake_server, job_file, tmp_path, monkeypatch):
+    assert _main(monkeypatch, "run", str(job_file), "--no-cache", "--concurrency", "2") == 1
+
+    results = _results(job_file)
+    assert {r["id"] for r in results if r["status"] == "ok"} == {"sky", "cave", "slug"}
+    assert sorted(r["line"] for r in results if r["status"] == "invalid") == [4, 5, 6]
+    assert not any(r["status"] == "failed" for r in results)
+    assert (tmp_path / "out" / "sky.png").exists()
+    assert len(next(r for r in results if r["id"] == "cave")["candidates"]) == 2
+
+    requests = fake_server.stats["requests"]
+    assert _main(monkeypatch, "run", str(job_file), "--no-cache") == 0  # nothing left to do or report
+    assert fake_server.stats["requests"] == requests
+    assert len(_results(job_file)) == len(results)
+
+
+def test_submit_batches_content_jobs_and_runs_imagen_online(fake_server, job_file, tmp_path, monkeypatch):
+    code = _main(monkeypatch, "submit", str(job_file), "--no-cache", "--wait", "--interval", "0.1")
+
+    assert code == 1  # the invalid lines
+    results = {r["id"]: r for r in _results(job_file) if r["status"] == "ok"}
+    assert set(results) == {"sky", "cave", "slug"}
+    assert results["slug"]["batch"].startswith("batches/")
+    assert "batch" not in results["sky"]
+    assert fake_server.stats["batches"] == 1 and fake_server.stats["batch_requests"] == 1
+    assert not (tmp_path / "jobs.results.batches.json").exists()
+
+
+def test_submit_then_poll(fake_server, tmp_path, monkeypatch):
+    path = _write_jobs(tmp_path / "jobs.jsonl", [
+        {"id": f"j{i}", "prompt": f"prompt {i}", "model": GEMINI, "output": str(tmp_path / f"j{i}.png")}
+        for i in range(3)
+    ])
+    assert _main(monkeypatch, "submit", str(path), "--batch-size", "2") == 0
+    state = json.loads((tmp_path / "jobs.results.batches.json").read_text())["batches"]
+    assert [len(b["jobs"]) for b in state] == [2, 1]
+    assert all(b["name"] for b in state)
+
+    assert _main(monkeypatch, "submit", str(path)) == 0  # pending jobs aren't submitted again
+    assert fake_server.stats["batches"] == 2
+
+    assert _main(monkeypatch, "poll", str(path), "--wait", "--interval", "0.1") == 0
+    assert sorted(r["id"] for r in _results(path) if r["status"] == "ok") == ["j0", "j1", "j2"]
+    assert not (tmp_path / "jobs.results.batches.json").exists()
+
+
+def test_poll_recovers_a_batch_recorded_before_create_returned(fake_server, tmp_path, monkeypatch):
+    path = _write_jobs(tmp_path / "jobs.jsonl", [
+        {"id": "j0", "prompt": "p", "model": GEMINI, "output": str(tmp_path / "j0.png")}])
+    assert _main(monkeypatch, "submit", str(path)) == 0
+    state_path = tmp_path / "jobs.results.batches.json"
+    state = json.loads(state_path.read_text())
+    lost = dict(state["batches"][0], name=None, display_name="never-created",
+                jobs=[{"id": "j1", "output": str(tmp_path / "j1.png"), "candidates": 1}])
+    state["batches"][0]["name"] = None  # crashed after create, before its name was saved
+    state["batches"].append(lost)  # crashed before create reached the API
+    state_path.write_text(json.dumps(state))
+
+    assert _main(monkeypatch, "poll", str(path), "--wait", "--interval", "0.1") == 1
+    results = {r["id"]: r for r in _results(path)}
+    assert results["j0"]["status"] == "ok"
+    assert results["j1"]["status"] == "failed" and "never reached the API" in results["j1"]["error"]
+    assert not state_path.exists()
+
+
+def test_usage_errors(tmp_path, monkeypatch, capsys):
+    assert _main(monkeypatch, "frobnicate", str(tmp_path / "jobs.jsonl")) == 1
+    assert _main(monkeypatch, "run", str(tmp_path / "missing.jsonl")) == 1
+    assert _main(monkeypatch, "run", "x.jsonl", "--batch-size", "many") == 1
+    assert "invalid value for --batch-size" in capsys.readouterr().out
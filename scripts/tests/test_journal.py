@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+from gencore import journal
+from gencore.journal import Journal, journal_from_argv, read_journal
+
+SCRIPT = "generate-zone-scenes.py"
+
+
+@pytest.fixture
+def runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "RUNS_DIR", tmp_path)
+    monkeypatch.setattr(sys, "argv", [str(journal.SCRIPTS_DIR / SCRIPT)])
+    return tmp_path
+
+
+def _interrupted_run(runs, output):
+    run = Journal("r1", SCRIPT, ["sky", "forest", "--concurrency", "5", "--no-cache"])
+    run.queued(["sky", "forest", "cave"])
+    run.succeeded("sky", output)
+    run.failed("forest", "503 unavailable")
+    run.running("cave")
+    run.close()
+    return runs / "r1.jsonl"
+
+
+def test_last_state_wins_and_torn_lines_are_ignored(runs, tmp_path):
+    path = _interrupted_run(runs, tmp_path / "sky.png")
+    with open(path, "a") as f:
+        f.write('{"job": "cave", "sta')  # crash mid-write
+    run = read_journal(path)
+    assert run["script"] == SCRIPT
+    assert {job: r["state"] for job, r in run["jobs"].items()} == {
+        "sky": "succeeded", "forest": "failed", "cave": "running"}
+
+
+def test_resume_reissues_only_unfinished_jobs(runs, tmp_path):
+    output = tmp_path / "sky.png"
+    output.write_bytes(b"png")
+    _interrupted_run(runs, output)
+
+    run, args = journal_from_argv(["--resume", "r1"])
+    assert args == ["sky", "forest", "--concurrency", "5", "--no-cache"]
+    assert run.done("sky") == str(output)
+    assert run.done("forest") is None and run.done("cave") is None
+
+    output.unlink()  # a finished job whose output disappeared runs again
+    assert run.done("sky") is None
+
+
+def test_resume_flags_replace_recorded_ones(runs, tmp_path):
+    _interrupted_run(runs, tmp_path / "sky.png")
+    _, args = journal_from_argv(["--resume", "r1", "--concurrency", "2", "--trace"])
+    assert args == ["sky", "forest", "--no-cache", "--concurrency", "2", "--trace"]
+
+    _, args = journal_from_argv(["--resume", "r1", "--no-cache"])
+    assert args == ["sky", "forest", "--concurrency", "5", "--no-cache"]
+
+
+@pytest.mark.parametrize("argv", [
+    ["--resume", "r1", "--no-cache", "cave"],  # positional after a boolean flag
+    ["--resume", "r1", "cave"],
+    ["--resume"],
+    ["--resume", "missing"],
+])
+def test_resume_rejects_bad_arguments(runs, tmp_path, argv):
+    _interrupted_run(runs, tmp_path / "sky.png")
+    with pytest.raises(SystemExit):
+        journal_from_argv(argv)
+
+
+def test_resume_checks_the_script(runs, tmp_path, monkeypatch):
+    _interrupted_run(runs, tmp_path / "sky.png")
+    monkeypatch.setattr(sys, "argv", [str(journal.SCRIPTS_DIR / "generate-v3-background.py")])
+    with pytest.raises(SystemExit):
+        journal_from_argv(["--resume", "r1"])
+
+
+def test_new_run_writes_nothing_until_a_record(runs):
+    run, args = journal_from_argv(["sky"])
+    assert args == ["sky"]
+    assert not list(runs.iterdir())
+    run.queued(["sky"])
+    run.close()
+    assert read_journal(run.path)["args"] == ["sky"]
@@ -0,0 +1,65 @@
+import numpy as np
+from PIL import Image
+
+from gencore.matte import matte, run_matte, sprite_sources, trim
+
+
+def _sprite(path=None, size=200, backdrop=(235, 235, 235)):
+    """A dark disc with a white patch inside it, on a flat light backdrop."""
+    rng = np.random.default_rng(0)
+    pixels = np.clip(np.full((size, size, 3), backdrop, dtype=np.float32)
+                     + rng.normal(0, 2, (size, size, 3)), 0, 255)
+    yy, xx = np.mgrid[:size, :size]
+    c = size // 2
+    pixels[(yy - c) ** 2 + (xx - c) ** 2 < (size // 4) ** 2] = (60, 40, 20)
+    pixels[c - 8:c + 8, c - 8:c + 8] = (240, 240, 240)  # backdrop-coloured, but enclosed by the subject
+    pixels = pixels.astype(np.uint8)
+    if path:
+        Image.fromarray(pixels).save(path)
+    return pixels
+
+
+def test_backdrop_is_keyed_and_enclosed_pixels_stay_opaque():
+    rgba, colour = matte(_sprite())
+    assert all(abs(c - 235) < 5 for c in colour)
+    alpha = rgba[..., 3]
+    assert alpha[0, 0] == 0 and alpha[5, 190] == 0
+    assert alpha[100, 70] == 255     # inside the disc
+    assert alpha[100, 100] == 255    # the white patch isn't connected to the border
+
+
+def test_trim_keeps_padding_around_the_subject():
+    rgba, _ = matte(_sprite())
+    trimmed, box = trim(rgba, padding=4)
+    assert box[0] <= 50 - 3 and box[2] >= 150 + 3
+    assert trimmed.shape[:2] == (box[3] - box[1], box[2] - box[0])
+    assert trimmed.shape[1] < 200
+
+
+def test_sprite_sources_skip_candidates_and_cutouts(tmp_path):
+    for name in ("otter.png", "otter-c1.png", "otter-cutout.png", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    assert sprite_sources([tmp_path]) == [tmp_path / "otter.png"]
+
+
+def test_run_matte_lists_failures_and_returns_only_cutouts(tmp_path, capsys):
+    good = tmp_path / "jay.png"
+    _sprite(good)
+    broken = tmp_path / "slug.png"
+    broken.write_bytes(b"not a png")
+
+    cutouts = run_matte([str(good), str(broken), None])
+
+    assert cutouts == [str(tmp_path / "jay-cutout.png")]
+    with Image.open(cutouts[0]) as img:
+        assert img.mode == "RGBA"
+    assert (tmp_path / "jay-cutout.webp").exists()
+    assert not (tmp_path / "slug-cutout.png").exists()
+    out = capsys.readouterr().out
+    assert "No cutout for 1 sprite(s), skipped:" in out and str(broken) in out
+
+
+def test_run_matte_never_falls_back_to_the_sources(tmp_path):
+    broken = tmp_path / "slug.png"
+    broken.write_bytes(b"not a png")
+    assert run_matte([str(broken)]) == []
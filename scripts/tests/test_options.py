@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+from gencore import quota
+from gencore.options import int_list, option_from_argv, parse_value
+
+USAGE = "Usage:\n    tool [--jobs N]"
+
+
+def test_option_is_removed_and_converted():
+    args = ["sky", "--jobs", "3", "--trace"]
+    assert option_from_argv(args, "--jobs", 4, int) == 3
+    assert args == ["sky", "--trace"]
+    assert option_from_argv(args, "--jobs", 4, int) == 4
+    assert option_from_argv(["--widths", "960,480"], "--widths", None, int_list) == (480, 960)
+
+
+@pytest.mark.parametrize("args", [["--jobs"], ["--jobs", "--trace"], ["--jobs", "many"]])
+def test_bad_option_values_fail_with_usage(args, capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        option_from_argv(args, "--jobs", 4, int, USAGE)
+    assert excinfo.value.code == 1
+    assert "--jobs" in capsys.readouterr().out.splitlines()[0]
+
+
+def test_bad_positional_fails_with_usage(capsys):
+    assert parse_value("<rpm>", "60") == 60
+    with pytest.raises(SystemExit):
+        parse_value("<rpm>", "sixty", int, USAGE)
+    assert capsys.readouterr().out.startswith("ERROR: invalid value for <rpm>: 'sixty'\nUsage:")
+
+
+@pytest.mark.parametrize("argv", [["limit", "m", "x"], ["limit", "m", "10", "y"], ["limit", "m"], ["--since"]])
+def test_quota_cli_rejects_bad_numbers(argv, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["gencore.quota", *argv])
+    with pytest.raises(SystemExit) as excinfo:
+        quota.main()
+    assert excinfo.value.code == 1
+    assert capsys.readouterr().out.startswith("ERROR:")
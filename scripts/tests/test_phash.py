@@ -0,0 +1,90 @@
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from gencore import atlas, phash
+from gencore.phash import BKTree, DuplicateIndex, hamming, hash_images
+
+
+def _image(path, seed=0, size=(128, 96), noise=0.0):
+    """Smooth random blobs; `noise` adds per-pixel jitter on top."""
+    rng = np.random.default_rng(seed)
+    base = Image.fromarray(rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)).resize(size, Image.BICUBIC)
+    pixels = np.asarray(base, dtype=np.float32) + np.random.default_rng(seed + 100).normal(0, noise, (*size[::-1], 3))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path)
+    return path
+
+
+def test_bktree_matches_a_linear_scan():
+    rng = random.Random(1)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    tree = BKTree()
+    for i, v in enumerate(values):
+        tree.add(v, i)
+    query = values[7] ^ 0b1011
+    expected = sorted((hamming(query, v), i) for i, v in enumerate(values) if hamming(query, v) <= 20)
+    assert sorted(tree.search(query, 20)) == expected
+
+
+def test_near_copies_hash_close_and_different_images_far(tmp_path):
+    a, b, c = hash_images([_image(tmp_path / "a.png"), _image(tmp_path / "b.png", noise=6),
+                           _image(tmp_path / "c.png", seed=5)])
+    assert hamming(a[0], b[0]) <= phash.PHASH_RADIUS and hamming(a[1], b[1]) <= phash.DHASH_RADIUS
+    assert hamming(a[0], c[0]) > phash.PHASH_RADIUS
+
+
+def test_roots_cover_where_the_generators_write():
+    assert atlas.ASSETS_DIR in phash.ROOTS
+    assert phash.PROJECT_ROOT / "scripts" / "public" / "assets" in phash.ROOTS
+
+
+def test_refresh_indexes_new_files_and_finds_duplicates(tmp_path):
+    root = tmp_path / "assets"
+    original = _image(root / "sky" / "bg.png")
+    _image(root / "sky" / "bg-c1.png")  # candidates aren't indexed
+    index = DuplicateIndex(roots=[root], path=tmp_path / "index.json").refresh()
+    assert list(index.entries) == [str(original.resolve())]
+
+    data = tmp_path / "copy.png"
+    _image(data, noise=6)
+    [matches] = index.check([data.read_bytes()])
+    assert [p for _, p in matches] == [str(original.resolve())]
+    assert index.flagged == 1
+
+
+def test_refresh_drops_deleted_files_and_entries_outside_the_roots(tmp_path):
+    root = tmp_path / "assets"
+    kept = _image(root / "forest" / "bg.png")
+    gone = _image(root / "forest" / "old.png")
+    elsewhere = _image(tmp_path / "elsewhere" / "bg.png", seed=3)
+    index = DuplicateIndex(roots=[root], path=tmp_path / "index.json").refresh()
+    index.add(elsewhere)
+    index.save()
+    gone.unlink()
+
+    index = DuplicateIndex(roots=[root], path=tmp_path / "index.json").refresh()
+    assert list(index.entries) == [str(kept.resolve())]
+    assert index.hashed == 0
+    assert list(json.loads((tmp_path / "index.json").read_text())) == [str(kept.resolve())]
+
+
+def test_interrupted_save_keeps_the_previous_index(tmp_path, monkeypatch):
+    path = tmp_path / "index.json"
+    index = DuplicateIndex(roots=[tmp_path / "assets"], path=path)
+    index.entries = {"a": {"size": 1, "mtime": 1, "phash": "0", "dhash": "0"}}
+    index.save()
+    index.entries["b"] = index.entries["a"]
+
+    def interrupted(fd):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(os, "fsync", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        index.save()
+    assert list(json.loads(path.read_text())) == ["a"]
+    assert [p.name for p in tmp_path.iterdir()] == ["index.json"]
@@ -0,0 +1,88 @@
+import pytest
+
+from gencore.plan import DEFAULT_LATENCY, estimate, format_plan, plan_from_argv, plan_job
+from gencore.quota import QuotaStore, current_endpoint
+from gencore.resilience import RetryPolicy
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = QuotaStore(tmp_path / "quota.sqlite")
+    yield s
+    s.close()
+
+
+def _history(store, model: str, latency: float, ok: int = 10, failed: int = 0):
+    for _ in range(ok):
+        store.record(current_endpoint(), model, 200, latency=latency)
+    for _ in range(failed):
+        store.record(current_endpoint(), model, 429, latency=0.1)
+
+
+def test_plan_from_argv():
+    assert plan_from_argv(["sky", "--dry-run"]) == (True, ["sky"])
+    assert plan_from_argv(["sky"]) == (False, ["sky"])
+
+
+def test_requests_without_failures(store):
+    _history(store, "fast", 2.0)
+    jobs = [plan_job(f"j{i}", ["fast", "backup"], images=2) for i in range(3)] + [
+        plan_job("hit", ["fast"], cached=True)]
+    plan = estimate(jobs, concurrency=3, policy=RetryPolicy(max_attempts=3), store=store)
+
+    fast, backup = plan["models"]["fast"], plan["models"]["backup"]
+    assert (fast["min"], fast["expected"], fast["worst"], fast["images"]) == (3, 3.0, 9, 6.0)
+    assert (backup["min"], backup["expected"], backup["worst"]) == (0, 0.0, 9)
+    assert backup["assumed"] and backup["latency"] == DEFAULT_LATENCY
+    assert plan["wall"] == pytest.approx(2.0)
+    assert plan["warnings"] == []
+
+
+def test_failures_add_retries_and_fallbacks(store):
+    _history(store, "flaky", 1.0, ok=5, failed=5)
+    _history(store, "backup", 1.0)
+    plan = estimate([plan_job("j", ["flaky", "backup"])], concurrency=1, policy=RetryPolicy(max_attempts=2),
+                    store=store)
+    flaky, backup = plan["models"]["flaky"], plan["models"]["backup"]
+    assert flaky["expected"] == pytest.approx(1.5)   # 1 + 0.5 retries
+    assert backup["expected"] == pytest.approx(0.25)  # both flaky attempts fail a quarter of the time
+    assert flaky["images"] + backup["images"] == pytest.approx(1.0)
+
+
+def test_wall_time_follows_concurrency_and_dependencies(store):
+    _history(store, "m", 10.0)
+    jobs = [plan_job(f"j{i}", ["m"]) for i in range(4)]
+    assert estimate(jobs, 2, store=store)["wall"] == pytest.approx(20.0)
+    assert estimate(jobs, 4, store=store)["wall"] == pytest.approx(10.0)
+
+    chain = [plan_job("sky", ["m"]), plan_job("forest", ["m"], deps=["sky"]),
+             plan_job("coastal", ["m"], deps=["forest"])]
+    assert estimate(chain, 4, store=store)["wall"] == pytest.approx(30.0)
+
+
+def test_quota_warning_suggests_a_concurrency(store):
+    _history(store, "slow", 30.0)
+    store.set_limit("slow", 10)
+    jobs = [plan_job(f"j{i}", ["slow"]) for i in range(8)]
+
+    plan = estimate(jobs, 8, store=store)
+    [warning] = plan["warnings"]
+    assert warning.startswith("slow: 8 in flight") and "lower concurrency to 5" in warning
+    assert estimate(jobs, 5, store=store)["warnings"] == []
+
+
+def test_quota_stretches_the_wall_time(store):
+    _history(store, "quick", 1.0, ok=1)
+    store.set_limit("quick", 10)
+    jobs = [plan_job(f"j{i}", ["quick"]) for i in range(30)]
+    assert estimate(jobs, 1, store=store)["wall"] >= 30 / 10 * 60
+
+
+def test_format_plan(store):
+    _history(store, "m", 2.0)
+    jobs = [plan_job("sky", ["m", "fallback"]), plan_job("forest", ["m"], deps=["sky"], cached=True)]
+    text = format_plan(estimate(jobs, 2, store=store))
+    assert text.startswith(f"DRY RUN: nothing sent to {current_endpoint()}")
+    assert "Jobs: 2 (1 cached), concurrency 2" in text
+    assert "m → fallback" in text and "after sky" in text
+    assert f"no history for this endpoint, assumed {DEFAULT_LATENCY:g}s" in text
@@ -0,0 +1,101 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from gencore import quota
+from gencore.quota import QuotaStore, current_endpoint
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = QuotaStore(tmp_path / "quota.sqlite")
+    yield s
+    s.close()
+
+
+def test_current_endpoint(monkeypatch):
+    monkeypatch.delenv("GENCORE_BASE_URL", raising=False)
+    assert current_endpoint() == quota.LIVE_ENDPOINT
+    monkeypatch.setenv("GENCORE_BASE_URL", "http://127.0.0.1:8123/")
+    assert current_endpoint() == "127.0.0.1:8123"
+
+
+def test_counters_are_kept_per_endpoint(store):
+    store.record("live", "imagen-a", 200, latency=2.0)
+    store.add_images("live", "imagen-a", 4)
+    store.record("live", "imagen-a", 429)
+    store.record("live", "imagen-a", 503)
+    store.record("local", "imagen-a", 200)
+
+    [row] = store.counters("live")
+    assert (row["model"], row["requests"], row["images"], row["rate_limited"], row["errors"]) == (
+        "imagen-a", 3, 4, 1, 1)
+    assert store.counters("local")[0]["requests"] == 1
+    assert store.counters("elsewhere") == []
+
+
+def test_images_attach_to_the_latest_successful_request(store):
+    store.record("live", "m", 200)
+    store.record("live", "m", 200)
+    store.record("live", "m", 429)
+    store.add_images("live", "m", 2)
+    store.add_images("live", "m", 3)
+    store.add_images("live", "m", 5)  # nothing left to attach to
+    assert store.counters("live")[0]["images"] == 5
+    assert store.last_minute("m", "live") == (3, 5)
+
+
+def test_limits_default_to_quotas_and_can_be_overridden(store):
+    assert store.limits("imagen-4.0-ultra-generate-001") == {"rpm": 10, "ipm": 10}
+    assert store.limits("unknown") == {"rpm": None, "ipm": None}
+    store.set_limit("imagen-4.0-ultra-generate-001", 30)
+    store.set_limit("imagen-4.0-ultra-generate-001", 40, 80)
+    assert store.limits("imagen-4.0-ultra-generate-001") == {"rpm": 40, "ipm": 80}
+
+
+def test_history_and_last_minute(store):
+    for status, latency in ((200, 3.0), (200, 5.0), (200, 100.0), (429, 0.1), (500, 0.2)):
+        store.record("live", "m", status, latency=latency)
+    store._execute("UPDATE requests SET at = ? WHERE latency = 100.0", (time.time() - 3600,))
+
+    history = store.history("m", "live")
+    assert history == {"requests": 5, "latency": 5.0, "failure_rate": 0.4}
+    assert store.history("m", "live", limit=2)["latency"] is None
+    assert store.last_minute("m", "live") == (4, 0)
+    assert store.history("other", "live") == {"requests": 0, "latency": None, "failure_rate": 0.0}
+
+
+def test_requests_through_the_client_are_counted(fake_server):
+    from gencore.client import aclose_client
+    from gencore.engine import GenerationEngine
+
+    endpoint = current_endpoint()
+    before = {r["model"]: r for r in quota.get_store().counters(endpoint)}.get("imagen-count") or {
+        "requests": 0, "images": 0}
+
+    async def run():
+        try:
+            return await GenerationEngine(concurrency=1).generate(
+                {"id": "j", "kind": "images", "model": "imagen-count", "prompt": "p"})
+        finally:
+            await aclose_client()
+
+    images, _ = asyncio.run(run())
+    after = {r["model"]: r for r in quota.get_store().counters(endpoint)}["imagen-count"]
+    assert after["requests"] - before["requests"] == 1
+    assert (after["images"] or 0) - (before["images"] or 0) == len(images)
+    assert quota.get_store().history("imagen-count", endpoint)["latency"] > 0
+
+
+def test_limit_command(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["quota", "limit", "imagen-x", "12", "24"])
+    quota.main()
+    assert "imagen-x: {'rpm': 12, 'ipm': 24}" in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["quota", "limit", "imagen-x", "lots"])
+    with pytest.raises(SystemExit) as exc:
+        quota.main()
+    assert exc.value.code == 1
+    assert "invalid value for <rpm>: 'lots'" in capsys.readouterr().out
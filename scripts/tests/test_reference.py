@@ -0,0 +1,91 @@
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from gencore import reference
+from gencore.reference import prepare_reference
+
+
+@pytest.fixture(autouse=True)
+def ref_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(reference, "REFERENCE_CACHE_DIR", tmp_path / "references")
+    monkeypatch.setattr(reference, "_memory", {})
+    for name in ("GENCORE_REF_LONG_EDGE", "GENCORE_REF_FORMAT", "GENCORE_REF_QUALITY"):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path / "references"
+
+
+def _source(tmp_path, fmt="PNG", name="panel.png", size=(2560, 1440)) -> str:
+    path = tmp_path / name
+    Image.new("RGB", size, (180, 120, 70)).save(path, fmt)
+    return str(path)
+
+
+def test_downscales_and_reencodes(tmp_path):
+    prepared = prepare_reference(_source(tmp_path))
+    assert prepared["mime_type"] == "image/webp"
+    assert prepared["bytes"] < prepared["source_bytes"]
+    with Image.open(io.BytesIO(prepared["data"])) as img:
+        assert (img.format, img.size) == ("WEBP", (1024, 576))
+
+
+def test_settings_come_from_the_environment_when_called(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENCORE_REF_FORMAT", "JPG")
+    monkeypatch.setenv("GENCORE_REF_LONG_EDGE", "512")
+    prepared = prepare_reference(_source(tmp_path))
+    assert prepared["mime_type"] == "image/jpeg"
+    with Image.open(io.BytesIO(prepared["data"])) as img:
+        assert img.size == (512, 288)
+
+
+@pytest.mark.parametrize("name, value", [("GENCORE_REF_FORMAT", "tiff"), ("GENCORE_REF_QUALITY", "high")])
+def test_invalid_settings_fail_cleanly(tmp_path, monkeypatch, capsys, name, value):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(SystemExit) as excinfo:
+        prepare_reference(_source(tmp_path))
+    assert excinfo.value.code == 1
+    assert name in capsys.readouterr().out.splitlines()[0]
+
+
+def test_encoded_reference_is_cached_on_disk(tmp_path, ref_cache, monkeypatch):
+    source = _source(tmp_path)
+    first = prepare_reference(source)
+    assert len(list(ref_cache.iterdir())) == 1
+
+    monkeypatch.setattr(reference, "_memory", {})
+    monkeypatch.setattr(reference, "_encode", lambda *a: pytest.fail("re-encoded a cached reference"))
+    assert prepare_reference(source)["data"] == first["data"]
+
+
+def test_concurrent_encodes_of_one_reference(tmp_path, ref_cache):
+    source, errors, barrier = _source(tmp_path, size=(1280, 720)), [], threading.Barrier(8)
+
+    def encode():
+        barrier.wait()
+        try:
+            prepare_reference(source)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=encode) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert [p.suffix for p in ref_cache.iterdir()] == [".webp"]
+
+
+@pytest.mark.parametrize("fmt, name, mime_type", [
+    ("JPEG", "panel.jpg", "image/jpeg"), ("PNG", "panel.png", "image/png"), ("WEBP", "panel.bin", "image/webp")])
+def test_without_pillow_the_source_keeps_its_own_type(tmp_path, monkeypatch, fmt, name, mime_type):
+    def no_pillow(*args):
+        raise ImportError("No module named 'PIL'")
+
+    source = _source(tmp_path, fmt, name, size=(64, 36))
+    monkeypatch.setattr(reference, "_encode", no_pillow)
+    prepared = prepare_reference(source)
+    assert prepared["mime_type"] == mime_type
+    assert prepared["bytes"] == prepared["source_bytes"]
@@ -0,0 +1,119 @@
+import pytest
+from PIL import Image
+
+from gencore import registry as registry_module
+from gencore.registry import Registry, image_size
+
+
+def _png(path, size=(64, 32), colour=(30, 90, 150)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, colour).save(path)
+    return path
+
+
+def _write(path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """A project root with public/assets, and a registry database in it."""
+    monkeypatch.setattr(registry_module, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(registry_module, "ASSETS_DIR", tmp_path / "public" / "assets")
+    db = Registry(tmp_path / "registry.sqlite")
+    yield tmp_path, db
+    db.close()
+
+
+def test_image_size_reads_the_png_header(tmp_path):
+    assert image_size(_png(tmp_path / "a.png", (300, 120))) == (300, 120)
+    assert image_size(_write(tmp_path / "a.bin", b"nothing")) == (None, None)
+
+
+def test_record_takes_model_from_the_attempt_that_served_it(tree):
+    root, db = tree
+    path = _png(root / "public" / "assets" / "forest" / "forest-bg.png")
+    job = {"id": "forest", "model": "imagen-4.0-ultra-generate-001", "prompt": "  a  forest \n"}
+    attempts = [{"model": "imagen-4.0-ultra-generate-001", "error": "429", "latency": 0.5},
+                {"model": "imagen-4.0-generate-001", "latency": 2.0}]
+    db.record(path, job, "background", attempts=attempts)
+
+    [row] = db.query()
+    assert (row["zone"], row["subject"], row["kind"]) == ("forest", "forest", "background")
+    assert row["model"] == "imagen-4.0-generate-001"
+    assert (row["width"], row["height"], row["attempts"], row["latency"]) == (64, 32, 2, 2.5)
+    assert row["status"] == "PENDING_HUMAN_REVIEW"
+    assert row["prompt_hash"] == registry_module._sha256("a forest")
+
+
+def test_record_again_keeps_the_review_status(tree):
+    root, db = tree
+    path = _png(root / "public" / "assets" / "sky" / "sky.png")
+    db.record(path, kind="background")
+    assert db.set_status(path, "APPROVED")
+    db.record(path, kind="background")
+    assert [r["status"] for r in db.query()] == ["APPROVED"]
+
+
+def test_set_status_rejects_unknown_values(tree):
+    root, db = tree
+    with pytest.raises(ValueError):
+        db.set_status(root / "x.png", "LOOKS_GOOD")
+    assert not db.set_status(root / "x.png", "APPROVED")
+
+
+def test_refresh_variants_and_latest_within_a_budget(tree):
+    root, db = tree
+    zone = root / "public" / "assets" / "coastal"
+    source = _write(zone / "coastal.png", b"\x00" * 5000)
+    db.record(source, kind="background")
+    _write(zone / "coastal-desktop.webp", b"\x00" * 3000)
+    _write(zone / "coastal-mobile.avif", b"\x00" * 1000)
+    _write(zone / "srcset" / "coastal-960w.webp", b"\x00" * 2000)
+    _write(zone / "coastal-notes.txt", b"not a variant")
+
+    assert db.refresh_variants([source, None]) == 3
+    [row] = db.query()
+    assert row["derived"] == 3
+    best = db.latest(zone="coastal", max_bytes=2500)
+    assert (best["variant"], best["file_bytes"]) == ("960w.webp", 2000)
+    assert db.latest(zone="coastal", max_bytes=500) is None
+    assert db.latest(zone="sky") is None
+
+
+def test_scan_registers_originals_only(tree):
+    root, db = tree
+    assets = root / "public" / "assets"
+    _png(assets / "sky" / "sky.png")
+    _png(assets / "sky" / "sky-c1.png")
+    _png(assets / "sky" / "sky-portrait-crop.png")
+    _png(assets / "sky" / "srcset" / "sky-480w.png")
+    _png(assets / "sky" / "wildlife" / "pelican.png")
+
+    assert db.scan(roots=(assets,)) == 2
+    rows = {r["subject"]: r for r in db.query()}
+    assert set(rows) == {"sky", "pelican"}
+    assert (rows["pelican"]["kind"], rows["pelican"]["zone"]) == ("character", "sky")
+    assert rows["sky"]["derived"] == 3
+    assert db.scan(roots=(assets,)) == 2 and db.recorded == 2
+
+
+def test_import_spec_applies_the_status_tracker(tree):
+    root, db = tree
+    sky = _png(root / "public" / "assets" / "sky" / "sky-background-v3.png")
+    dc = _png(root / "public" / "assets" / "datacenter" / "datacenter-background-v3.png")
+    db.scan(roots=(root / "public" / "assets",))
+    spec = _write(root / "01-ASSETS.md", b"""
+| # | Asset | Status | Version | File Location | Human Notes |
+|---|-------|--------|---------|---------------|-------------|
+| 1 | sky-hero | APPROVED | v3 | `public/assets/sky/sky-background-v3.png` | ok |
+| 3 | ~~rocky-bg~~ | **CUT** | - | - | removed |
+| 6 | datacenter-bg | NEEDS_MODIFICATION | v3 | `public/assets/datacenter/datacenter-background-v3.png` | ceiling |
+| 9 | missing | APPROVED | v1 | `public/assets/sky/gone.png` | not on disk |
+""")
+    applied = db.import_spec(spec)
+    assert applied == [(str(sky), "APPROVED"), (str(dc), "NEEDS_MODIFICATION")]
+    assert {r["subject"]: r["status"] for r in db.query()} == {
+        "sky-hero": "APPROVED", "datacenter-bg": "NEEDS_MODIFICATION"}
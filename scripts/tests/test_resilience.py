@@ -0,0 +1,134 @@
+import time
+
+import httpx
+import pytest
+
+from gencore.resilience import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, breaker_for, call_with_fallback, call_with_retry,
+    call_with_retry_async,
+)
+
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay=0.0)
+
+
+def _open(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.state == "half-open"
+    assert breaker.would_allow()
+    assert breaker.allow()
+    assert not breaker.allow()  # the trial is taken
+    assert not breaker.would_allow()
+
+
+def test_trial_outcome_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_other_errors_release_the_trial_without_counting():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_other()
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+
+
+def test_retry_counts_only_transient_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise httpx.ConnectError("refused")
+        return "ok"
+
+    attempts = []
+    assert call_with_retry("model-a", flaky, NO_WAIT, attempts) == "ok"
+    assert [a["error"] is None for a in attempts] == [False, False, True]
+    assert breaker_for("model-a").state == "closed"
+
+    def broken():
+        raise ValueError("bad request body")
+
+    with pytest.raises(ValueError):
+        call_with_retry("model-b", broken, NO_WAIT)
+    assert breaker_for("model-b").failures == 0
+
+
+def test_open_breaker_refuses_calls():
+    _open(breaker_for("model-c"))
+    with pytest.raises(CircuitOpenError):
+        call_with_retry("model-c", lambda: "never", NO_WAIT)
+
+
+def test_fallback_skips_open_models_and_reports_them():
+    _open(breaker_for("primary"))
+    attempts = []
+    model, value = call_with_fallback([("primary", lambda: "a"), ("backup", lambda: "b")], NO_WAIT, attempts)
+
+    assert (model, value) == ("backup", "b")
+    assert attempts[0]["model"] == "primary" and "circuit open" in attempts[0]["error"]
+
+
+def _server_error():
+    from google.genai import errors
+
+    return errors.ServerError(500, {"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}})
+
+
+def test_breaker_opening_mid_retry_reraises_the_real_error():
+    breaker_for("model-d").failure_threshold = 2
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise _server_error()
+
+    start = time.monotonic()
+    with pytest.raises(Exception) as excinfo:
+        call_with_retry("model-d", failing, RetryPolicy(max_attempts=5, base_delay=0.2, max_delay=0.2))
+    assert "500" in str(excinfo.value)
+    assert isinstance(excinfo.value.__cause__, CircuitOpenError)
+    assert len(calls) == 2  # the second failure opened the breaker: no third call
+    assert time.monotonic() - start < 0.3  # and no wait for it
+
+
+def test_async_retry_reraises_the_real_error():
+    import asyncio
+
+    breaker_for("model-e").failure_threshold = 1
+
+    async def failing():
+        raise _server_error()
+
+    with pytest.raises(Exception) as excinfo:
+        asyncio.run(call_with_retry_async("model-e", failing, RetryPolicy(max_attempts=3, base_delay=10.0)))
+    assert not isinstance(excinfo.value, CircuitOpenError)
+    assert isinstance(excinfo.value.__cause__, CircuitOpenError)
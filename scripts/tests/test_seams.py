@@ -0,0 +1,74 @@
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from gencore import seams
+
+
+def _panel(path, top=(120, 150, 180), bottom=(120, 150, 180), size=(512, 400)):
+    """A noisy vertical gradient from `top` to `bottom`, so bands have some texture."""
+    rng = np.random.default_rng(len(str(path)))
+    t = np.linspace(0, 1, size[1])[:, None, None]
+    pixels = (1 - t) * np.array(top) + t * np.array(bottom)
+    pixels = np.broadcast_to(pixels, (size[1], size[0], 3)) + rng.normal(0, 4, (size[1], size[0], 3))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path)
+    return path
+
+
+def test_matching_panels_pass(tmp_path):
+    paths = [_panel(tmp_path / "a" / "a.png"), _panel(tmp_path / "b" / "b.png")]
+    [seam] = seams.check_seams(paths)
+    assert seam["failures"] == [] and seam["known"] is None
+    assert seams.failed([seam]) == []
+
+
+def test_colour_jump_fails(tmp_path):
+    paths = [_panel(tmp_path / "a" / "a.png", bottom=(240, 240, 240)),
+             _panel(tmp_path / "b" / "b.png", top=(10, 10, 10))]
+    [seam] = seams.check_seams(paths)
+    assert "delta_e" in seam["failures"]
+    assert seams.failed([seam]) == [seam]
+
+
+def test_threshold_override(tmp_path):
+    paths = [_panel(tmp_path / "a" / "a.png"), _panel(tmp_path / "b" / "b.png")]
+    [seam] = seams.check_seams(paths, thresholds={"delta_e": -1.0})
+    assert seam["failures"] == ["delta_e"]
+
+
+def test_known_bad_seam_is_reported_but_not_failed(tmp_path):
+    paths = [_panel(tmp_path / "cave" / "cave.png", bottom=(20, 20, 20)),
+             _panel(tmp_path / "datacenter" / "dc.png", top=(230, 230, 250))]
+    [seam] = seams.check_seams(paths)
+    assert seam["failures"] and seam["known"] == seams.KNOWN_BAD[("cave", "datacenter")]
+    assert seams.failed([seam]) == []
+    report = seams.format_report([seam])
+    assert "! cave.png → dc.png" in report and "1 known-bad" in report
+
+
+def test_known_bad_seam_that_passes_asks_to_be_removed(tmp_path):
+    paths = [_panel(tmp_path / "cave" / "cave.png"), _panel(tmp_path / "datacenter" / "dc.png")]
+    report = seams.format_report(seams.check_seams(paths))
+    assert "remove it from KNOWN_BAD" in report
+
+
+def test_missing_journey_zone_is_reported(tmp_path, monkeypatch, capsys):
+    panels = [_panel(tmp_path / zone / f"{zone}.png") for zone in ("sky", "forest", "cave")]
+    monkeypatch.setattr(seams, "latest_backgrounds", lambda: panels)
+    monkeypatch.setattr(seams, "JOURNEY", ["sky", "forest", "coastal", "cave"])
+    monkeypatch.setattr(sys, "argv", ["seams"])
+    seams.main()
+    out = capsys.readouterr().out
+    assert "coastal: skipped, no landscape background" in out
+    assert "forest.png → cave.png" in out
+
+
+def test_missing_path_fails_cleanly(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["seams", str(_panel(tmp_path / "a.png")), str(tmp_path / "nope.png")])
+    with pytest.raises(SystemExit) as exc:
+        seams.main()
+    assert exc.value.code == 1
+    assert "no such image" in capsys.readouterr().out
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from PIL import Image
+
+from gencore import srcset
+from gencore.srcset import build, ladder, write_manifest
+
+
+def test_ladder_caps_at_the_source_width():
+    assert ladder(1376) == [640, 1080, 1376]
+    assert ladder(4000) == [640, 1080, 1600, 2560]
+    assert ladder(500) == [500]
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    assets = tmp_path / "public" / "assets"
+    (assets / "sky").mkdir(parents=True)
+    Image.new("RGB", (800, 450), (120, 160, 220)).save(assets / "sky" / "sky-1.png")
+    Image.new("RGB", (253, 450), (120, 160, 220)).save(assets / "sky" / "sky-1-portrait-crop.png")
+    monkeypatch.setattr(srcset, "ASSETS_DIR", assets)
+    return assets
+
+
+def test_manifest_lists_every_rung(assets):
+    manifest = build([assets / "sky" / "sky-1.png"], widths=(320, 640, 1080), formats=("webp",), max_workers=2)
+
+    assert manifest["errors"] == [] and manifest["encoded"] == 4
+    landscape, portrait = manifest["zones"]["sky"]["landscape"], manifest["zones"]["sky"]["portrait"]
+    assert landscape["src"] == "/assets/sky/sky-1.png"
+    assert [(v["width"], v["height"]) for v in landscape["variants"]] == [(320, 180), (640, 360), (800, 450)]
+    assert landscape["srcset"]["image/webp"] == (
+        "/assets/sky/srcset/sky-1-320w.webp 320w, /assets/sky/srcset/sky-1-640w.webp 640w, "
+        "/assets/sky/srcset/sky-1-800w.webp 800w")
+    assert [v["width"] for v in portrait["variants"]] == [253]
+    assert (assets / "sky" / "srcset" / "sky-1-640w.webp").exists()
+
+
+def test_up_to_date_rungs_are_reused(assets):
+    build([assets / "sky" / "sky-1.png"], widths=(320,), formats=("webp",), max_workers=1)
+    again = build([assets / "sky" / "sky-1.png"], widths=(320,), formats=("webp",), max_workers=1)
+    assert (again["encoded"], again["reused"]) == (0, 2)
+
+
+def test_written_manifest_keeps_only_the_public_fields(assets):
+    manifest = build([assets / "sky" / "sky-1.png"], widths=(320,), formats=("webp",), max_workers=1)
+    write_manifest(manifest, assets / "manifest.json")
+    written = json.loads((assets / "manifest.json").read_text())
+    assert set(written) == {"generated", "widths", "zones"}
+    assert [p.name for p in assets.iterdir() if p.is_file()] == ["manifest.json"]
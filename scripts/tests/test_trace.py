@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+
+from gencore import trace
+
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    """Tracing on, into a temp file; yields a function returning the records written so far."""
+    t = trace.Tracer(tmp_path / "trace.jsonl")
+    monkeypatch.setattr(trace, "_tracer", t)
+    yield lambda: trace.load([t.path]) if t.path.exists() else []
+    t.close()
+
+
+def test_off_by_default(monkeypatch):
+    monkeypatch.setattr(trace, "_tracer", None)
+    with trace.job("sky", "m") as timeline:
+        trace.mark("built")
+    assert timeline is None
+
+
+def test_no_file_until_the_first_record(tmp_path):
+    t = trace.Tracer(tmp_path / "traces" / "run.jsonl")
+    t.close()
+    assert not (tmp_path / "traces").exists()
+
+
+def test_marks_emit_spans_and_a_total(tracer):
+    with trace.job("forest", "imagen-a"):
+        trace.mark("queued")
+        trace.mark("written", candidates=3)
+    trace.mark("orphan")  # outside any job
+
+    records = tracer()
+    assert [r["stage"] for r in records] == ["queued", "written", "total"]
+    assert records[1]["candidates"] == 3
+    assert all(r["job"] == "forest" and r["model"] == "imagen-a" for r in records)
+    assert records[2]["status"] == "ok" and records[2]["error"] is None
+    assert records[2]["duration_ms"] >= records[0]["duration_ms"] + records[1]["duration_ms"] - 0.01
+
+
+def test_errors_mark_the_job_failed(tracer):
+    with pytest.raises(RuntimeError):
+        with trace.job("cave"):
+            raise RuntimeError("boom")
+    with trace.job("coastal"):
+        trace.fail("No image generated")
+
+    totals = [r for r in tracer() if r["stage"] == "total"]
+    assert [(r["job"], r["status"], r["error"]) for r in totals] == [
+        ("cave", "error", "boom"), ("coastal", "error", "No image generated")]
+
+
+def test_retries_and_fallbacks_close_a_backoff_span(tracer):
+    with trace.job("sky", "ultra"):
+        trace.attempt("ultra", 1)
+        trace.mark("parsed")
+        trace.attempt("ultra", 2)
+        trace.attempt("standard", 1)
+        trace.mark("parsed")
+
+    records = tracer()
+    assert [(r["stage"], r["model"], r["attempt"]) for r in records] == [
+        ("parsed", "ultra", 1), ("backoff", "ultra", 1), ("backoff", "ultra", 2),
+        ("parsed", "standard", 1), ("total", "standard", 1)]
+
+
+def test_concurrent_jobs_keep_their_own_marks(tracer):
+    async def one(name, delay):
+        with trace.job(name):
+            await asyncio.sleep(delay)
+            trace.mark("parsed")
+
+    async def both():
+        await asyncio.gather(one("a", 0.02), one("b", 0.0))
+
+    asyncio.run(both())
+    parsed = {r["job"]: r for r in tracer() if r["stage"] == "parsed"}
+    assert parsed["a"]["duration_ms"] >= 15 > parsed["b"]["duration_ms"]
+
+
+def test_trace_from_argv(tmp_path, monkeypatch):
+    monkeypatch.setattr(trace, "_tracer", None)
+    monkeypatch.setattr(trace, "TRACE_DIR", tmp_path)
+    monkeypatch.delenv("GENCORE_TRACE", raising=False)
+    assert trace.trace_from_argv(["sky"]) == (None, ["sky"])
+
+    path, args = trace.trace_from_argv(["sky", "--trace"])
+    assert args == ["sky"] and path.parent == tmp_path and path.suffix == ".jsonl"
+
+    monkeypatch.setenv("GENCORE_TRACE", str(tmp_path / "env.jsonl"))
+    assert trace.trace_from_argv(["sky"])[0] == tmp_path / "env.jsonl"
+
+
+def test_engine_request_is_traced_end_to_end(fake_server, tracer):
+    from gencore.client import aclose_client
+    from gencore.engine import GenerationEngine
+
+    async def run():
+        try:
+            with trace.job("sky", "imagen-test"):
+                return await GenerationEngine(concurrency=1).generate(
+                    {"id": "sky", "kind": "images", "model": "imagen-test", "prompt": "a sky"})
+        finally:
+            await aclose_client()
+
+    images, cached = asyncio.run(run())
+    assert images and not cached
+    stages = [r["stage"] for r in tracer()]
+    assert stages == ["setup", "queued", "built", "connect", "sent", "first_byte", "parsed", "total"]
+
+
+def test_summarize(tmp_path):
+    path = tmp_path / "t.jsonl"
+    records = [{"job": f"j{i}", "model": "m", "attempt": 1, "stage": "first_byte", "start": 0, "duration_ms": ms}
+               for i, ms in enumerate((120, 80, 400))]
+    records += [{"job": "j0", "model": "m", "attempt": 1, "stage": "total", "start": 0, "duration_ms": 500,
+                 "status": "ok"},
+                {"job": "j1", "model": "m", "attempt": 1, "stage": "total", "start": 0, "duration_ms": 90,
+                 "status": "error", "error": "429"}]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    summary = trace.summarize(trace.load([path]))
+    first_byte = next(line for line in summary.splitlines() if line.strip().startswith("first_byte"))
+    assert first_byte.split()[1:3] == ["3", "120.0ms"]
+    assert summary.endswith("2 job(s), 1 failed")